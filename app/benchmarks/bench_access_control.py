@@ -0,0 +1,78 @@
+"""
+Микробенчмарк проверки доступа в AccessControlMiddleware.
+
+Сравнивает прежнюю схему (компиляция regex UUID/ID на каждый запрос, re.sub по пути
+и LIKE-сопоставление с политиками) с сопоставлением по шаблону маршрута и поиском в множестве.
+
+Запуск из каталога app:
+    PYTHONPATH=src python -m benchmarks.bench_access_control
+"""
+
+import re
+import timeit
+import uuid
+from typing import Callable, List
+
+from src.app import app
+from src.permission.policy_cache import AccessPolicyCache, legacy_resource
+from src.permission.route_resolver import RouteTemplateResolver
+
+NUMBER = 20000
+
+LEGACY_POLICIES = frozenset(
+    [
+        "/dashboard",
+        "/transactions",
+        "/predict_fin_transaction",
+        "/api/user/profile",
+        "/api/predict/task/create",
+        "/api/predict/task/status/",
+        "/api/predict/task/result/",
+    ]
+)
+
+
+def legacy_check(path: str) -> bool:
+    # Копия прежней логики middleware: regex компилируются на каждый запрос, путь переписывается,
+    # затем ресурсы политик сопоставляются с LIKE-шаблоном (в БД; здесь - эквивалентный regex).
+    uuid_pattern = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+    id_pattern = re.compile(r"(\d+)")
+    clear_path = uuid_pattern.sub("%", path)
+    clear_path = id_pattern.sub("%", clear_path)
+    like = re.compile("".join(".*" if ch == "%" else "." if ch == "_" else re.escape(ch) for ch in clear_path))
+    return any(like.fullmatch(resource) for resource in LEGACY_POLICIES)
+
+
+def make_template_check() -> Callable[[str], bool]:
+    resolver = RouteTemplateResolver(app.router)
+    cache = AccessPolicyCache(ttl=60)
+    cache._policies = {("user", "GET"): LEGACY_POLICIES | {legacy_resource(p) for p in LEGACY_POLICIES}}
+    cache._loaded_at = float("inf")
+
+    def template_check(path: str) -> bool:
+        template = resolver.resolve("GET", path)
+        return template is not None and cache.is_allowed("user", template, "GET")
+
+    return template_check
+
+
+def run(name: str, check: Callable[[str], bool], paths: List[str]) -> None:
+    iterator = iter(paths * (NUMBER // len(paths) + 1))
+    seconds = timeit.timeit(lambda: check(next(iterator)), number=NUMBER)
+    print(f"{name:<28} {seconds / NUMBER * 1e6:8.2f} мкс/запрос")
+
+
+def main() -> None:
+    static_paths = ["/dashboard", "/transactions", "/api/user/profile"]
+    # Уникальные task_id: кэш маршрутов не помогает, каждый запрос разбирается заново
+    dynamic_paths = [f"/api/predict/task/status/{uuid.uuid4()}" for _ in range(NUMBER)]
+
+    template_check = make_template_check()
+    for label, paths in (("статические пути", static_paths), ("пути с task_id", dynamic_paths)):
+        print(f"--- {label} ---")
+        run("legacy regex + LIKE", legacy_check, paths)
+        run("route template", template_check, paths)
+
+
+if __name__ == "__main__":
+    main()
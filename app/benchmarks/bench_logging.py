@@ -0,0 +1,79 @@
+"""
+Микробенчмарк накладных расходов логирования на запрос создания задачи предсказания.
+
+Повторяет вызовы логгера из POST /api/predict/task/create и отправки в RabbitMQ для пакета
+из ROWS транзакций (339 признаков V на строку):
+- прежняя схема: FileHandler и консольный обработчик пишут синхронно в потоке запроса,
+  полезная нагрузка форматируется целиком (f-строка с mltask на INFO, data и JSON на DEBUG);
+- текущая схема: QueueHandler и поток записи, вместо нагрузки - размер, полная нагрузка
+  форматируется (с обрезкой) только если включён DEBUG.
+
+Запуск из каталога app:
+    PYTHONPATH=src python -m benchmarks.bench_logging
+"""
+
+import json
+import logging
+import os
+import tempfile
+import timeit
+from typing import Any, Callable, Dict, List
+
+from src.services.logging.logging import LOG_FORMAT, get_logger, truncate_payload
+
+ROWS = 100
+NUMBER = 200
+
+
+def make_payload() -> List[Dict[str, Any]]:
+    row = {"TransactionID": 1, "TransactionAmt": 100.0, "C": [1.0] * 14, "D": [0.0] * 15, "M": ["T"] * 9, "V": [1.0] * 339}
+    return [dict(row, TransactionID=i) for i in range(ROWS)]
+
+
+def make_sync_logger(level: int, path: str) -> logging.Logger:
+    logger = logging.getLogger(f"bench.sync.{level}")
+    logger.propagate = False
+    logger.setLevel(level)
+    formatter = logging.Formatter(LOG_FORMAT)
+    for handler in (logging.FileHandler(path), logging.StreamHandler(open(os.devnull, "w"))):
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    return logger
+
+
+def legacy_request(logger: logging.Logger, data: List[Dict[str, Any]]) -> None:
+    mltask = {"task_id": "bench", "input_data": data}
+    logger.info("Начато создание задачи предсказания пользователем bench@example.com")
+    logger.debug(f"Данные получены для задачи: {data}")
+    logger.info(f"Отправка задачи в RabbitMQ: {mltask}")
+    logger.debug(f"Сообщение подготовлено для отправки: {json.dumps(mltask)}")
+    logger.info("Задача bench успешно создана и записана в БД")
+
+
+def current_request(logger: logging.Logger, data: List[Dict[str, Any]]) -> None:
+    logger.info("Начато создание задачи предсказания пользователем %s", "bench@example.com")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Данные получены для задачи (%d транзакций): %s", len(data), truncate_payload(data))
+    logger.info("Отправка задачи %s в RabbitMQ (%d транзакций)", "bench", len(data))
+    logger.info("Задача %s успешно создана и записана в БД", "bench")
+
+
+def run(name: str, request: Callable[[], None]) -> None:
+    seconds = timeit.timeit(request, number=NUMBER)
+    print(f"{name:<40} {seconds / NUMBER * 1e6:10.1f} мкс/запрос")
+
+
+def main() -> None:
+    data = make_payload()
+    with tempfile.TemporaryDirectory() as tmp:
+        for level in (logging.DEBUG, logging.INFO):
+            level_name = logging.getLevelName(level)
+            sync_logger = make_sync_logger(level, os.path.join(tmp, f"sync-{level_name}.log"))
+            queue_logger = get_logger(level=level, logger_name=f"bench.queue.{level_name}")
+            print(f"--- уровень {level_name}, {ROWS} транзакций в запросе ---")
+            run("прежняя схема (синхронно, полная нагрузка)", lambda: legacy_request(sync_logger, data))
+            run("очередь + сводка/обрезка нагрузки", lambda: current_request(queue_logger, data))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Бенчмарк «шквала логинов»: задержка лёгкого маршрута, пока идут проверки паролей bcrypt.
+
+Сравнивает проверку пароля прямо в async-обработчике (как раньше: цикл событий занят bcrypt)
+с проверкой в ограниченном пуле password_hash_executor. Во время шквала из LOGINS одновременных
+входов клиент непрерывно опрашивает /ping и измеряет его задержку.
+
+Запуск из каталога app:
+    PYTHONPATH=src python -m benchmarks.bench_login_storm
+"""
+
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+from fastapi import FastAPI
+from src.auth.hash_password import HashPassword, password_hash_executor
+
+LOGINS = 32
+PING_INTERVAL = 0.005
+PASSWORD = "benchmark-password"
+
+
+def make_app(password_hash: str) -> FastAPI:
+    app = FastAPI()
+    hash_password = HashPassword()
+
+    @app.post("/login/inline")
+    async def login_inline() -> Dict[str, bool]:
+        return {"ok": hash_password.verify_hash(PASSWORD, password_hash)}
+
+    @app.post("/login/executor")
+    async def login_executor() -> Dict[str, bool]:
+        verified, _ = await hash_password.verify_and_update_async(PASSWORD, password_hash)
+        return {"ok": verified}
+
+    @app.get("/ping")
+    async def ping() -> Dict[str, str]:
+        return {"status": "ok"}
+
+    return app
+
+
+async def storm(client: httpx.AsyncClient, login_path: str) -> None:
+    done = asyncio.Event()
+    latencies: List[float] = []
+
+    async def pinger() -> None:
+        while not done.is_set():
+            # Задержка считается от момента, когда ping должен был уйти: так учитывается и время,
+            # на которое занятый bcrypt цикл событий задержал сам запуск запроса
+            t0 = time.perf_counter()
+            await asyncio.sleep(PING_INTERVAL)
+            (await client.get("/ping")).raise_for_status()
+            latencies.append(time.perf_counter() - t0 - PING_INTERVAL)
+
+    async def logins() -> None:
+        responses = await asyncio.gather(*(client.post(login_path) for _ in range(LOGINS)))
+        assert all(r.json()["ok"] for r in responses)
+        done.set()
+
+    started = time.perf_counter()
+    await asyncio.gather(pinger(), logins())
+    elapsed = time.perf_counter() - started
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    print(
+        f"{login_path:<16} {LOGINS} входов за {elapsed:5.2f} с   /ping: {len(latencies):4d} ответов,"
+        f" p50 {quantiles[49] * 1e3:7.1f} мс, p99 {quantiles[98] * 1e3:7.1f} мс, max {max(latencies) * 1e3:7.1f} мс"
+    )
+
+
+async def main() -> None:
+    app = make_app(HashPassword().create_hash(PASSWORD))
+    print(f"Пул хэширования: {password_hash_executor.max_workers} потоков, очередь до {password_hash_executor.max_pending}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await storm(client, "/login/inline")
+        await storm(client, "/login/executor")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
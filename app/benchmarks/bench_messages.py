@@ -0,0 +1,97 @@
+"""
+Бенчмарк преобразования CSV транзакций в сообщения очереди (страница /predict_fin_transaction).
+
+Сравнивает построчный row_to_message по df.to_dict(orient="records") с векторизованным
+frame_to_messages на выборке из ROWS строк и проверяет, что сообщения совпадают.
+Выборка - первые ROWS строк IEEE-CIS train_transaction.csv, если путь к нему задан в IEEE_CIS_CSV,
+иначе синтетическая таблица с теми же колонками и типами (около половины V/D/id - пропуски).
+
+Запуск из каталога app:
+    PYTHONPATH=src python -m benchmarks.bench_messages
+"""
+
+import os
+import time
+from typing import Any, Callable, List
+
+import numpy as np
+import pandas as pd
+from src.services.ingest.messages import BLOCK_COLUMNS, SCALAR_COLUMNS, frame_to_messages, row_to_message
+
+ROWS = 100_000
+REPEATS = 3
+
+
+def make_sample(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    def numeric(share_missing: float, scale: float = 100.0) -> np.ndarray:
+        values = np.round(rng.random(rows) * scale, 2)
+        values[rng.random(rows) < share_missing] = np.nan
+        return values
+
+    def categorical(choices: List[str], share_missing: float) -> np.ndarray:
+        values = rng.choice(np.array(choices, dtype=object), rows)
+        values[rng.random(rows) < share_missing] = np.nan
+        return values
+
+    columns: dict = {
+        "TransactionID": np.arange(2987000, 2987000 + rows),
+        "isFraud": rng.integers(0, 2, rows),
+        "TransactionDT": 86400 + np.arange(rows) * 7,
+        "TransactionAmt": numeric(0.0, 1000.0),
+        "ProductCD": categorical(["W", "H", "C", "S", "R"], 0.0),
+    }
+    for column in SCALAR_COLUMNS[1:]:
+        if column in ("card4", "card6"):
+            columns[column] = categorical(["visa", "mastercard", "debit", "credit"], 0.01)
+        elif column in ("card1", "card2"):
+            columns[column] = np.floor(numeric(0.1, 18000.0))
+        elif column.endswith("emaildomain"):
+            columns[column] = categorical(["gmail.com", "yahoo.com", "anonymous.com"], 0.5)
+        else:
+            columns[column] = numeric(0.1, 1000.0)
+    for field, names in BLOCK_COLUMNS.items():
+        for name in names:
+            if field == "M":
+                columns[name] = categorical(["T", "F"], 0.5)
+            elif name in ("id_12", "id_15", "id_16", "id_23", "id_27", "id_28", "id_29"):
+                columns[name] = categorical(["Found", "NotFound", "New"], 0.75)
+            else:
+                columns[name] = numeric(0.2 if field == "C" else 0.5)
+    return pd.DataFrame(columns)
+
+
+def load_sample() -> pd.DataFrame:
+    path = os.getenv("IEEE_CIS_CSV")
+    if path:
+        return pd.read_csv(path, nrows=ROWS)
+    return make_sample(ROWS)
+
+
+def rowwise(df: pd.DataFrame) -> List[Any]:
+    return [row_to_message(row) for row in df.to_dict(orient="records")]
+
+
+def measure(name: str, convert: Callable[[pd.DataFrame], List[Any]], df: pd.DataFrame) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        convert(df)
+        timings.append(time.perf_counter() - t0)
+    best = min(timings)
+    print(f"{name:<16}: {best:6.2f} с, {len(df) / best:9.0f} строк/с")
+    return best
+
+
+def main() -> None:
+    df = load_sample()
+    print(f"Выборка: {len(df)} строк, {len(df.columns)} колонок ({os.getenv('IEEE_CIS_CSV') or 'синтетическая'})")
+    assert frame_to_messages(df) == rowwise(df), "сообщения векторизованного преобразования отличаются от построчного"
+    rowwise_time = measure("построчно", rowwise, df)
+    vectorized_time = measure("векторизованно", frame_to_messages, df)
+    print(f"Ускорение: x{rowwise_time / vectorized_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
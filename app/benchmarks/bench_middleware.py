@@ -0,0 +1,78 @@
+"""
+Микробенчмарк накладных расходов middleware на тривиальном маршруте.
+
+Сравнивает приложение без middleware, с пустой BaseHTTPMiddleware (прежняя основа
+AccessControlMiddleware) и с AccessControlMiddleware в виде чистого ASGI-приложения.
+Запросы выполняются через httpx.ASGITransport без сети, поэтому измеряется только стек ASGI.
+
+Запуск из каталога app:
+    PYTHONPATH=src python -m benchmarks.bench_middleware
+"""
+
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from src.auth.jwt_handler import create_access_token
+from src.database.config import get_settings
+from src.permission.access_control_middelware import AccessControlMiddleware
+from src.permission.policy_cache import access_policy_cache
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+REQUESTS = 5000
+WARMUP = 200
+
+
+class PassthroughMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+        return await call_next(request)
+
+
+def make_app(middleware: Optional[type]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping() -> Dict[str, str]:
+        return {"status": "ok"}
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+async def run(name: str, app: FastAPI, headers: Dict[str, str]) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        for _ in range(WARMUP):
+            (await client.get("/ping")).raise_for_status()
+        latencies: List[float] = []
+        started = time.perf_counter()
+        for _ in range(REQUESTS):
+            t0 = time.perf_counter()
+            response = await client.get("/ping")
+            latencies.append(time.perf_counter() - t0)
+            response.raise_for_status()
+        elapsed = time.perf_counter() - started
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{name:<30} {REQUESTS / elapsed:8.0f} req/s   p50 {quantiles[49] * 1e6:7.1f} мкс   p99 {quantiles[98] * 1e6:7.1f} мкс")
+
+
+async def main() -> None:
+    secret_key = get_settings().SECRET_KEY or ""
+    token = create_access_token({"email": "bench@example.com", "role": "user"}, secret_key)
+    headers = {"Authorization": f"Bearer {token}"}
+    # Политики в памяти, как после загрузки при старте приложения
+    access_policy_cache._policies = {("user", "GET"): frozenset(["/ping"])}
+    access_policy_cache._loaded_at = float("inf")
+
+    await run("без middleware", make_app(None), headers)
+    await run("пустая BaseHTTPMiddleware", make_app(PassthroughMiddleware), headers)
+    await run("AccessControlMiddleware (ASGI)", make_app(AccessControlMiddleware), headers)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""
+Бенчмарк синхронной оценки POST /api/predict/score через пул процессов приложения.
+
+Измеряет задержку (p50/p99) и пропускную способность InProcessScorer для пакетов разного размера
+при CONCURRENCY одновременных клиентах. По умолчанию используется заглушка модели из тестов,
+то есть измеряются накладные расходы пула (сериализация, IPC); для реальной модели укажите
+каталог ml_worker в SCORING_MODEL_PATH.
+
+Запуск из каталога app:
+    PYTHONPATH=src python -m benchmarks.bench_score
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from src.services.scoring.scorer import InProcessScorer
+
+REQUESTS = 300
+CONCURRENCY = 4
+STUB_MODEL_PATH = Path(__file__).resolve().parents[1] / "tests" / "common" / "stub_model"
+
+
+def make_rows(size: int) -> List[Dict[str, Any]]:
+    row = {
+        "TransactionID": 0,
+        "TransactionDT": 86400,
+        "TransactionAmt": 68.5,
+        "ProductCD": "W",
+        "C": [1.0] * 14,
+        "D": [None] * 15,
+        "M": ["T"] * 9,
+        "V": [1.0] * 339,
+        "id": [None] * 27,
+    }
+    return [dict(row, TransactionID=i) for i in range(size)]
+
+
+async def run(scorer: InProcessScorer, batch_size: int) -> None:
+    rows = make_rows(batch_size)
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one() -> None:
+        async with semaphore:
+            t0 = time.perf_counter()
+            await scorer.score(rows)
+            latencies.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(REQUESTS)))
+    elapsed = time.perf_counter() - started
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"пакет {batch_size:>3}: {REQUESTS / elapsed:7.0f} пакетов/с, {REQUESTS * batch_size / elapsed:8.0f} транзакций/с,"
+        f" p50 {quantiles[49] * 1e3:6.2f} мс, p99 {quantiles[98] * 1e3:6.2f} мс"
+    )
+
+
+async def main() -> None:
+    model_path = os.getenv("SCORING_MODEL_PATH") or str(STUB_MODEL_PATH)
+    scorer = InProcessScorer(model_path=model_path, workers=2, max_concurrency=CONCURRENCY, timeout=10.0, max_batch=100)
+    scorer.start()
+    print(f"Модель: {model_path}, процессов: {scorer.workers}, одновременных клиентов: {CONCURRENCY}")
+    try:
+        for batch_size in (1, 10, 100):
+            await run(scorer, batch_size)
+    finally:
+        scorer.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,32 @@
+"""Параметры запуска и общие фикстуры микробенчмарков приложения (pytest-benchmark)."""
+
+from typing import Dict
+
+import pandas as pd
+import pytest
+
+from .bench_messages import make_sample
+
+# Размеры пакетов по умолчанию
+DEFAULT_SIZES = "1,100,10000,100000"
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption("--bench-sizes", default=DEFAULT_SIZES, help="размеры пакетов через запятую")
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    if "size" in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption("--bench-sizes").split(",")]
+        metafunc.parametrize("size", sizes)
+
+
+_samples_cache: Dict[int, pd.DataFrame] = {}
+
+
+@pytest.fixture
+def sample(size: int) -> pd.DataFrame:
+    """Синтетическая таблица транзакций формы IEEE-CIS из size строк; генерируется один раз на размер за сессию."""
+    if size not in _samples_cache:
+        _samples_cache[size] = make_sample(size)
+    return _samples_cache[size]
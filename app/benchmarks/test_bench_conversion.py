@@ -0,0 +1,42 @@
+"""
+Микробенчмарки преобразования CSV транзакций в сообщения очереди и валидации PredictionCreate
+на пакетах размера --bench-sizes.
+
+Запуск из каталога app (результаты сохраняются в benchmarks/results для сравнения между версиями):
+    python -m pytest benchmarks --benchmark-autosave --benchmark-storage=benchmarks/results
+    python -m pytest benchmarks --benchmark-storage=benchmarks/results --benchmark-compare --benchmark-compare-fail=median:20%
+"""
+
+from typing import Any, List
+
+import pandas as pd
+from pydantic import TypeAdapter
+from schemas import PredictionCreate
+from src.services.ingest.messages import frame_to_messages, row_to_message
+
+# Число замеров для размера пакета (крупные пакеты меряются однократно)
+ROUNDS = {1: 200, 100: 20, 10000: 3}
+prediction_list_adapter = TypeAdapter(List[PredictionCreate])
+
+
+def rounds(size: int) -> int:
+    return ROUNDS.get(size, 1)
+
+
+def test_row_to_message(benchmark: Any, size: int, sample: pd.DataFrame) -> None:
+    messages = benchmark.pedantic(
+        lambda: [row_to_message(row) for row in sample.to_dict(orient="records")], rounds=rounds(size), iterations=1
+    )
+    assert len(messages) == size
+
+
+def test_frame_to_messages(benchmark: Any, size: int, sample: pd.DataFrame) -> None:
+    messages = benchmark.pedantic(frame_to_messages, args=(sample,), rounds=rounds(size), iterations=1)
+    assert len(messages) == size
+
+
+def test_prediction_create_validation(benchmark: Any, size: int, sample: pd.DataFrame) -> None:
+    # Так FastAPI проверяет тело POST /api/predict/task/create (List[PredictionCreate])
+    messages = frame_to_messages(sample)
+    validated = benchmark.pedantic(prediction_list_adapter.validate_python, args=(messages,), rounds=rounds(size), iterations=1)
+    assert len(validated) == size
@@ -0,0 +1,36 @@
+"""
+Окружение Alembic.
+
+Схема описана моделями SQLModel (target_metadata). init_db передаёт открытое соединение
+через config.attributes["connection"]; при запуске из командной строки используется engine приложения.
+Логирование не перенастраивается: при запуске из приложения им управляет services.logging.
+"""
+
+from alembic import context
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+from src.models import access_policy, fin_transaction, model, role, stats_counter, task, task_chunk, user  # noqa: F401
+
+target_metadata = SQLModel.metadata
+
+
+def run_migrations(connection: Connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = context.config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+    from src.database.database import engine
+
+    with engine.begin() as connection:
+        run_migrations(connection)
+
+
+if context.is_offline_mode():
+    raise RuntimeError("Миграции применяются только к базе данных (offline-режим не поддерживается)")
+run_migrations_online()
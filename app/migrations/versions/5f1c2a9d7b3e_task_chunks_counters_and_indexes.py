@@ -0,0 +1,79 @@
+"""Счётчики статистики, чанки задач, поля задачи для кэша статусов и идемпотентности, индексы транзакций
+
+Базы, созданные до Alembic через create_all, не имеют таблицы alembic_version и обновляются с этой
+ревизии; часть объектов в них уже может существовать, поэтому каждый шаг проверяет текущую схему.
+
+Revision ID: 5f1c2a9d7b3e
+Revises:
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5f1c2a9d7b3e"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if "statscounter" not in tables:
+        op.create_table(
+            "statscounter",
+            sa.Column("name", sqlmodel.AutoString(), nullable=False),
+            sa.Column("value", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("name"),
+        )
+    if "taskchunk" not in tables:
+        op.create_table(
+            "taskchunk",
+            sa.Column("task_id", sa.Integer(), nullable=False),
+            sa.Column("chunk", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["task_id"], ["task.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("task_id", "chunk"),
+        )
+
+    task_columns = {column["name"] for column in inspector.get_columns("task")}
+    if "updated_at" not in task_columns:
+        # Существующие задачи получают время создания, затем колонка становится обязательной
+        op.add_column("task", sa.Column("updated_at", sa.DateTime(), nullable=True))
+        op.execute("UPDATE task SET updated_at = created_at")
+        with op.batch_alter_table("task") as batch:
+            batch.alter_column("updated_at", existing_type=sa.DateTime(), nullable=False)
+    if "idempotency_key" not in task_columns:
+        op.add_column("task", sa.Column("idempotency_key", sqlmodel.AutoString(length=64), nullable=True))
+    if "expected_chunks" not in task_columns:
+        op.add_column("task", sa.Column("expected_chunks", sa.Integer(), nullable=True))
+    if "received_chunks" not in task_columns:
+        op.add_column("task", sa.Column("received_chunks", sa.Integer(), nullable=False, server_default="0"))
+
+    task_indexes = {index["name"] for index in inspector.get_indexes("task")}
+    if "ux_task_idempotency_key" not in task_indexes:
+        op.create_index("ux_task_idempotency_key", "task", ["idempotency_key"], unique=True)
+    fin_transaction_indexes = {index["name"] for index in inspector.get_indexes("fintransaction")}
+    if "ix_fintransaction_created_at_id" not in fin_transaction_indexes:
+        op.create_index("ix_fintransaction_created_at_id", "fintransaction", ["created_at", "id"])
+    if "ix_fintransaction_task_id" not in fin_transaction_indexes:
+        op.create_index("ix_fintransaction_task_id", "fintransaction", ["task_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_fintransaction_task_id", table_name="fintransaction")
+    op.drop_index("ix_fintransaction_created_at_id", table_name="fintransaction")
+    op.drop_index("ux_task_idempotency_key", table_name="task")
+    with op.batch_alter_table("task") as batch:
+        batch.drop_column("received_chunks")
+        batch.drop_column("expected_chunks")
+        batch.drop_column("idempotency_key")
+        batch.drop_column("updated_at")
+    op.drop_table("taskchunk")
+    op.drop_table("statscounter")
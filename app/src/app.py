@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 from pathlib import Path
 from typing import Any
 
@@ -10,6 +12,7 @@ from sqlmodel import Session
 
 # from src.services.crud.predict import predict_processing
 from src.auth.hash_password import HashPassword
+from src.database.config import get_settings
 from src.database.database import engine, init_db
 from src.models.access_policy import AccessPolicy
 from src.models.fin_transaction import FinTransaction
@@ -17,6 +20,7 @@ from src.models.model import Model
 from src.models.role import Role
 from src.models.user import User
 from src.permission.access_control_middelware import AccessControlMiddleware
+from src.permission.policy_cache import access_policy_cache
 from src.routes.api.fin_transaction import fin_transaction_router
 from src.routes.api.model import model_router
 from src.routes.api.oauth import oauth_route
@@ -26,6 +30,7 @@ from src.routes.api.user import user_router
 from src.routes.dashboard import dashboard_route
 from src.routes.home import home_route
 from src.routes.login import login_route
+from src.routes.metrics import metrics_route
 from src.routes.predict_transactions import predict_transactions_route
 from src.routes.register import register_route
 from src.routes.transactions_view_router import transactions_view_route
@@ -33,7 +38,12 @@ from src.routes.users import users_route
 from src.services.crud.fin_transaction import create_fin_transaction
 from src.services.crud.model import create_model
 from src.services.crud.user import create_user
+from src.services.events.task_notify import listener_conninfo, task_status_listener
 from src.services.logging.logging import get_logger
+from src.services.metrics.middleware import MetricsMiddleware
+from src.services.rm.rpc import rpc_client
+from src.services.scoring.scorer import in_process_scorer
+from src.services.stats.reconcile import reconcile_counters_periodically, run_reconciliation
 
 logger = get_logger(logger_name="App")
 
@@ -58,6 +68,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Метрики запросов - снаружи остальных middleware, чтобы учитывать и отказы в доступе
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(home_route)
 app.include_router(login_route)
@@ -67,6 +79,7 @@ app.include_router(register_route)
 app.include_router(transactions_view_route)
 app.include_router(predict_transactions_route)
 app.include_router(users_route)
+app.include_router(metrics_route)
 app.include_router(oauth_route, prefix="/api/oauth")
 app.include_router(user_router, prefix="/api/user")
 # app.include_router(wallet_router, prefix="/api/wallet")
@@ -123,11 +136,18 @@ def init_data() -> None:
             user_access_predictions_get = AccessPolicy(role_id=user_role_id, resource="/transactions", action="GET")
             user_access_predict_iris_get = AccessPolicy(role_id=user_role_id, resource="/predict_fin_transaction", action="GET")
             user_access_predict_iris_post = AccessPolicy(role_id=user_role_id, resource="/predict_fin_transaction", action="POST")
+            user_access_predict_events_get = AccessPolicy(role_id=user_role_id, resource="/predict_fin_transaction/events", action="GET")
+            user_access_predict_upload_post = AccessPolicy(role_id=user_role_id, resource="/predict_fin_transaction/upload", action="POST")
             user_access_profile_get = AccessPolicy(role_id=user_role_id, resource="/api/user/profile", action="GET")
             user_access_predict_post = AccessPolicy(role_id=user_role_id, resource="/api/predict/", action="POST")
             user_access_predict_task_create_post = AccessPolicy(role_id=user_role_id, resource="/api/predict/task/create", action="POST")
-            user_access_predict_task_status_get = AccessPolicy(role_id=user_role_id, resource="/api/predict/task/status/", action="GET")
-            user_access_predict_task_result_get = AccessPolicy(role_id=user_role_id, resource="/api/predict/task/result/", action="GET")
+            user_access_predict_task_status_get = AccessPolicy(role_id=user_role_id, resource="/api/predict/task/status/{task_id}", action="GET")
+            user_access_predict_task_result_get = AccessPolicy(role_id=user_role_id, resource="/api/predict/task/result/{task_id}", action="GET")
+            user_access_predict_task_events_get = AccessPolicy(role_id=user_role_id, resource="/api/predict/task/events/{task_id}", action="GET")
+            user_access_predict_task_upload_post = AccessPolicy(role_id=user_role_id, resource="/api/predict/task/upload", action="POST")
+            user_access_predict_score_post = AccessPolicy(role_id=user_role_id, resource="/api/predict/score", action="POST")
+            user_access_predict_score_rpc_post = AccessPolicy(role_id=user_role_id, resource="/api/predict/score/rpc", action="POST")
+            user_access_predict_score_stats_get = AccessPolicy(role_id=user_role_id, resource="/api/predict/score/stats", action="GET")
             session.add_all(
                 [
                     admin_access_get,
@@ -139,11 +159,18 @@ def init_data() -> None:
                     user_access_predictions_get,
                     user_access_predict_iris_get,
                     user_access_predict_iris_post,
+                    user_access_predict_events_get,
+                    user_access_predict_upload_post,
                     user_access_profile_get,
                     user_access_predict_post,
                     user_access_predict_task_create_post,
                     user_access_predict_task_status_get,
                     user_access_predict_task_result_get,
+                    user_access_predict_task_events_get,
+                    user_access_predict_task_upload_post,
+                    user_access_predict_score_post,
+                    user_access_predict_score_rpc_post,
+                    user_access_predict_score_stats_get,
                 ]
             )
             session.commit()
@@ -211,9 +238,36 @@ def init_data() -> None:
 
 
 @app.on_event("startup")
-def on_startup() -> None:
+async def on_startup() -> None:
     logger.info("Запуск приложения: инициализация базы данных и данных")
     init_db()
     logger.info("База данных инициализирована")
     init_data()
     logger.info("Данные инициализированы")
+    # Политики доступа загружаются в память один раз, далее - по TTL
+    with Session(engine) as session:
+        access_policy_cache.load(session)
+    # Счётчики дашборда: первичная сверка и периодическое исправление дрейфа
+    run_reconciliation()
+    app.state.stats_reconcile_task = asyncio.create_task(reconcile_counters_periodically(get_settings().STATS_RECONCILE_INTERVAL))
+    # Синхронная оценка в пуле процессов: модель загружается в каждый процесс до приёма запросов
+    if get_settings().SCORING_ENABLED:
+        await asyncio.to_thread(in_process_scorer.start)
+    # RPC-оценка воркерами: поток соединения с RabbitMQ принимает ответы и разрешает ожидающие запросы
+    if get_settings().RPC_SCORING_ENABLED:
+        rpc_client.start()
+    # Одно соединение LISTEN на процесс: уведомления о завершении задач от всех реплик
+    if engine.dialect.name == "postgresql":
+        task_status_listener.start(listener_conninfo(engine.url))
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    stats_reconcile_task = getattr(app.state, "stats_reconcile_task", None)
+    if stats_reconcile_task is not None:
+        stats_reconcile_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await stats_reconcile_task
+    in_process_scorer.shutdown()
+    rpc_client.stop()
+    await task_status_listener.stop()
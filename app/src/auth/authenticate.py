@@ -1,15 +1,15 @@
-from typing import Optional, cast
+from typing import Any, Optional, cast
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 from sqlmodel import Session
 from src.auth.cookieauth import OAuth2PasswordBearerWithCookie
-from src.auth.jwt_handler import verify_access_token
+from src.auth.jwt_handler import verify_access_token_cached
 from src.database.config import get_settings
 from src.database.database import get_session
 from src.models.user import User
-from src.services.crud.user import get_user_by_email
+from src.services.crud.user import get_user_by_email, get_user_by_email_cached
 from src.services.logging.logging import get_logger
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/oauth/signin")
@@ -28,12 +28,26 @@ def get_secret() -> str:
     return key
 
 
-def authenticate(token: str = Depends(oauth2_scheme), secret_key: str = Depends(get_secret)) -> str:
+def get_token_payload(request: Request, token: str, secret_key: str) -> dict[str, Any]:
+    """
+    Получить payload access_token, верифицированного ранее в рамках этого запроса (AccessControlMiddleware
+    сохраняет его в request.state), или верифицировать токен через кэш verified_token_cache.
+    """
+    state = request.state
+    if getattr(state, "access_token", None) == token:
+        return cast(dict[str, Any], state.token_payload)
+    payload = verify_access_token_cached(token, secret_key=secret_key)
+    state.access_token = token
+    state.token_payload = payload
+    return payload
+
+
+def authenticate(request: Request, token: str = Depends(oauth2_scheme), secret_key: str = Depends(get_secret)) -> str:
     if not token:
         logger.warning("Попытка аутентификации без токена")
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Sign in for access")
     try:
-        decoded_token = verify_access_token(token, secret_key=secret_key)
+        decoded_token = get_token_payload(request, token, secret_key)
         logger.info("Пользователь успешно аутентифицирован (user=%s)", decoded_token.get("user"))
         return cast(str, decoded_token["user"])
     except Exception as exc:
@@ -42,6 +56,7 @@ def authenticate(token: str = Depends(oauth2_scheme), secret_key: str = Depends(
 
 
 def authenticate_via_cookies(
+    request: Request,
     db: Session = Depends(get_session),
     token: str = Depends(oauth2_scheme_cookie),
     secret_key: str = Depends(get_secret),
@@ -50,7 +65,7 @@ def authenticate_via_cookies(
         logger.info("Попытка аутентификации через куки без токена")
         return None
     try:
-        payload = verify_access_token(token, secret_key=secret_key)
+        payload = get_token_payload(request, token, secret_key)
         user_data = payload.get("user")
         if user_data is None:
             logger.warning("Отсутствуют данные пользователя в токене (cookies)")
@@ -59,13 +74,14 @@ def authenticate_via_cookies(
             "Пользователь успешно аутентифицирован через куки (email=%s)",
             user_data.get("email"),
         )
-        return get_user_by_email(email=user_data.get("email"), session=db)
+        return get_user_by_email_cached(email=user_data.get("email"), session=db)
     except Exception as exc:
         logger.error("Ошибка аутентификации через куки: %s", exc)
         return None
 
 
 def get_current_user(
+    request: Request,
     db: Session = Depends(get_session),
     token: str = Depends(oauth2_scheme),
     secret_key: str = Depends(get_secret),
@@ -76,7 +92,7 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = verify_access_token(token, secret_key=secret_key)
+        payload = get_token_payload(request, token, secret_key)
         user_data = payload.get("user")
         if user_data is None:
             logger.warning("Не найдены данные пользователя в токене при получении текущего пользователя")
@@ -93,6 +109,7 @@ def get_current_user(
 
 
 def get_current_user_via_cookies(
+    request: Request,
     db: Session = Depends(get_session),
     token: str = Depends(oauth2_scheme_cookie),
     secret_key: str = Depends(get_secret),
@@ -103,7 +120,7 @@ def get_current_user_via_cookies(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = verify_access_token(token, secret_key=secret_key)
+        payload = get_token_payload(request, token, secret_key)
         user_data = payload.get("user")
         if user_data is None:
             logger.warning("Не найдены данные пользователя в токене (via cookies)")
@@ -111,7 +128,7 @@ def get_current_user_via_cookies(
     except JWTError as exc:
         logger.error("JWT ошибка при получении пользователя через куки: %s", exc)
         raise credentials_exception
-    user = get_user_by_email(email=user_data.get("email"), session=db)
+    user = get_user_by_email_cached(email=user_data.get("email"), session=db)
     if user is None:
         logger.warning("Пользователь с email %s не найден (via cookies)", user_data.get("email"))
         raise credentials_exception
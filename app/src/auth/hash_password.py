@@ -1,12 +1,73 @@
-from typing import cast
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, Tuple, TypeVar, cast
 
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
+from src.database.config import get_settings
 from src.services.logging.logging import get_logger
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# min/max_rounds совпадают с текущей стоимостью: хэши с любой другой стоимостью считаются
+# устаревшими и пересчитываются при следующем успешном входе (verify_and_update)
+_bcrypt_rounds = get_settings().BCRYPT_ROUNDS
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=_bcrypt_rounds,
+    bcrypt__min_rounds=_bcrypt_rounds,
+    bcrypt__max_rounds=_bcrypt_rounds,
+)
 logger = get_logger(logger_name="auth.hash_password")
 
 
+class PasswordHashExecutor:
+    """
+    Ограниченный пул потоков для bcrypt.
+
+    Хэширование занимает сотни миллисекунд CPU; bcrypt отпускает GIL, поэтому в отдельных потоках
+    оно не блокирует цикл событий. Одновременно выполняется не более max_workers операций,
+    остальные ждут в очереди пула. Если в работе и в очереди уже max_pending операций,
+    новая отклоняется с 503, чтобы шквал логинов не копил бесконечную очередь.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                logger.warning("Очередь хэширования паролей переполнена (%d операций)", self._pending)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent password operations",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, partial(func, *args))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+password_hash_executor = PasswordHashExecutor(
+    max_workers=get_settings().PASSWORD_HASH_WORKERS,
+    max_pending=get_settings().PASSWORD_HASH_MAX_PENDING,
+)
+
+
 class HashPassword:
     def create_hash(self, password: str) -> str:
         logger.debug("Вызван метод create_hash для генерации пароля")
@@ -24,3 +85,33 @@ class HashPassword:
         except Exception as exc:
             logger.error("Ошибка при проверке хэша пароля: %s", exc)
             return False
+
+    def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Проверить пароль и, если хэш создан с устаревшими параметрами (например, другой стоимостью bcrypt),
+        вернуть новый хэш того же пароля для сохранения.
+
+        Возвращает:
+            (результат проверки, новый хэш или None, если пересчёт не нужен).
+        """
+        logger.debug("Вызван метод verify_and_update для проверки пароля")
+        try:
+            result, new_hash = pwd_context.verify_and_update(plain_password, hashed_password)
+        except Exception as exc:
+            logger.error("Ошибка при проверке хэша пароля: %s", exc)
+            return False, None
+        if not result:
+            logger.warning("Неуспешная верификация пароля")
+            return False, None
+        logger.info("Успешная верификация пароля")
+        if new_hash is not None:
+            logger.info("Хэш пароля создан с устаревшими параметрами и будет пересчитан")
+        return True, cast(Optional[str], new_hash)
+
+    async def create_hash_async(self, password: str) -> str:
+        """create_hash в пуле password_hash_executor, не блокируя цикл событий."""
+        return await password_hash_executor.run(self.create_hash, password)
+
+    async def verify_and_update_async(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """verify_and_update в пуле password_hash_executor, не блокируя цикл событий."""
+        return await password_hash_executor.run(self.verify_and_update, plain_password, hashed_password)
@@ -1,9 +1,13 @@
+import hashlib
+import threading
 import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any
+from typing import Any, Optional, Tuple
 
 from fastapi import HTTPException, status
 from jose import JWTError, jwt
+from src.database.config import get_settings
 from src.services.logging.logging import get_logger
 
 logger = get_logger(logger_name="auth.jwt_handler")
@@ -39,3 +43,69 @@ def verify_access_token(token: str, secret_key: str) -> dict[str, Any]:
     except JWTError as exc:
         logger.error("Неуспешная верификация access_token: %s", exc)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token") from exc
+
+
+class VerifiedTokenCache:
+    """
+    Ограниченный LRU-кэш успешно верифицированных access_token.
+
+    Ключ - SHA-256 от секрета и токена (сами токены в памяти не хранятся), значение - payload
+    и момент истечения токена из поля `expires`. Запись действительна до истечения токена,
+    поэтому каждый токен проверяет подпись один раз на процесс. Неуспешные проверки не кэшируются.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, Tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token: str, secret_key: str) -> bytes:
+        return hashlib.sha256(f"{secret_key}\0{token}".encode()).digest()
+
+    def get(self, token: str, secret_key: str) -> Optional[dict[str, Any]]:
+        key = self.digest(token, secret_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, payload = entry
+            if time.time() > expires:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, token: str, secret_key: str, payload: dict[str, Any]) -> None:
+        key = self.digest(token, secret_key)
+        with self._lock:
+            self._entries[key] = (float(payload["expires"]), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+verified_token_cache = VerifiedTokenCache(maxsize=get_settings().TOKEN_CACHE_SIZE)
+
+
+def verify_access_token_cached(token: str, secret_key: str) -> dict[str, Any]:
+    """
+    Верифицировать access_token с использованием кэша verified_token_cache.
+
+    Возвращаемый payload общий для всех запросов с этим токеном и не должен изменяться.
+    Истёкший или невалидный токен проверяется заново и приводит к тем же ошибкам, что и verify_access_token.
+    """
+    payload = verified_token_cache.get(token, secret_key)
+    if payload is not None:
+        logger.debug("Access_token найден в кэше верифицированных токенов")
+        return payload
+    payload = verify_access_token(token, secret_key=secret_key)
+    verified_token_cache.put(token, secret_key, payload)
+    return payload
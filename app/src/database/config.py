@@ -21,6 +21,29 @@ class Settings(BaseSettings):
         DB_USER (Optional[str]): Имя пользователя для аутентификации с базой данных.
         DB_PASS (Optional[str]): Пароль для пользователя базы данных.
         DB_NAME (Optional[str]): Имя базы данных, к которой нужно подключиться.
+        STATS_RECONCILE_INTERVAL (int): Интервал фоновой сверки счётчиков дашборда в секундах.
+        ACCESS_POLICY_CACHE_TTL (int): Время жизни кэша политик доступа в секундах.
+        TOKEN_CACHE_SIZE (int): Максимальное число верифицированных access_token в кэше процесса.
+        USER_CACHE_TTL (int): Время жизни пользователя в кэше аутентификации по cookie в секундах.
+        USER_CACHE_SIZE (int): Максимальное число пользователей в кэше аутентификации по cookie.
+        BCRYPT_ROUNDS (int): Стоимость bcrypt; хэши с другой стоимостью пересчитываются при входе.
+        PASSWORD_HASH_WORKERS (int): Число потоков, одновременно выполняющих хэширование паролей.
+        PASSWORD_HASH_MAX_PENDING (int): Максимум операций хэширования в работе и в очереди, сверх него - 503.
+        SCORING_ENABLED (bool): Включить синхронную оценку POST /api/predict/score в пуле процессов приложения.
+        SCORING_MODEL_PATH (Optional[str]): Каталог ml_worker с antifraud_model_handler.py и артефактами модели.
+        SCORING_WORKERS (int): Число процессов пула оценки.
+        SCORING_MAX_CONCURRENCY (int): Максимум одновременно оцениваемых пакетов, сверх него - 503.
+        SCORING_TIMEOUT (float): Таймаут оценки пакета в секундах, после него - 504.
+        SCORING_MAX_BATCH (int): Максимальный размер пакета для синхронной оценки.
+        RPC_SCORING_ENABLED (bool): Включить синхронную оценку POST /api/predict/score/rpc воркерами через RPC-очередь RabbitMQ.
+        RPC_SCORING_TIMEOUT (float): Таймаут ожидания ответа воркера в секундах, после него - 504.
+        RPC_SCORING_MAX_PENDING (int): Максимум RPC-запросов, ожидающих ответа, сверх него - 503.
+        TASK_STATUS_CACHE_TTL (int): Время жизни статуса задачи в кэше процесса в секундах.
+        TASK_STATUS_CACHE_SIZE (int): Максимальное число статусов задач в кэше процесса.
+        TASK_IDEMPOTENCY_WINDOW (int): Окно удержания ключа идемпотентности POST /api/predict/task/create в секундах.
+        UPLOAD_CHUNK_ROWS (int): Число строк загружаемого CSV/Parquet/Arrow файла в одном сообщении задачи.
+        BULK_UPLOAD_MAX_BYTES (int): Максимальный размер тела POST /api/predict/task/upload в байтах.
+        TASK_RESULT_MAX_WAIT (float): Максимальное время long-poll ожидания GET /api/predict/task/result?wait= в секундах.
 
     Свойства:
         DATABASE_URL_asyncpg (str): Создает URL подключения для asyncpg.
@@ -46,6 +69,29 @@ class Settings(BaseSettings):
     RABBITMQ_QUEUE: Optional[str] = None
     RABBITMQ_DEFAULT_USER: Optional[str] = None
     RABBITMQ_DEFAULT_PASS: Optional[str] = None
+    STATS_RECONCILE_INTERVAL: int = 300
+    ACCESS_POLICY_CACHE_TTL: int = 60
+    TOKEN_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: int = 30
+    USER_CACHE_SIZE: int = 1000
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    SCORING_ENABLED: bool = False
+    SCORING_MODEL_PATH: Optional[str] = None
+    SCORING_WORKERS: int = 2
+    SCORING_MAX_CONCURRENCY: int = 8
+    SCORING_TIMEOUT: float = 0.2
+    SCORING_MAX_BATCH: int = 100
+    RPC_SCORING_ENABLED: bool = False
+    RPC_SCORING_TIMEOUT: float = 2.0
+    RPC_SCORING_MAX_PENDING: int = 256
+    TASK_STATUS_CACHE_TTL: int = 60
+    TASK_STATUS_CACHE_SIZE: int = 10000
+    TASK_IDEMPOTENCY_WINDOW: int = 86400
+    UPLOAD_CHUNK_ROWS: int = 5000
+    BULK_UPLOAD_MAX_BYTES: int = 1024 * 1024 * 1024
+    TASK_RESULT_MAX_WAIT: float = 60.0
 
     @property
     def DATABASE_URL_asyncpg(self) -> str:
@@ -1,21 +1,29 @@
 # from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 # from sqlalchemy.orm import Session, sessionmaker
 # from sqlalchemy import URL, create_engine, text
+from pathlib import Path
 from typing import Generator
 
 import sqlalchemy
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.engine import Connection
 from sqlmodel import Session, SQLModel, create_engine
 from src.services.logging.logging import get_logger
+from src.services.metrics.metrics import TimedQueuePool
 
 from .config import get_settings
 
 logger = get_logger(logger_name="database")
 
 engine = create_engine(
-    url=get_settings().DATABASE_URL_psycopg, echo=False, pool_size=5, max_overflow=10
+    url=get_settings().DATABASE_URL_psycopg, echo=False, poolclass=TimedQueuePool, pool_size=5, max_overflow=10
 )
 logger.info("Создан SQLAlchemy engine для %s", get_settings().DATABASE_URL_psycopg)
 
+# Конфигурация Alembic (каталог app): миграции схемы для баз, созданных предыдущими версиями приложения
+ALEMBIC_CONFIG = Path(__file__).resolve().parents[2] / "alembic.ini"
+
 
 def get_session() -> Generator[Session, None, None]:
     """
@@ -31,19 +39,30 @@ def get_session() -> Generator[Session, None, None]:
         raise
 
 
+def alembic_config(connection: Connection) -> Config:
+    """Конфигурация Alembic, выполняющая миграции в переданном соединении."""
+    config = Config(str(ALEMBIC_CONFIG))
+    config.attributes["connection"] = connection
+    return config
+
+
 def init_db() -> None:
     """
-    Инициализирует базу данных путем удаления всех существующих таблиц и последующего
-    их воссоздания на основе текущей метаданных SQLModel.
+    Инициализирует базу данных: пустую создаёт по текущим метаданным SQLModel и помечает
+    последней миграцией Alembic, существующую обновляет миграциями до последней (alembic upgrade head).
     """
     logger.info("Инициализация базы данных...")
     inspector = sqlalchemy.inspect(engine)
     existing_tables = inspector.get_table_names()
     logger.debug("Существующие таблицы в базе: %s", existing_tables)
-    if not existing_tables:
-        logger.info("Таблицы отсутствуют. Создание таблиц заново.")
-        SQLModel.metadata.drop_all(engine)
-        SQLModel.metadata.create_all(engine)
-        logger.info("Таблицы успешно созданы.")
-    else:
-        logger.info("Таблицы уже существуют. Воссоздание не требуется.")
+    with engine.begin() as connection:
+        if not existing_tables:
+            logger.info("Таблицы отсутствуют. Создание таблиц заново.")
+            SQLModel.metadata.drop_all(connection)
+            SQLModel.metadata.create_all(connection)
+            command.stamp(alembic_config(connection), "head")
+            logger.info("Таблицы успешно созданы.")
+        else:
+            logger.info("Таблицы уже существуют. Применение миграций.")
+            command.upgrade(alembic_config(connection), "head")
+            logger.info("Схема базы данных обновлена.")
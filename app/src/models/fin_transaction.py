@@ -19,6 +19,9 @@ if TYPE_CHECKING:
 
 
 class FinTransaction(SQLModel, table=True):
+    # Составной индекс для keyset-пагинации по (created_at, id)
+    __table_args__ = (sa.Index("ix_fintransaction_created_at_id", "created_at", "id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     TransactionID: int = Field(index=True)
     TransactionDT: int
@@ -60,7 +63,7 @@ class FinTransaction(SQLModel, table=True):
 
     isFraud: Optional[int] = Field(nullable=True, default=None)
 
-    task_id: Optional[int] = Field(sa_column=sa.Column(sa.Integer, sa.ForeignKey("task.id", ondelete="CASCADE")))
+    task_id: Optional[int] = Field(sa_column=sa.Column(sa.Integer, sa.ForeignKey("task.id", ondelete="CASCADE"), index=True))
     task: Optional["Task"] = Relationship(back_populates="fintransaction")
 
     created_at: datetime = Field(
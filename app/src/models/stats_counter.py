@@ -0,0 +1,30 @@
+"""Модель SQLModel для инкрементально поддерживаемых счётчиков статистики.
+
+Счётчики обновляются в той же транзакции, что и вставка/удаление транзакций и пользователей,
+поэтому дашборд читает готовые значения вместо COUNT(*) по большим таблицам.
+"""
+
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+# Имена счётчиков
+FIN_TRANSACTION_TOTAL = "fintransaction_total"
+FIN_TRANSACTION_FRAUD = "fintransaction_fraud"
+FIN_TRANSACTION_LEGIT = "fintransaction_legit"
+USER_TOTAL = "user_total"
+
+
+class StatsCounter(SQLModel, table=True):
+    """
+    Именованный счётчик статистики.
+
+    Атрибуты:
+        name (str): Имя счётчика, первичный ключ (например, "fintransaction_total").
+        value (int): Текущее значение счётчика.
+        updated_at (datetime): Время последнего обновления счётчика.
+    """
+
+    name: str = Field(primary_key=True)
+    value: int = Field(default=0, nullable=False)
+    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
+import sqlalchemy as sa
 from sqlmodel import Field, Relationship, SQLModel, text
 
 # Условный импорт для избежания циклических зависимостей
@@ -36,8 +37,24 @@ class Task(SQLModel, table=True):
         created_at (datetime): Временная метка, обозначающая, когда задача была создана. Это поле
                                автоматически устанавливается на текущую временную метку базой данных
                                с использованием `CURRENT_TIMESTAMP` в SQL и не может быть пустым.
+
+        updated_at (datetime): Время последней смены статуса; по нему строятся ETag и Last-Modified
+                               ответов о статусе и результате задачи.
+
+        idempotency_key (Optional[str]): Ключ идемпотентности отправки задачи (SHA-256). Уникальный индекс
+                                         не даёт двум репликам создать задачу для одного и того же повтора.
+
+        expected_chunks (Optional[int]): Число чанков задачи, отправленных в очередь по частям (потоковая
+                                         загрузка CSV); известно только после окончания загрузки.
+
+        received_chunks (int): Число разных чанков, результаты которых уже записаны (см. TaskChunk;
+                               повторные доставки не учитываются). Задача завершается,
+                               когда оно достигает expected_chunks.
     """
 
+    # Уникальный индекс ключа идемпотентности; NULL (задачи без ключа) не конфликтуют между собой
+    __table_args__ = (sa.Index("ux_task_idempotency_key", "idempotency_key", unique=True),)
+
     id: int = Field(default=None, primary_key=True)
     task_id: str = Field(default=None, nullable=False)
 
@@ -53,3 +70,7 @@ class Task(SQLModel, table=True):
         nullable=False,
         sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
     )
+    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
+    idempotency_key: Optional[str] = Field(default=None, max_length=64)
+    expected_chunks: Optional[int] = Field(default=None)
+    received_chunks: int = Field(default=0)
@@ -0,0 +1,22 @@
+"""Модель SQLModel для учёта полученных результатов чанков задачи.
+
+Воркер повторяет отправку результата при сбоях, а брокер заново доставляет неподтверждённые
+сообщения, поэтому результат одного чанка может прийти несколько раз. Первичный ключ (task_id, chunk)
+фиксирует каждый чанк ровно один раз, и повторы не завершают задачу раньше времени.
+"""
+
+import sqlalchemy as sa
+from sqlmodel import Field, SQLModel
+
+
+class TaskChunk(SQLModel, table=True):
+    """
+    Полученный результат чанка задачи, отправленной в очередь по частям.
+
+    Атрибуты:
+        task_id (int): Внутренний ID задачи (Task.id); часть первичного ключа.
+        chunk (int): Номер чанка в задаче; часть первичного ключа.
+    """
+
+    task_id: int = Field(sa_column=sa.Column(sa.Integer, sa.ForeignKey("task.id", ondelete="CASCADE"), primary_key=True))
+    chunk: int = Field(primary_key=True)
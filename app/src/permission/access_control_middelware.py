@@ -1,131 +1,162 @@
-import re
-from typing import Any, Callable
+from typing import Optional
 
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 from jose import exceptions
-from sqlmodel import Session, select
-from src.auth.jwt_handler import verify_access_token
+from src.auth.jwt_handler import verify_access_token_cached
 from src.database.config import get_settings
-from src.database.database import get_session
-from src.models.access_policy import AccessPolicy
-from src.models.role import Role
+from src.permission.policy_cache import access_policy_cache
+from src.permission.route_resolver import RouteTemplateResolver
 from src.services.logging.logging import get_logger
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 logger = get_logger(logger_name="permission.access_control_middleware")
 
-
-class AccessControlMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Any:
-        db: Session = next(get_session())
+# Маршруты, не требующие проверки доступа
+PUBLIC_PATHS = frozenset(
+    [
+        "/favicon.ico",
+        "/docs",
+        "/openapi.json",
+        "/redoc",
+        "/",
+        "/static/bootstrap/css/bootstrap.min.css",
+        "/static/styles.css",
+        "/login",
+        "/logout",
+        "/register",
+        "/error",
+        "/api/oauth/signin",
+        "/api/oauth/signup",
+        "/api/predict/send_task_result",
+        "/metrics",
+    ]
+)
+
+
+class AccessControlMiddleware:
+    """
+    ASGI-middleware проверки доступа по JWT и политикам доступа.
+
+    Реализована как «чистое» ASGI-приложение, а не BaseHTTPMiddleware: запрос и ответ
+    передаются дальше без дополнительных задач и потоков памяти, поэтому потоковые ответы
+    (StreamingResponse) не буферизуются. При отказе в доступе сразу отправляется JSON-ответ
+    401/403, приложение не вызывается.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        # Создаётся при первом запросе, когда известен роутер приложения
+        self.route_resolver: Optional[RouteTemplateResolver] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        response: Optional[Response] = None
         try:
-            # Bypass verification for service routes
-            if request.url.path in [
-                "/favicon.ico",
-                "/docs",
-                "/openapi.json",
-                "/redoc",
-                "/",
-                "/static/bootstrap/css/bootstrap.min.css",
-                "/static/styles.css",
-                "/login",
-                "/logout",
-                "/register",
-                "/error",
-                "/api/oauth/signin",
-                "/api/oauth/signup",
-                "/api/predict/send_task_result",
-            ]:
-                logger.debug("Маршрут '%s' не требует проверки доступа.", request.url.path)
-                return await call_next(request)
-
-            # Пытаемся получить токен из заголовка Authorization
-            token = request.headers.get("Authorization")
-            # Если в заголовке нет, пробуем извлечь из cookie
-            if not token:
-                token = request.cookies.get("access_token")
-
-            # Если токен не найден или не начинается с "Bearer ", выбрасываем ошибку
-            if token is None or not token.startswith("Bearer "):
-                logger.warning("Не передан токен авторизации для %s", request.url.path)
-                raise HTTPException(status_code=401, detail="Authorization token missing")
-
-            # Удаляем "Bearer " из токена
-            token = token[7:]
-            logger.debug("Попытка верификации access_token для запроса %s", request.url.path)
-            # Проверяем валидность токена и получаем payload пользователя
-            secret_key = get_settings().SECRET_KEY
-            if secret_key is None:
-                raise RuntimeError("SECRET_KEY is not set in settings!")
-            payload = verify_access_token(token=token, secret_key=secret_key)
-            user = payload.get("user") or {}
-            user_role = user.get("role")
-            user_email = user.get("email", "unknown")
-
-            logger.info(
-                "Пользователь '%s' с ролью '%s' обращается к %s (%s)",
-                user_email,
-                user_role,
-                request.url.path,
-                request.method,
-            )
-
-            # Если пользователь - админ, предоставляем полный доступ без дальнейших проверок
-            if user_role == "admin":
-                logger.debug("Пользователь с ролью admin получил полный доступ.")
-                return await call_next(request)
-
-            # Проверка доступа для остальных ролей
-            path = request.url.path
-            method = request.method.lower()
-            # Вырезаем UUID и числовые id для сравнения маршрутов с политиками доступа
-            uuid_pattern = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
-            id_pattern = re.compile(r"(\d+)")
-            clear_path = uuid_pattern.sub("%", path)
-            clear_path = id_pattern.sub("%", clear_path)
-            role_instance = db.query(Role).filter(Role.name == user_role).first()
-
-            # Формируем SQL-запрос на доступ по ролям и экшенам
-            statement = select(AccessPolicy).where(
-                AccessPolicy.role == role_instance,
-                AccessPolicy.resource.like(clear_path),  # type: ignore
-                AccessPolicy.action == method.upper(),
-            )
-            policy = db.exec(statement).all()
-
-            # Если политика не найдена, запрещаем доступ
-            if not policy:
-                logger.warning(
-                    "Доступ запрещён для пользователя '%s' (%s) к ресурсу %s метод %s",
-                    user_email,
-                    user_role,
-                    clear_path,
-                    method.upper(),
-                )
-                raise HTTPException(status_code=403, detail="Forbidden")
-
-            # Доступ разрешён - пишем debug
-            logger.debug(
-                "Доступ разрешён для пользователя '%s' (%s) к %s %s",
-                user_email,
-                user_role,
-                clear_path,
-                method.upper(),
-            )
-            return await call_next(request)
-
+            await self.authorize(request)
         # Обработка HTTP ошибок авторизации/доступа
         except HTTPException as e:
             logger.error("HTTPException: %s (%s %s)", e.detail, request.method, request.url.path)
-            return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
-
+            response = JSONResponse(status_code=e.status_code, content={"detail": e.detail})
         # Специальная обработка истекшего токена
-        except exceptions.ExpiredSignatureError as exc:
+        except exceptions.ExpiredSignatureError:
             logger.warning("Token expired при попытке доступа к %s", request.url.path)
-            raise HTTPException(status_code=401, detail="Token expired") from exc
-
+            response = JSONResponse(status_code=401, content={"detail": "Token expired"})
         # Обработка других ошибок токена
-        except exceptions.JWTError as exc:
+        except exceptions.JWTError:
             logger.error("Invalid token при попытке доступа к %s", request.url.path)
-            raise HTTPException(status_code=401, detail="Invalid token") from exc
+            response = JSONResponse(status_code=401, content={"detail": "Invalid token"})
+
+        if response is not None:
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    async def authorize(self, request: Request) -> None:
+        """
+        Проверить доступ к запрошенному маршруту.
+
+        Выбрасывает HTTPException с кодом 401 (нет или невалиден токен) или 403 (нет политики доступа),
+        если запрос нельзя передавать приложению.
+        """
+        path = request.url.path
+        # Bypass verification for service routes
+        if path in PUBLIC_PATHS:
+            logger.debug("Маршрут '%s' не требует проверки доступа.", path)
+            return
+
+        # Пытаемся получить токен из заголовка Authorization
+        token = request.headers.get("Authorization")
+        # Если в заголовке нет, пробуем извлечь из cookie
+        if not token:
+            token = request.cookies.get("access_token")
+
+        # Если токен не найден или не начинается с "Bearer ", выбрасываем ошибку
+        if token is None or not token.startswith("Bearer "):
+            logger.warning("Не передан токен авторизации для %s", path)
+            raise HTTPException(status_code=401, detail="Authorization token missing")
+
+        # Удаляем "Bearer " из токена
+        token = token[7:]
+        logger.debug("Попытка верификации access_token для запроса %s", path)
+        # Проверяем валидность токена и получаем payload пользователя
+        secret_key = get_settings().SECRET_KEY
+        if secret_key is None:
+            raise RuntimeError("SECRET_KEY is not set in settings!")
+        payload = verify_access_token_cached(token=token, secret_key=secret_key)
+        # Сохраняем payload в scope["state"]: зависимости authenticate/get_current_user* не проверяют токен повторно
+        request.state.access_token = token
+        request.state.token_payload = payload
+        user = payload.get("user") or {}
+        user_role = user.get("role")
+        user_email = user.get("email", "unknown")
+        method = request.method
+
+        logger.info(
+            "Пользователь '%s' с ролью '%s' обращается к %s (%s)",
+            user_email,
+            user_role,
+            path,
+            method,
+        )
+
+        # Если пользователь - админ, предоставляем полный доступ без дальнейших проверок
+        if user_role == "admin":
+            logger.debug("Пользователь с ролью admin получил полный доступ.")
+            return
+
+        # Проверка доступа для остальных ролей по шаблону маршрута (например, /api/predict/task/status/{task_id})
+        if self.route_resolver is None:
+            self.route_resolver = RouteTemplateResolver(request.app.router)
+        route_template = self.route_resolver.resolve(method, path)
+
+        # Проверяем доступ по политикам, закэшированным в памяти (БД читается только при истечении TTL)
+        if access_policy_cache.is_stale():
+            await run_in_threadpool(access_policy_cache.ensure_fresh)
+        allowed = route_template is not None and access_policy_cache.is_allowed(str(user_role), route_template, method)
+
+        # Если политика не найдена, запрещаем доступ
+        if not allowed:
+            logger.warning(
+                "Доступ запрещён для пользователя '%s' (%s) к ресурсу %s метод %s",
+                user_email,
+                user_role,
+                route_template or path,
+                method,
+            )
+            raise HTTPException(status_code=403, detail="Forbidden")
+
+        # Доступ разрешён - пишем debug
+        logger.debug(
+            "Доступ разрешён для пользователя '%s' (%s) к %s %s",
+            user_email,
+            user_role,
+            route_template,
+            method,
+        )
@@ -0,0 +1,93 @@
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from sqlmodel import Session, select
+from src.database.config import get_settings
+from src.database.database import engine
+from src.models.access_policy import AccessPolicy
+from src.models.role import Role
+from src.services.logging.logging import get_logger
+
+logger = get_logger(logger_name="permission.policy_cache")
+
+PATH_PARAM_PATTERN = re.compile(r"\{[^}]*\}")
+
+
+@lru_cache(maxsize=1024)
+def legacy_resource(template: str) -> str:
+    """
+    Ресурс в старом формате для шаблона маршрута: параметры пути вырезаются
+    (`/api/predict/task/status/{task_id}` -> `/api/predict/task/status/`).
+
+    Так ранее созданные политики продолжают действовать после перехода на шаблоны маршрутов.
+    """
+    return PATH_PARAM_PATTERN.sub("", template)
+
+
+class AccessPolicyCache:
+    """
+    Скомпилированные в памяти политики доступа, сгруппированные по (роль, HTTP-метод).
+
+    Политики загружаются из БД целиком при старте приложения и перечитываются только по истечении TTL,
+    поэтому проверка доступа в обработке запроса не обращается к БД. Приложение не меняет политики
+    во время работы: правки, внесённые в БД напрямую, вступают в силу не позже чем через TTL.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._policies: Dict[Tuple[str, str], FrozenSet[str]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def load(self, session: Session) -> None:
+        """
+        Прочитать все политики доступа и атомарно заменить ими текущие.
+        """
+        statement = select(Role.name, AccessPolicy.resource, AccessPolicy.action).join_from(AccessPolicy, Role, AccessPolicy.role_id == Role.id)  # type: ignore[arg-type]
+        rows = session.exec(statement).all()
+        grouped: Dict[Tuple[str, str], set[str]] = {}
+        for role_name, resource, action in rows:
+            grouped.setdefault((role_name, action.upper()), set()).add(resource)
+        self._policies = {key: frozenset(resources) for key, resources in grouped.items()}
+        self._loaded_at = time.monotonic()
+        logger.info("Загружено %d политик доступа для %d пар (роль, метод)", len(rows), len(self._policies))
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def ensure_fresh(self) -> None:
+        """
+        Перечитать политики из БД, если кэш устарел. При ошибке БД продолжаем работать на старых политиках.
+        """
+        if not self.is_stale():
+            return
+        with self._lock:
+            if not self.is_stale():
+                return
+            try:
+                with Session(engine) as session:
+                    self.load(session)
+            except Exception as exc:
+                if self._loaded_at is None:
+                    raise
+                # Откладываем следующую попытку на TTL, чтобы не обращаться к недоступной БД на каждом запросе
+                self._loaded_at = time.monotonic()
+                logger.error("Не удалось обновить политики доступа, используются прежние: %s", exc)
+
+    def is_allowed(self, role: str, route_template: str, action: str) -> bool:
+        """
+        Проверить, есть ли у роли политика для шаблона маршрута и действия.
+
+        Ресурс политики сравнивается с шаблоном маршрута точно (например, `/api/predict/task/status/{task_id}`)
+        либо с его старой формой без параметров пути.
+        """
+        resources = self._policies.get((role, action.upper()))
+        if not resources:
+            return False
+        return route_template in resources or legacy_resource(route_template) in resources
+
+
+access_policy_cache = AccessPolicyCache(ttl=get_settings().ACCESS_POLICY_CACHE_TTL)
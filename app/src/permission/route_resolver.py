@@ -0,0 +1,60 @@
+from typing import Collection, List, Optional, Pattern, Tuple
+
+from starlette.routing import BaseRoute, Router, WebSocketRoute
+
+# (путь маршрута без параметров, регулярное выражение маршрута с параметрами, HTTP-методы, шаблон)
+CompiledRoute = Tuple[Optional[str], Optional[Pattern[str]], Optional[Collection[str]], str]
+
+
+class RouteTemplateResolver:
+    """
+    Сопоставляет запрос шаблону маршрута Starlette/FastAPI (например, `/api/predict/task/status/{task_id}`).
+
+    Маршруты разбираются один раз при первом обращении: для маршрутов без параметров запоминается
+    сам путь (сравнение строк), для остальных - уже скомпилированный Starlette `path_regex`.
+    На запрос не создаются дочерние scope и не вызываются конвертеры параметров.
+    """
+
+    def __init__(self, router: Router) -> None:
+        self.router = router
+        self._routes: Optional[List[CompiledRoute]] = None
+
+    def _compile(self) -> List[CompiledRoute]:
+        compiled: List[CompiledRoute] = []
+        for route in self.router.routes:
+            template = self._template(route)
+            if template is None:
+                continue
+            methods = getattr(route, "methods", None)
+            if "{" in template or not hasattr(route, "methods"):
+                # Маршрут с параметрами или Mount - сопоставляем по регулярному выражению
+                compiled.append((None, getattr(route, "path_regex"), methods, template))
+            else:
+                compiled.append((template, None, methods, template))
+        return compiled
+
+    @staticmethod
+    def _template(route: BaseRoute) -> Optional[str]:
+        if isinstance(route, WebSocketRoute) or not hasattr(route, "path_regex"):
+            return None
+        return getattr(route, "path", None)
+
+    def resolve(self, method: str, path: str) -> Optional[str]:
+        """
+        Вернуть шаблон первого маршрута с полным совпадением (путь и метод), либо шаблон маршрута,
+        совпавшего только по пути (роутер затем ответит 405), либо None, если маршрут не найден.
+        """
+        if self._routes is None:
+            self._routes = self._compile()
+        partial: Optional[str] = None
+        for static_path, regex, methods, template in self._routes:
+            if static_path is not None:
+                if static_path != path:
+                    continue
+            elif regex is None or not regex.match(path):
+                continue
+            if methods is None or method in methods:
+                return template
+            if partial is None:
+                partial = template
+        return partial
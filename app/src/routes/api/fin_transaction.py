@@ -1,7 +1,8 @@
-from typing import Any, List, cast
+from typing import Any, List, Optional
 
 import src.services.crud.fin_transaction as FinTransactionService
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
 from sqlmodel import Session
 from src.auth.authenticate import authenticate
 from src.database.database import get_session
@@ -14,19 +15,31 @@ fin_transaction_router = APIRouter(tags=["Transaction"])
 logger = get_logger(logger_name="api.fin_transaction")
 
 
-@fin_transaction_router.get("/", response_model=List[FinTransaction])
+class FinTransactionPage(BaseModel):
+    items: List[FinTransaction]
+    next_cursor: Optional[str] = None
+
+
+@fin_transaction_router.get("/", response_model=FinTransactionPage)
 async def retrieve_all_transactions(
+    limit: int = Query(100, ge=1, le=1000, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"),
     session: Session = Depends(get_session),
     user: dict[str, Any] = Depends(authenticate),
-) -> List[FinTransaction]:
+) -> FinTransactionPage:
     logger.info(
-        "Пользователь '%s' (id=%s) запрашивает все транзакции.",
+        "Пользователь '%s' (id=%s) запрашивает страницу транзакций (limit=%s).",
         user.get("name"),
         user.get("id"),
+        limit,
     )
-    transactions = FinTransactionService.get_all_fin_transactions(session=session)
+    try:
+        transactions, next_cursor = FinTransactionService.get_fin_transactions_page(session=session, limit=limit, cursor=cursor)
+    except ValueError as exc:
+        logger.warning("Передан невалидный курсор: %s", cursor)
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
     logger.debug("Получено транзакций: %d", len(transactions))
-    return cast(List[FinTransaction], transactions)
+    return FinTransactionPage(items=transactions, next_cursor=next_cursor)
 
 
 @fin_transaction_router.get("/{id}", response_model=FinTransaction)
@@ -53,7 +53,7 @@ async def signup(data: UserCreate, session: Session = Depends(get_session)) -> U
     new_user: User = User(
         name=data.name,
         email=data.email,
-        hashed_password=hash_password.create_hash(data.password),
+        hashed_password=await hash_password.create_hash_async(data.password),
         role_id=user_role.id,
     )
 
@@ -98,7 +98,11 @@ async def sign_user_in(
         logger.warning(f"Вход отклонён: email={user.username} (id={user_exist.id}) не активен")
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User does not active")
 
-    if hash_password.verify_hash(user.password, user_exist.hashed_password):
+    verified, new_hash = await hash_password.verify_and_update_async(user.password, user_exist.hashed_password)
+    if verified:
+        if new_hash is not None:
+            user_exist.hashed_password = new_hash
+            UserService.update_user(user_exist, session)
         access_token = create_access_token(
             {
                 "id": user_exist.id,
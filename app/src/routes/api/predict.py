@@ -1,19 +1,37 @@
+import asyncio
+import hashlib
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import tempfile
+import time
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterator, List, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+import orjson
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from schemas import PredictionCreate, PredictionResponse, TaskResponse
-from sqlmodel import Session
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
 from src.auth.authenticate import authenticate
+from src.database.config import get_settings
 from src.database.database import get_session
 from src.models.fin_transaction import FinTransaction
 from src.models.model import Model
 from src.models.task import Task
-from src.services.logging.logging import get_logger
+from src.services.crud.stats_counter import fin_transaction_deltas, increment_counters
+from src.services.crud.task import TaskStatusSnapshot, cache_task_status, find_task_by_idempotency_key, get_task_status_by_task_id, get_task_status_cached
+from src.services.events.task_events import TERMINAL_STATUSES, status_loader, task_event_hub, task_events_response, wait_for_terminal_status
+from src.services.events.task_notify import commit_task_status
+from src.services.ingest.columnar import COLUMNAR_CONTENT_TYPES, ColumnarFile, batch_to_messages
+from src.services.ingest.dispatch import all_chunks_received, finish_chunked_task, publish_chunk, record_chunk_result
+from src.services.logging.logging import get_logger, truncate_payload
 from src.services.rm.rm import rabbit_client
+from src.services.rm.rpc import rpc_client
+from src.services.scoring.scorer import in_process_scorer
 
 logging.getLogger("pika").setLevel(logging.INFO)
 
@@ -22,13 +40,35 @@ logger = get_logger(logger_name=__name__)
 
 predict_router = APIRouter(tags=["Model Predict"])
 
+# Размер пачки строк, читаемых серверным курсором при потоковой отдаче результатов
+STREAM_BATCH_SIZE = 500
+# Тело загрузки пишется во временный файл в потоке пачками такого размера, а не по одному чанку запроса
+UPLOAD_SPOOL_WRITE_BYTES = 1024 * 1024
+
+
+def task_idempotency_key(user: dict[str, Any], input_data: List[Dict[str, Any]], header_key: Optional[str]) -> str:
+    """
+    Ключ идемпотентности отправки задачи в рамках пользователя: из заголовка Idempotency-Key,
+    а без него - канонический дайджест пакета транзакций (JSON с отсортированными ключами).
+    """
+    if header_key:
+        source = b"key:" + header_key.encode("utf-8")
+    else:
+        source = b"body:" + orjson.dumps(input_data, option=orjson.OPT_SORT_KEYS)
+    scope = str(user.get("email", "")).encode("utf-8")
+    return hashlib.sha256(scope + b"\n" + source).hexdigest()
+
 
 @predict_router.post(
     "/task/create",
     response_model=TaskResponse,
-    description="Создать новую задачу предсказания и вернуть её идентификатор.",
+    description=(
+        "Создать новую задачу предсказания и вернуть её идентификатор. Повторная отправка того же пакета "
+        "(или с тем же заголовком Idempotency-Key) в течение TASK_IDEMPOTENCY_WINDOW возвращает уже созданную задачу."
+    ),
 )
 async def create_task(
+    response: Response,
     data: List[PredictionCreate] = Body(
         ...,
         example=[
@@ -88,12 +128,23 @@ async def create_task(
             }
         ],
     ),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     session: Session = Depends(get_session),
     user: dict[str, Any] = Depends(authenticate),
 ) -> TaskResponse:
 
     logger.info(f"Начато создание задачи предсказания пользователем {user.get('email', '[Unknown user]')}")
-    logger.debug(f"Данные получены для задачи: {data}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Данные получены для задачи (%d транзакций): %s", len(data), truncate_payload(data))
+
+    input_data = [pc.dict() for pc in data]
+    key = task_idempotency_key(user, input_data, idempotency_key)
+    window = get_settings().TASK_IDEMPOTENCY_WINDOW
+    existing = find_task_by_idempotency_key(key, session, window)
+    if existing is not None:
+        logger.info(f"Повторная отправка: возвращается существующая задача {existing.task_id}")
+        response.headers["Idempotent-Replayed"] = "true"
+        return TaskResponse.from_orm(existing)
 
     try:
         model = session.query(Model).first()
@@ -104,17 +155,35 @@ async def create_task(
         task_id = str(uuid4())
         logger.debug(f"Сгенерирован task_id: {task_id}")
 
+        # Задача записывается до публикации: уникальный индекс занимает ключ, и воркер не получит
+        # сообщение о задаче, которой ещё нет в БД
+        task = Task(task_id=task_id, status="init", model=model, idempotency_key=key)
+        session.add(task)
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            existing = find_task_by_idempotency_key(key, session, window)
+            if existing is None:
+                raise
+            logger.info(f"Параллельная отправка: возвращается существующая задача {existing.task_id}")
+            response.headers["Idempotent-Replayed"] = "true"
+            return TaskResponse.from_orm(existing)
+
         mltask = {
             "task_id": task_id,
-            "input_data": [pc.dict() for pc in data],
+            "input_data": input_data,
         }
 
-        logger.info(f"Отправка задачи в RabbitMQ: {mltask}")
-        rabbit_client.send_task(mltask)
+        logger.info("Отправка задачи %s в RabbitMQ (%d транзакций)", task_id, len(data))
+        if not rabbit_client.send_task(mltask):
+            # Задача не удаляется: её task_id мог уже получить параллельный запрос с тем же ключом.
+            # Она завершается с ошибкой, а ключ освобождается, чтобы повтор клиента поставил задачу заново
+            task.idempotency_key = None
+            commit_task_status(session, task, "error")
+            raise HTTPException(status_code=503, detail="Failed to enqueue task")
 
-        task = Task(task_id=task_id, status="init", model=model)
-        session.add(task)
-        session.commit()
+        cache_task_status(task)
         logger.info(f"Задача {task_id} успешно создана и записана в БД")
 
     except Exception as e:
@@ -125,28 +194,251 @@ async def create_task(
     return TaskResponse.from_orm(task)
 
 
+def publish_columnar(source: ColumnarFile, task_id: str, batch_rows: int) -> int:
+    """Отправить строки колоночного файла в очередь чанками по batch_rows строк; возвращает число чанков."""
+    chunks = 0
+    for batch in source.batches(batch_rows):
+        publish_chunk(rabbit_client, task_id, chunks, batch_to_messages(batch))
+        chunks += 1
+    return chunks
+
+
+@predict_router.post(
+    "/task/upload",
+    response_model=TaskResponse,
+    description=(
+        "Создать задачу из файла Parquet (application/vnd.apache.parquet) или Arrow IPC "
+        "(application/vnd.apache.arrow.file, application/vnd.apache.arrow.stream) в теле запроса. "
+        "Читаются только колонки, нужные модели; строки отправляются в очередь чанками по UPLOAD_CHUNK_ROWS."
+    ),
+)
+async def upload_task(
+    request: Request,
+    session: Session = Depends(get_session),
+    user: dict[str, Any] = Depends(authenticate),
+) -> TaskResponse:
+    settings = get_settings()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in COLUMNAR_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Supported content types: {', '.join(sorted(COLUMNAR_CONTENT_TYPES))}",
+        )
+
+    # Parquet читается с конца (метаданные в футере), поэтому тело сначала сохраняется во временный файл;
+    # запись в файл блокирует и выполняется в потоке, вне цикла событий
+    with tempfile.NamedTemporaryFile(prefix="upload-") as spool:
+        size = 0
+        pending = bytearray()
+        async for data in request.stream():
+            size += len(data)
+            if size > settings.BULK_UPLOAD_MAX_BYTES:
+                raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Upload is too large")
+            pending += data
+            if len(pending) >= UPLOAD_SPOOL_WRITE_BYTES:
+                await asyncio.to_thread(spool.write, pending)
+                pending.clear()
+        await asyncio.to_thread(spool.write, pending)
+        await asyncio.to_thread(spool.flush)
+
+        try:
+            source = await asyncio.to_thread(ColumnarFile, spool.name, content_type)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+        with source:
+            model = session.query(Model).first()
+            if not model:
+                logger.error("Модель не найдена в базе")
+                raise HTTPException(status_code=400, detail="Model not found")
+
+            task = Task(task_id=str(uuid4()), status="init", model=model)
+            session.add(task)
+            session.commit()
+            cache_task_status(task)
+            logger.info(
+                "Пользователь %s загрузил %s (%d байт, колонок: %d): создана задача %s",
+                user.get("email", "[Unknown user]"),
+                content_type,
+                size,
+                len(source.columns),
+                task.task_id,
+            )
+
+            try:
+                chunks = await asyncio.to_thread(publish_columnar, source, task.task_id, settings.UPLOAD_CHUNK_ROWS)
+            except (ValueError, RuntimeError) as exc:
+                session.rollback()
+                logger.error("Ошибка загрузки задачи %s: %s", task.task_id, exc)
+                commit_task_status(session, task, "error")
+                if isinstance(exc, ValueError):
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Failed to enqueue task")
+
+    task = finish_chunked_task(session, task, chunks)
+    logger.info("Задача %s поставлена в очередь: %d чанков", task.task_id, chunks)
+    return TaskResponse.from_orm(task)
+
+
+class ScoreItem(BaseModel):
+    TransactionID: int
+    isFraud: Optional[int] = None
+
+
+class ScoreResponse(BaseModel):
+    items: List[ScoreItem]
+    latency_ms: float
+
+
+class ScoreStatsResponse(BaseModel):
+    enabled: bool
+    in_flight: int
+    batches: int
+    scored: int
+    rejected: int
+    timeouts: int
+    p50_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+
+
+@predict_router.post(
+    "/score",
+    response_model=ScoreResponse,
+    description="Синхронно оценить небольшой пакет транзакций моделью в пуле процессов приложения (без очереди задач).",
+)
+async def score_transactions(
+    data: List[PredictionCreate],
+    user: dict[str, Any] = Depends(authenticate),
+) -> ScoreResponse:
+    started = time.perf_counter()
+    result = await in_process_scorer.score([pc.dict() for pc in data])
+    latency_ms = (time.perf_counter() - started) * 1e3
+    logger.info("Пользователь %s: оценено %d транзакций за %.1f мс", user.get("email", "[Unknown user]"), len(data), latency_ms)
+    return ScoreResponse(
+        items=[ScoreItem(TransactionID=transaction_id, isFraud=is_fraud) for transaction_id, is_fraud in result],
+        latency_ms=latency_ms,
+    )
+
+
+@predict_router.get(
+    "/score/stats",
+    response_model=ScoreStatsResponse,
+    description="Счётчики и задержка (p50/p99, мс) синхронной оценки по последним пакетам.",
+)
+async def score_stats(user: dict[str, Any] = Depends(authenticate)) -> ScoreStatsResponse:
+    return ScoreStatsResponse(**in_process_scorer.stats())
+
+
+@predict_router.post(
+    "/score/rpc",
+    response_model=ScoreResponse,
+    description="Синхронно оценить небольшой пакет транзакций воркерами ml_worker через RPC-очередь RabbitMQ (без записи в БД и опроса).",
+)
+async def score_transactions_rpc(
+    data: List[PredictionCreate],
+    user: dict[str, Any] = Depends(authenticate),
+) -> ScoreResponse:
+    settings = get_settings()
+    if not settings.RPC_SCORING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="RPC scoring is disabled")
+    if len(data) > settings.SCORING_MAX_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch size {len(data)} exceeds limit {settings.SCORING_MAX_BATCH}",
+        )
+
+    started = time.perf_counter()
+    try:
+        reply = await rpc_client.call({"input_data": [pc.dict() for pc in data]}, timeout=settings.RPC_SCORING_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("RPC-оценка %d транзакций не уложилась в %.1f с", len(data), settings.RPC_SCORING_TIMEOUT)
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Scoring timed out")
+    except OverflowError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many pending scoring requests", headers={"Retry-After": "1"})
+    except ConnectionError as exc:
+        logger.error("RPC-оценка недоступна: %s", exc)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Scoring workers are unavailable")
+    if "error" in reply:
+        logger.error("Воркер вернул ошибку RPC-оценки: %s", reply["error"])
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Scoring failed")
+
+    latency_ms = (time.perf_counter() - started) * 1e3
+    logger.info("Пользователь %s: оценено %d транзакций через RPC за %.1f мс", user.get("email", "[Unknown user]"), len(data), latency_ms)
+    return ScoreResponse(items=[ScoreItem(**item) for item in reply["predictions"]], latency_ms=latency_ms)
+
+
 class TaskStatusResponse(BaseModel):
     task_id: str
     status: str
     result: Optional[dict[str, Any]] = None
 
 
+def task_validators(snapshot: TaskStatusSnapshot) -> Dict[str, str]:
+    """Заголовки для условных запросов статуса/результата: клиент перепроверяет их при каждом опросе."""
+    return {
+        "ETag": snapshot.etag,
+        "Last-Modified": format_datetime(snapshot.updated_at.replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+
+
+def is_not_modified(request: Request, snapshot: TaskStatusSnapshot) -> bool:
+    """Проверка If-None-Match, а при его отсутствии - If-Modified-Since (RFC 9110, 13.1)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or snapshot.etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return snapshot.updated_at.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+
 @predict_router.get("/task/status/{task_id}", response_model=TaskStatusResponse)
 async def get_task_status(
     task_id: str,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     user: dict[str, Any] = Depends(authenticate),
-) -> TaskStatusResponse:
+) -> TaskStatusResponse | Response:
 
     logger.info(f"Пользователь {user.get('email', '[Unknown user]')} запрашивает статус задачи {task_id}")
 
-    task = session.query(Task).filter(Task.task_id == task_id).first()  # type: ignore[arg-type]
-    if not task:
+    snapshot = get_task_status_cached(task_id, session)
+    if not snapshot:
         logger.warning(f"Задача {task_id} не найдена.")
         raise HTTPException(status_code=404, detail="Task not found")
 
-    logger.debug(f"Статус задачи {task_id}: {task.status}")
-    return TaskStatusResponse(task_id=task.task_id, status=task.status, result=None)
+    headers = task_validators(snapshot)
+    if is_not_modified(request, snapshot):
+        return Response(status_code=304, headers=headers)
+    logger.debug(f"Статус задачи {task_id}: {snapshot.status}")
+    response.headers.update(headers)
+    return TaskStatusResponse(task_id=snapshot.task_id, status=snapshot.status, result=None)
+
+
+@predict_router.get(
+    "/task/events/{task_id}",
+    response_class=StreamingResponse,
+    description="Server-Sent Events: текущий статус задачи и его изменения до завершения (success/failed) вместо опроса /task/status.",
+)
+async def task_events(
+    task_id: str,
+    session: Session = Depends(get_session),
+    user: dict[str, Any] = Depends(authenticate),
+) -> StreamingResponse:
+    if get_task_status_by_task_id(task_id, session) is None:
+        logger.warning(f"Задача {task_id} не найдена.")
+        raise HTTPException(status_code=404, detail="Task not found")
+    logger.info(f"Пользователь {user.get('email', '[Unknown user]')} подписался на события задачи {task_id}")
+    return task_events_response(task_id, session.get_bind())
 
 
 class TaskResultResponse(BaseModel):
@@ -171,67 +463,109 @@ def as_list(value: Any, default_len: Any = None) -> list:
     return [value]
 
 
+def fin_transaction_to_dict(obj: FinTransaction) -> Dict[str, Any]:
+    # Поля полностью совпадают с PredictionResponse
+    return {
+        # "id": obj.id,
+        "TransactionID": obj.TransactionID,
+        "TransactionDT": obj.TransactionDT,
+        "TransactionAmt": obj.TransactionAmt,
+        "ProductCD": obj.ProductCD,
+        "card1": obj.card1,
+        "card2": obj.card2,
+        "card3": obj.card3,
+        "card4": obj.card4,
+        "card5": obj.card5,
+        "card6": obj.card6,
+        "addr1": obj.addr1,
+        "addr2": obj.addr2,
+        "dist1": obj.dist1,
+        "dist2": obj.dist2,
+        "P_emaildomain": obj.P_emaildomain,
+        "R_emaildomain": obj.R_emaildomain,
+        "isFraud": obj.isFraud,
+        "C": as_list(obj.C, default_len=14),  # Гарантируем список из 14 элементов
+        "D": as_list(obj.D, default_len=15),  # ...
+        "M": as_list(obj.M, default_len=9),
+        "V": as_list(obj.V, default_len=339),
+        "id": as_list(getattr(obj, "ids", None), default_len=27),  # если поле называется ids в БД
+        "created_at": obj.created_at,
+    }
+
+
 def fin_transaction_to_prediction_response(obj: FinTransaction) -> PredictionResponse:
     # Преобразуйте объект FinTransaction к PredictionResponse
-    # (Поля должны полностью совпадать между этими моделями)
-    return PredictionResponse(
-        # id=obj.id,
-        TransactionID=obj.TransactionID,
-        TransactionDT=obj.TransactionDT,
-        TransactionAmt=obj.TransactionAmt,
-        ProductCD=obj.ProductCD,
-        card1=obj.card1,
-        card2=obj.card2,
-        card3=obj.card3,
-        card4=obj.card4,
-        card5=obj.card5,
-        card6=obj.card6,
-        addr1=obj.addr1,
-        addr2=obj.addr2,
-        dist1=obj.dist1,
-        dist2=obj.dist2,
-        P_emaildomain=obj.P_emaildomain,
-        R_emaildomain=obj.R_emaildomain,
-        isFraud=obj.isFraud,
-        C=as_list(obj.C, default_len=14),  # Гарантируем список из 14 элементов
-        D=as_list(obj.D, default_len=15),  # ...
-        M=as_list(obj.M, default_len=9),
-        V=as_list(obj.V, default_len=339),
-        id=as_list(getattr(obj, "ids", None), default_len=27),  # если поле называется ids в БД
-        created_at=obj.created_at,
+    return PredictionResponse(**fin_transaction_to_dict(obj))
+
+
+def iter_task_result_json(task_id: str, task_pk: int, bind: Any) -> Iterator[bytes]:
+    """
+    Потоково сериализует результат задачи в JSON той же формы, что и TaskResultResponse.
+
+    Строки читаются серверным курсором пачками по STREAM_BATCH_SIZE в отдельной сессии
+    (сессия запроса к моменту отправки тела уже закрыта) и кодируются orjson по одной,
+    поэтому потребление памяти не зависит от размера задачи.
+    """
+    yield orjson.dumps({"task_id": task_id, "status": "success"})[:-1] + b',"predictions":['
+    statement = (
+        select(FinTransaction)
+        .where(FinTransaction.task_id == task_pk)
+        .order_by(FinTransaction.id)  # type: ignore[arg-type]
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
     )
+    count = 0
+    with Session(bind) as stream_session:
+        for batch in stream_session.exec(statement).partitions():
+            chunk = b",".join(orjson.dumps(fin_transaction_to_dict(tx)) for tx in batch)
+            yield (b"," if count else b"") + chunk
+            count += len(batch)
+    yield b"]}"
+    logger.info(f"Результаты по задаче {task_id} отданы потоком ({count} записей)")
 
 
 @predict_router.get("/task/result/{task_id}", response_model=TaskResultResponse)
 async def get_task_result(
     task_id: str,
+    request: Request,
+    response: Response,
+    wait: float = Query(0, ge=0, description="Long-poll: ждать завершения задачи до wait секунд (не больше TASK_RESULT_MAX_WAIT)."),
     session: Session = Depends(get_session),
     user: dict[str, Any] = Depends(authenticate),
-) -> TaskResultResponse:
+) -> TaskResultResponse | Response:
 
     logger.info(f"Пользователь {user.get('email', '[Unknown user]')} запрашивает результат задачи {task_id}")
 
-    task = session.query(Task).filter(Task.task_id == task_id).first()  # type: ignore[arg-type]
-    if not task:
+    snapshot = get_task_status_cached(task_id, session)
+    if not snapshot:
         logger.warning(f"Задача {task_id} не найдена.")
         raise HTTPException(status_code=404, detail="Task not found")
 
-    logger.debug(f"Текущий статус задачи {task_id}: {task.status}")
-    if task.status == "success":
-        transactions = task.fintransaction
-        predictions = [fin_transaction_to_prediction_response(tx) for tx in transactions]
-        logger.info(f"Результаты по задаче {task_id} успешно возвращены")
-        return TaskResultResponse(
-            task_id=task.task_id,
-            status=task.status,
-            predictions=predictions,
-        )
-    elif task.status == "failed":
+    if wait > 0 and snapshot.status not in TERMINAL_STATUSES:
+        timeout = min(wait, get_settings().TASK_RESULT_MAX_WAIT)
+        bind = session.get_bind()
+        # Соединение запроса возвращается в пул на время ожидания; будит NOTIFY из send_task_result
+        session.close()
+        await wait_for_terminal_status(task_event_hub, task_id, status_loader(task_id, bind), timeout)
+        snapshot = get_task_status_cached(task_id, session)
+        if not snapshot:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+    logger.debug(f"Текущий статус задачи {task_id}: {snapshot.status}")
+    headers = task_validators(snapshot)
+    if snapshot.status == "failed":
         logger.error(f"Задача {task_id} завершилась с ошибкой")
         raise HTTPException(status_code=500, detail="Task processing failed")
-    else:
-        logger.info(f"Результатов по задаче {task_id} ещё нет, статус: {task.status}")
-        return TaskResultResponse(task_id=task.task_id, status=task.status)
+    if is_not_modified(request, snapshot):
+        return Response(status_code=304, headers=headers)
+    if snapshot.status == "success":
+        return StreamingResponse(
+            iter_task_result_json(snapshot.task_id, snapshot.id, session.get_bind()),
+            media_type="application/json",
+            headers=headers,
+        )
+    logger.info(f"Результатов по задаче {task_id} ещё нет, статус: {snapshot.status}")
+    response.headers.update(headers)
+    return TaskResultResponse(task_id=snapshot.task_id, status=snapshot.status)
 
 
 @predict_router.post("/send_task_result", response_model=Dict[str, str])
@@ -296,15 +630,24 @@ async def send_task_result(
             }
         ],
     ),
+    chunk: Optional[int] = Query(None, ge=0, description="Номер чанка задачи, отправленной в очередь по частям."),
     session: Session = Depends(get_session),
 ) -> Dict[str, str]:
     logger.info(f"Начата отправка результата задачи task_id={task_id}")
     try:
-        task = session.query(Task).filter(Task.task_id == task_id).first()  # type: ignore[arg-type]
+        # Блокировка строки задачи: результаты чанков и окончание загрузки считаются без гонок
+        task = session.query(Task).filter(Task.task_id == task_id).with_for_update().first()  # type: ignore[arg-type]
         if not task:
             logger.error(f"Задача с task_id={task_id} не найдена")
             raise HTTPException(status_code=400, detail="Task not found")
 
+        if chunk is not None and not record_chunk_result(session, task, chunk):
+            # Повторная доставка результата чанка: строки уже записаны, задача не меняется
+            session.commit()
+            logger.warning(f"Повторный результат чанка {chunk} задачи {task_id} пропущен")
+            return {"message": "Chunk result already received"}
+
+        transactions = []
         for pred in data:
             pred_data = pred.dict()
             if "id" in pred_data:
@@ -312,11 +655,23 @@ async def send_task_result(
             pred_data["task_id"] = task.id
             fin = FinTransaction(**pred_data)
             session.add(fin)
-
-        task.status = "success"
-        session.commit()
+            transactions.append(fin)
+
+        # Счётчики дашборда обновляются в той же транзакции, что и вставка результатов
+        increment_counters(fin_transaction_deltas(transactions), session)
+        if chunk is None:
+            complete = True
+        else:
+            complete = all_chunks_received(task) and task.status not in TERMINAL_STATUSES
+            logger.info(f"Записан чанк {chunk} задачи {task_id} ({task.received_chunks}/{task.expected_chunks or '?'})")
+        if complete:
+            # NOTIFY уходит вместе с commit и будит ожидающих результата в других репликах приложения
+            commit_task_status(session, task, "success")
+        else:
+            session.commit()
         logger.info(f"Результат задачи {task_id} успешно сохранён в БД")
-        logger.debug(f"Данные результата: {data}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Данные результата (%d транзакций): %s", len(data), truncate_payload(data))
 
         return {"message": "Task result sent successfully!"}
     except Exception as e:
@@ -1,3 +1,4 @@
+import logging
 from typing import Any, List, cast
 
 import src.services.crud.task as TaskService
@@ -6,7 +7,7 @@ from sqlmodel import Session
 from src.auth.authenticate import authenticate
 from src.database.database import get_session
 from src.models.task import Task
-from src.services.logging.logging import get_logger
+from src.services.logging.logging import get_logger, truncate_payload
 
 task_router = APIRouter(tags=["Tasks"])
 
@@ -41,7 +42,7 @@ async def retrieve_task(
         logger.warning(f"Задача id={id} не найдена")
         raise HTTPException(status_code=404, detail="Task not found")
     else:
-        logger.debug(f"Задача id={id} получена: {task}")
+        logger.debug("Задача id=%s получена: %s", id, task)
     return task
 
 
@@ -51,11 +52,13 @@ async def create_task(
     session: Session = Depends(get_session),
     user: dict[str, Any] = Depends(authenticate),
 ) -> Task:
-    logger.info(f"Пользователь {user.get('email', '[Unknown user]')} создает задачу: {body}")
+    logger.info("Пользователь %s создает задачу task_id=%s", user.get("email", "[Unknown user]"), body.task_id)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Тело задачи: %s", truncate_payload(body))
     try:
         new_task = TaskService.create_task(body, session=session)
         if not new_task:
-            logger.error("Не удалось создать задачу из тела: %s", body)
+            logger.error("Не удалось создать задачу из тела: %s", truncate_payload(body))
             raise HTTPException(status_code=500, detail="Failed to create task")
         logger.info(f"Задача создана с id={new_task.id}")
         return new_task
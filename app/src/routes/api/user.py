@@ -65,7 +65,7 @@ async def create_user(
             logger.error("Роль 'user' не найдена в БД")
             raise HTTPException(status_code=500, detail="User role not found")
 
-        body.hashed_password = HashPassword().create_hash(body.hashed_password)
+        body.hashed_password = await HashPassword().create_hash_async(body.hashed_password)
         body.role_id = user_role.id
 
         new_user = UserService.create_user(body, session=session)
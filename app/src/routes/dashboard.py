@@ -7,8 +7,13 @@ from fastapi.templating import Jinja2Templates
 from sqlmodel import Session
 from src import schemas
 from src.auth.authenticate import get_current_user_via_cookies
-from src.models.fin_transaction import FinTransaction
-from src.models.user import User
+from src.models.stats_counter import (
+    FIN_TRANSACTION_FRAUD,
+    FIN_TRANSACTION_LEGIT,
+    FIN_TRANSACTION_TOTAL,
+    USER_TOTAL,
+)
+from src.services.crud.stats_counter import get_counters
 from src.services.logging.logging import get_logger
 
 dashboard_route = APIRouter()
@@ -36,11 +41,12 @@ async def read_dashboard(
         getattr(current_user, "id", "unknown"),
     )
 
-    # Статистика по транзакциям
-    total_count = db.query(FinTransaction).count()
-    fraud_count = db.query(FinTransaction).filter(FinTransaction.isFraud == 1).count()  # type: ignore
-    good_count = db.query(FinTransaction).filter(FinTransaction.isFraud == 0).count()  # type: ignore
-    user_count = db.query(User).count()
+    # Статистика читается из инкрементально поддерживаемых счётчиков вместо COUNT(*)
+    counters = get_counters(db)
+    total_count = counters[FIN_TRANSACTION_TOTAL]
+    fraud_count = counters[FIN_TRANSACTION_FRAUD]
+    good_count = counters[FIN_TRANSACTION_LEGIT]
+    user_count = counters[USER_TOTAL]
 
     context = {
         "user": current_user,
@@ -11,7 +11,7 @@ from src.auth.jwt_handler import create_access_token
 from src.database.config import get_settings
 from src.database.database import get_session
 from src.models.user import User
-from src.services.crud.user import get_user_by_email
+from src.services.crud.user import get_user_by_email, update_user
 from src.services.logging.logging import get_logger
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -99,7 +99,7 @@ async def login_for_access_token(
     db: Session = Depends(get_session),
     secret_key: str = Depends(get_secret),
 ) -> dict[str, str]:
-    user_exist = authenticate_user(db, form_data.username, form_data.password)
+    user_exist = await authenticate_user(db, form_data.username, form_data.password)
     logger.debug(f"#### пользователем: '{user_exist}'")
     if user_exist is None:
         logger.warning("Попытка входа с несуществующим пользователем: '%s'", form_data.username)
@@ -125,13 +125,18 @@ async def login_for_access_token(
     return {"access_token": access_token, "token_type": "bearer"}
 
 
-def authenticate_user(db: Session, username: str, password: str) -> User | None:
+async def authenticate_user(db: Session, username: str, password: str) -> User | None:
     user = get_user_by_email(username, db)
     if not user:
         logger.debug("Аутентификация: пользователь '%s' не найден.", username)
         return None
-    if not HashPassword().verify_hash(password, user.hashed_password):
+    verified, new_hash = await HashPassword().verify_and_update_async(password, user.hashed_password)
+    if not verified:
         logger.debug("Аутентификация: неверный пароль для пользователя '%s'.", username)
         return None
+    if new_hash is not None:
+        # Параметры хэширования изменились - сохраняем пересчитанный хэш
+        user.hashed_password = new_hash
+        update_user(user, db)
     logger.debug("Аутентификация: пользователь '%s' аутентифицирован.", username)
     return user
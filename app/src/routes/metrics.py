@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlmodel import Session
+from src.database.database import get_session
+from src.services.crud.task import count_tasks_by_status
+from src.services.metrics.metrics import TASKS_BY_STATUS
+
+metrics_route = APIRouter()
+
+
+@metrics_route.get("/metrics", include_in_schema=False)
+def metrics(session: Session = Depends(get_session)) -> Response:
+    """Метрики приложения в текстовом формате Prometheus. Число задач по статусам читается из БД при каждом опросе."""
+    counts = count_tasks_by_status(session)
+    # Статусы, задач в которых больше нет, удаляются из вывода
+    TASKS_BY_STATUS.clear()
+    for task_status, count in counts.items():
+        TASKS_BY_STATUS.labels(task_status).set(count)
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,16 +1,24 @@
+import asyncio
 from pathlib import Path
 from typing import Any, Optional
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, Form, Request, Response
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from sqlmodel import Session
 from src.auth.authenticate import get_current_user_via_cookies
+from src.database.config import get_settings
 from src.database.database import get_session
 from src.models.model import Model
 from src.models.task import Task
 from src.schemas import UserRead
+from src.services.crud.task import cache_task_status, get_task_status_by_task_id
+from src.services.events.task_events import TERMINAL_STATUSES, task_events_response
+from src.services.events.task_notify import commit_task_status
+from src.services.ingest.csv_stream import CsvChunker, iter_multipart_file
+from src.services.ingest.dispatch import finish_chunked_task, publish_chunk
+from src.services.ingest.messages import frame_to_messages
 from src.services.logging.logging import get_logger
 from src.services.rm.rm import RabbitMQClient, RabbitMQConfig
 
@@ -26,40 +34,6 @@ templates = Jinja2Templates(directory=template_dir)
 logger = get_logger(logger_name="routes.predict_transactions")
 
 
-def nan_to_none(x) -> Any | None:
-    import pandas as pd
-
-    if pd.isna(x):
-        return None
-    return x
-
-
-def row_to_prediction_dict(row):
-    return {
-        "TransactionID": int(row["TransactionID"]),
-        "TransactionDT": int(row["TransactionDT"]),
-        "TransactionAmt": float(row["TransactionAmt"]),
-        "ProductCD": nan_to_none(row["ProductCD"]),
-        "card1": nan_to_none(row.get("card1")),
-        "card2": nan_to_none(row.get("card2")),
-        "card3": nan_to_none(row.get("card3")),
-        "card4": nan_to_none(row.get("card4")),
-        "card5": nan_to_none(row.get("card5")),
-        "card6": nan_to_none(row.get("card6")),
-        "addr1": nan_to_none(row.get("addr1")),
-        "addr2": nan_to_none(row.get("addr2")),
-        "dist1": nan_to_none(row.get("dist1")),
-        "dist2": nan_to_none(row.get("dist2")),
-        "P_emaildomain": nan_to_none(row.get("P_emaildomain")),
-        "R_emaildomain": nan_to_none(row.get("R_emaildomain")),
-        "C": [nan_to_none(row.get(f"C{i}")) for i in range(1, 15)],
-        "D": [nan_to_none(row.get(f"D{i}")) for i in range(1, 16)],
-        "M": [nan_to_none(row.get(f"M{i}")) for i in range(1, 10)],
-        "V": [nan_to_none(row.get(f"V{i}")) for i in range(1, 340)],
-        "id": [nan_to_none(row.get(f"id_{str(i).zfill(2)}")) for i in range(1, 28)],
-    }
-
-
 @predict_transactions_route.get("/predict_fin_transaction", response_class=HTMLResponse)
 async def read_predict_fin_transaction(
     request: Request,
@@ -102,10 +76,23 @@ async def read_predict_fin_transaction(
         "predictions": predictions,
         "errors": errors,
         "status": status,
+        "wait_for_events": bool(task_id) and status not in TERMINAL_STATUSES and status != "not_found",
     }
     return templates.TemplateResponse("predict_transactions.html", context)
 
 
+@predict_transactions_route.get("/predict_fin_transaction/events", response_class=StreamingResponse)
+async def predict_fin_transaction_events(
+    task_id: str,
+    db: Session = Depends(get_session),
+    user: UserRead = Depends(get_current_user_via_cookies),
+) -> Response:
+    """SSE-поток статуса задачи для страницы результатов: страница обновляется по событию завершения, а не опросом."""
+    if get_task_status_by_task_id(task_id, db) is None:
+        return Response(status_code=404)
+    return task_events_response(task_id, db.get_bind())
+
+
 @predict_transactions_route.post("/predict_fin_transaction", response_class=HTMLResponse)
 async def predict_fin_transaction(
     request: Request,
@@ -129,10 +116,7 @@ async def predict_fin_transaction(
         import pandas as pd
 
         df = pd.read_csv(StringIO(transaction_csv.strip()))
-        prediction_inputs = []
-        for row in df.to_dict(orient="records"):
-            pred_dict = row_to_prediction_dict(row)
-            prediction_inputs.append(pred_dict)
+        prediction_inputs = frame_to_messages(df)
 
         # Сохраняем задачу в базу данных со статусом "init"
         model = db.query(Model).first()
@@ -169,3 +153,59 @@ async def predict_fin_transaction(
     from starlette.responses import RedirectResponse
 
     return RedirectResponse(url, status_code=303)
+
+
+def publish_frame(task_id: str, chunk: int, frame: Any) -> None:
+    """Преобразовать чанк CSV в сообщения и отправить его в очередь как часть задачи task_id."""
+    publish_chunk(rabbitmq_client, task_id, chunk, frame_to_messages(frame))
+
+
+@predict_transactions_route.post("/predict_fin_transaction/upload", response_class=HTMLResponse)
+async def upload_fin_transactions(
+    request: Request,
+    db: Session = Depends(get_session),
+    user: UserRead = Depends(get_current_user_via_cookies),
+) -> Response:
+    """
+    Потоковая загрузка CSV-файла (поле transactions_file формы multipart/form-data).
+
+    Задача создаётся до чтения тела; файл разбирается чанками по UPLOAD_CHUNK_ROWS строк, и каждый
+    чанк отправляется в очередь сразу после разбора, поэтому память не зависит от размера файла.
+    Задача завершается, когда получены результаты всех чанков (см. send_task_result).
+    """
+    model = db.query(Model).first()
+    if not model:
+        logger.error("Model not found при потоковой загрузке CSV")
+        return RedirectResponse(request.url_for("read_predict_fin_transaction"), status_code=303)
+
+    task = Task(task_id=str(uuid4()), status="init", model=model)
+    db.add(task)
+    db.commit()
+    cache_task_status(task)
+    task_id = task.task_id
+    logger.info("Потоковая загрузка CSV пользователем '%s': создана задача task_id=%s", getattr(user, "name", "anonymous"), task_id)
+
+    chunker = CsvChunker(get_settings().UPLOAD_CHUNK_ROWS)
+    chunks = 0
+    try:
+        async for data in iter_multipart_file(request, "transactions_file"):
+            # Разбор и публикация блокирующие - выполняются вне цикла событий
+            for frame in await asyncio.to_thread(list, chunker.feed(data)):
+                await asyncio.to_thread(publish_frame, task_id, chunks, frame)
+                chunks += 1
+        for frame in await asyncio.to_thread(list, chunker.close()):
+            await asyncio.to_thread(publish_frame, task_id, chunks, frame)
+            chunks += 1
+
+        task = finish_chunked_task(db, task, chunks)
+        if chunks == 0:
+            logger.warning("Загруженный CSV задачи task_id=%s не содержит строк", task_id)
+        logger.info("Загрузка CSV задачи task_id=%s завершена: %d строк, %d чанков", task_id, chunker.rows, chunks)
+    except Exception as e:
+        db.rollback()
+        logger.exception("Ошибка потоковой загрузки CSV (task_id=%s, отправлено чанков: %d): %s", task_id, chunks, e)
+        task = db.query(Task).filter(Task.id == task.id).one()  # type: ignore[arg-type]
+        commit_task_status(db, task, "error")
+
+    url = request.url_for("read_predict_fin_transaction").include_query_params(task_id=task_id)
+    return RedirectResponse(url, status_code=303)
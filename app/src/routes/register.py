@@ -75,7 +75,7 @@ async def register_post(request: Request, db: Session = Depends(get_session)) ->
             user_create = User(
                 name=username,
                 email=email,
-                hashed_password=HashPassword().create_hash(password=password),
+                hashed_password=await HashPassword().create_hash_async(password=password),
                 role_id=user_role.id,
             )
             create_user(new_user=user_create, session=db)
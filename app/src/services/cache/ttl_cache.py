@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Потокобезопасный кэш в памяти процесса с ограничением по времени жизни и размеру.
+
+    Запись действительна ttl секунд с момента записи; при переполнении вытесняется
+    наименее недавно использованная запись.
+
+    Значение, прочитанное из источника при промахе, кладётся через set_if_unchanged с версией,
+    взятой до чтения: если за время чтения запись была сброшена (pop/clear), прочитанное
+    значение могло устареть и не сохраняется.
+    """
+
+    def __init__(self, ttl: float, maxsize: int) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Увеличивается при каждом pop/clear
+        self._version = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def set_if_unchanged(self, key: Hashable, value: V, version: int) -> bool:
+        """
+        Сохранить значение, только если с момента получения version (см. version()) записи не сбрасывались.
+        """
+        with self._lock:
+            if self._version != version:
+                return False
+            self._store(key, value)
+            return True
+
+    def version(self) -> int:
+        return self._version
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._version += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._version += 1
+
+    def _store(self, key: Hashable, value: V) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
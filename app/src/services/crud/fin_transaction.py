@@ -1,31 +1,87 @@
 # from src.models.prediction import Prediction
-from typing import List, Optional
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
 
+import sqlalchemy as sa
 from sqlmodel import Session
 from src.models.fin_transaction import FinTransaction
+from src.services.crud.stats_counter import (
+    FIN_TRANSACTION_COUNTERS,
+    fin_transaction_deltas,
+    increment_counters,
+    reset_counters,
+)
 from src.services.logging.logging import get_logger
 
 logger = get_logger(logger_name="FinTransactionCRUD")
 
 
-def get_all_fin_transactions(session: Session) -> List[FinTransaction]:
+def encode_cursor(created_at: datetime, id: int) -> str:
     """
-    Получить все записи предсказаний из базы данных.
+    Закодировать позицию (created_at, id) последней записи страницы в непрозрачный курсор.
+    """
+    raw = json.dumps([created_at.isoformat(), id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Раскодировать курсор, выданный encode_cursor.
+
+    Вызывает:
+        ValueError: Если курсор повреждён или имеет неверный формат.
+    """
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(id)
+    except Exception as exc:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from exc
 
-    Эта функция выполняет запрос к сессии базы данных для всех экземпляров модели Prediction
-    и возвращает их в списке. Она предполагает, что предоставленная сессия правильно настроена
-    для взаимодействия с базой данных, и что модель Prediction корректно определена.
+
+def get_fin_transactions_page(
+    session: Session, limit: int = 100, cursor: Optional[str] = None
+) -> Tuple[List[FinTransaction], Optional[str]]:
+    """
+    Получить страницу финансовых транзакций с keyset-пагинацией по (created_at, id).
+
+    Записи отдаются от новых к старым. Вместо OFFSET используется условие
+    (created_at, id) < позиции курсора, поэтому при наличии индекса
+    ix_fintransaction_created_at_id время выборки не зависит от глубины страницы.
 
     Аргументы:
-        session: Сессия базы данных, используемая для выполнения запроса модели Prediction.
+        session: Сессия базы данных.
+        limit: Максимальное количество записей на странице.
+        cursor: Курсор, полученный с предыдущей страницы, или None для первой страницы.
 
     Возвращает:
-        List[Prediction]: Список, содержащий все экземпляры Prediction из базы данных.
+        Tuple[List[FinTransaction], Optional[str]]: Записи страницы и курсор следующей
+        страницы (None, если страница последняя).
+
+    Вызывает:
+        ValueError: Если курсор невалиден.
     """
-    logger.info("Запрошен список всех финансовых транзакций")
-    transactions = session.query(FinTransaction).all()
-    logger.debug(f"Найдено {len(transactions)} транзакций")
-    return transactions
+    logger.info(f"Запрошена страница финансовых транзакций (limit={limit}, cursor={cursor})")
+    query = session.query(FinTransaction)
+    if cursor is not None:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.filter(
+            sa.tuple_(FinTransaction.created_at, FinTransaction.id) < sa.tuple_(created_at, last_id)  # type: ignore[arg-type]
+        )
+    # Берём на одну запись больше, чтобы понять, есть ли следующая страница
+    rows = (
+        query.order_by(FinTransaction.created_at.desc(), FinTransaction.id.desc())  # type: ignore[attr-defined,union-attr]
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    logger.debug(f"На странице {len(rows)} транзакций, next_cursor={next_cursor}")
+    return rows, next_cursor
 
 
 def get_fin_transaction_by_id(
@@ -73,6 +129,7 @@ def create_fin_transaction(
     """
     logger.info("Создается новая финансовая транзакция")
     session.add(new_transaction)
+    increment_counters(fin_transaction_deltas([new_transaction]), session)
     session.commit()
     session.refresh(new_transaction)
     logger.info(f"Транзакция успешно создана (id={new_transaction.id})")
@@ -105,6 +162,7 @@ def delete_fin_trnsaction_by_id(id: int | None, session: Session) -> FinTransact
         logger.error(f"Транзакция с id={id} не найдена для удаления")
         raise Exception("User not found")
     session.delete(predict)
+    increment_counters(fin_transaction_deltas([predict], sign=-1), session)
     session.commit()
     logger.info(f"Транзакция с id={id} успешно удалена")
     return predict
@@ -126,5 +184,6 @@ def delete_all_fin_transactions(session: Session) -> None:
     """
     logger.warning("Инициировано удаление всех финансовых транзакций")
     count = session.query(FinTransaction).delete()
+    reset_counters(FIN_TRANSACTION_COUNTERS, session)
     session.commit()
     logger.info(f"Удалено {count} транзакций")
@@ -0,0 +1,146 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session
+from src.models.fin_transaction import FinTransaction
+from src.models.stats_counter import (
+    FIN_TRANSACTION_FRAUD,
+    FIN_TRANSACTION_LEGIT,
+    FIN_TRANSACTION_TOTAL,
+    USER_TOTAL,
+    StatsCounter,
+)
+from src.models.user import User
+from src.services.logging.logging import get_logger
+
+logger = get_logger(logger_name="StatsCounterCRUD")
+
+FIN_TRANSACTION_COUNTERS = (FIN_TRANSACTION_TOTAL, FIN_TRANSACTION_FRAUD, FIN_TRANSACTION_LEGIT)
+
+
+def increment_counters(deltas: Dict[str, int], session: Session) -> None:
+    """
+    Атомарно изменить счётчики на заданные приращения в текущей транзакции сессии.
+
+    Функция не фиксирует транзакцию: вызывающий код делает commit вместе с изменениями,
+    которые эти счётчики отражают. Отсутствующий счётчик создаётся в том же запросе.
+
+    Аргументы:
+        deltas: Отображение имя счётчика -> приращение (может быть отрицательным).
+        session: Сессия базы данных.
+    """
+    # Строки в порядке имён: параллельные транзакции блокируют счётчики в одном порядке и не взаимоблокируются
+    rows = [{"name": name, "value": delta} for name, delta in sorted(deltas.items()) if delta]
+    if not rows:
+        return
+    # Один INSERT ... ON CONFLICT DO UPDATE: первые параллельные приращения не конфликтуют по первичному ключу.
+    # Тесты работают на SQLite, где тот же upsert строится диалектом sqlite
+    dialect_insert = postgresql_insert if session.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = dialect_insert(StatsCounter).values(rows)
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[StatsCounter.name],
+            set_={"value": StatsCounter.value + statement.excluded.value, "updated_at": datetime.utcnow()},
+        )
+    )
+    logger.debug(f"Счётчики изменены: {deltas}")
+
+
+def fin_transaction_deltas(transactions: Iterable[FinTransaction], sign: int = 1) -> Dict[str, int]:
+    """
+    Посчитать приращения счётчиков транзакций для добавляемых (sign=1) или удаляемых (sign=-1) записей.
+    """
+    total = fraud = legit = 0
+    for transaction in transactions:
+        total += 1
+        if transaction.isFraud == 1:
+            fraud += 1
+        elif transaction.isFraud == 0:
+            legit += 1
+    return {
+        FIN_TRANSACTION_TOTAL: sign * total,
+        FIN_TRANSACTION_FRAUD: sign * fraud,
+        FIN_TRANSACTION_LEGIT: sign * legit,
+    }
+
+
+def count_fin_transactions(session: Session, *criteria: Any) -> Dict[str, int]:
+    """
+    Посчитать транзакции, удовлетворяющие условиям criteria, одним запросом COUNT(*) ... FILTER.
+
+    Возвращает:
+        Отображение имя счётчика транзакций -> число записей.
+    """
+    total, fraud, legit = (
+        session.query(
+            func.count(FinTransaction.id),  # type: ignore[arg-type]
+            func.count(FinTransaction.id).filter(FinTransaction.isFraud == 1),  # type: ignore[arg-type,call-overload]
+            func.count(FinTransaction.id).filter(FinTransaction.isFraud == 0),  # type: ignore[arg-type,call-overload]
+        )
+        .filter(*criteria)
+        .one()
+    )
+    return {
+        FIN_TRANSACTION_TOTAL: total or 0,
+        FIN_TRANSACTION_FRAUD: fraud or 0,
+        FIN_TRANSACTION_LEGIT: legit or 0,
+    }
+
+
+def reset_counters(names: Iterable[str], session: Session) -> None:
+    """
+    Обнулить счётчики в текущей транзакции сессии (например, при массовом удалении).
+    """
+    for name in names:
+        set_counter(name, 0, session)
+
+
+def set_counter(name: str, value: int, session: Session) -> None:
+    """
+    Установить значение счётчика в текущей транзакции сессии, создав его при необходимости.
+    """
+    counter = session.get(StatsCounter, name)
+    if counter is None:
+        session.add(StatsCounter(name=name, value=value))
+    else:
+        counter.value = value
+        session.add(counter)
+
+
+def get_counters(session: Session) -> Dict[str, int]:
+    """
+    Получить значения всех счётчиков одним запросом к небольшой таблице stats_counter.
+
+    Возвращает:
+        Отображение имя счётчика -> значение. Отсутствующие счётчики равны 0.
+    """
+    counters = {name: 0 for name in (*FIN_TRANSACTION_COUNTERS, USER_TOTAL)}
+    for counter in session.query(StatsCounter).all():
+        counters[counter.name] = counter.value
+    return counters
+
+
+def reconcile_counters(session: Session) -> Dict[str, int]:
+    """
+    Пересчитать счётчики по фактическим данным и исправить накопившийся дрейф.
+
+    Выполняет полные COUNT(*) по таблицам, поэтому предназначена для фоновой задачи,
+    а не для обработки запросов. Строки счётчиков блокируются (SELECT ... FOR UPDATE) до подсчёта:
+    параллельные вставки, не успевшие зафиксироваться, дождутся commit сверки и применят
+    своё приращение уже к пересчитанному значению.
+
+    Возвращает:
+        Отображение имя счётчика -> пересчитанное значение.
+    """
+    stored = {counter.name: counter.value for counter in session.query(StatsCounter).with_for_update().all()}
+    actual = {**count_fin_transactions(session), USER_TOTAL: session.query(User).count()}
+    for name, value in actual.items():
+        if stored.get(name) != value:
+            logger.warning(f"Дрейф счётчика {name}: {stored.get(name)} -> {value}")
+        set_counter(name, value, session)
+    session.commit()
+    logger.info(f"Счётчики статистики сверены: {actual}")
+    return actual
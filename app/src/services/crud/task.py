@@ -1,12 +1,76 @@
-from typing import List, Optional
+import hashlib
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
 
-from sqlmodel import Session
+from sqlmodel import Session, func, select
+from src.database.config import get_settings
+from src.models.fin_transaction import FinTransaction
 from src.models.task import Task
+from src.services.cache.ttl_cache import TTLCache
+from src.services.crud.stats_counter import count_fin_transactions, increment_counters, reconcile_counters
 from src.services.logging.logging import get_logger
 
 logger = get_logger(logger_name="TaskCRUD")
 
 
+class TaskStatusSnapshot(NamedTuple):
+    """Статус задачи, достаточный для ответов о статусе и результате без загрузки Task."""
+
+    id: int
+    task_id: str
+    status: str
+    updated_at: datetime
+
+    @property
+    def etag(self) -> str:
+        digest = hashlib.sha1(f"{self.task_id}:{self.status}:{self.updated_at.isoformat()}".encode("utf-8")).hexdigest()
+        return f'"{digest[:20]}"'
+
+
+# Кэш статусов задач по task_id. Обновляется при создании задачи и записи результата в этом процессе;
+# записи, изменённые другими репликами, удаляются по уведомлению Postgres (см. services.events.task_notify).
+task_status_cache: TTLCache[TaskStatusSnapshot] = TTLCache(ttl=get_settings().TASK_STATUS_CACHE_TTL, maxsize=get_settings().TASK_STATUS_CACHE_SIZE)
+
+
+def cache_task_status(task: Task) -> TaskStatusSnapshot:
+    """
+    Положить текущий статус задачи в кэш task_status_cache и вернуть снимок.
+
+    Вызывается после commit, когда статус задачи зафиксирован.
+    """
+    snapshot = TaskStatusSnapshot(id=task.id, task_id=task.task_id, status=task.status, updated_at=task.updated_at)
+    task_status_cache.set(task.task_id, snapshot)
+    return snapshot
+
+
+def get_task_status_cached(task_id: str, session: Session) -> Optional[TaskStatusSnapshot]:
+    """
+    Получить снимок статуса задачи через кэш task_status_cache.
+
+    При промахе читаются только нужные столбцы задачи. Отсутствующие задачи не кэшируются.
+    Прочитанный снимок не кэшируется, если во время чтения пришло уведомление о смене статуса
+    (запись кэша была сброшена): иначе устаревший статус отдавался бы до истечения TTL.
+
+    Аргументы:
+        task_id: Внешний идентификатор задачи (UUID).
+        session: Сессия базы данных запроса.
+
+    Возвращает:
+        TaskStatusSnapshot или None, если задача не найдена.
+    """
+    cached = task_status_cache.get(task_id)
+    if cached is not None:
+        return cached
+
+    version = task_status_cache.version()
+    row = session.exec(select(Task.id, Task.task_id, Task.status, Task.updated_at).where(Task.task_id == task_id)).first()
+    if row is None:
+        return None
+    snapshot = TaskStatusSnapshot(*row)
+    task_status_cache.set_if_unchanged(task_id, snapshot, version)
+    return snapshot
+
+
 def get_all_tasks(session: Session) -> List[Task]:
     """
     Получить все задачи из базы данных.
@@ -44,6 +108,63 @@ def get_task_by_id(id: int, session: Session) -> Optional[Task]:
     return None
 
 
+def get_task_status_by_task_id(task_id: str, session: Session) -> Optional[str]:
+    """
+    Получить статус задачи по её внешнему идентификатору task_id.
+
+    Читается только столбец status, без загрузки задачи и её связей.
+
+    Аргументы:
+        task_id: Внешний идентификатор задачи (UUID).
+        session: Сессия базы данных.
+
+    Возвращает:
+        Статус задачи или None, если задача не найдена.
+    """
+    return session.exec(select(Task.status).where(Task.task_id == task_id)).first()
+
+
+def count_tasks_by_status(session: Session) -> Dict[str, int]:
+    """
+    Число задач по статусам одним GROUP BY, без загрузки задач.
+
+    Аргументы:
+        session: Сессия базы данных.
+
+    Возвращает:
+        Словарь статус -> число задач; статусы без задач в него не попадают.
+    """
+    rows = session.exec(select(Task.status, func.count()).group_by(Task.status)).all()
+    return {status: count for status, count in rows}
+
+
+def find_task_by_idempotency_key(key: str, session: Session, window: float) -> Optional[Task]:
+    """
+    Найти задачу, созданную с ключом идемпотентности не раньше window секунд назад.
+
+    Если задача с ключом старше окна удержания, ключ у неё снимается (статус и updated_at не меняются),
+    чтобы повторная отправка того же пакета создала новую задачу.
+
+    Аргументы:
+        key: Ключ идемпотентности.
+        session: Сессия базы данных.
+        window: Окно удержания ключа в секундах.
+
+    Возвращает:
+        Объект Task или None, если действующей задачи с таким ключом нет.
+    """
+    task = session.exec(select(Task).where(Task.idempotency_key == key)).first()
+    if task is None:
+        return None
+    if task.created_at >= datetime.utcnow() - timedelta(seconds=window):
+        return task
+    logger.info(f"Ключ идемпотентности задачи {task.task_id} истёк и освобождён")
+    # updated_at передаётся явно, иначе onupdate изменит его и ETag задачи
+    session.query(Task).filter(Task.id == task.id).update({"idempotency_key": None, "updated_at": Task.updated_at})  # type: ignore[arg-type]
+    session.commit()
+    return None
+
+
 def create_task(new_task: Task, session: Session) -> Task | None:
     """
     Добавить новую задачу в базу данных и зафиксировать транзакцию.
@@ -81,17 +202,24 @@ def delete_task_by_id(id: int, session: Session) -> Task:
     Вызывает:
         Exception: Если задача с указанным ID не найдена.
 
-    Эта функция удаляет задачу с данным ID из базы данных,
-    фиксирует транзакцию для сохранения изменений и возвращает
+    Эта функция удаляет задачу с данным ID и её финансовые транзакции из базы данных,
+    уменьшает счётчики статистики в той же транзакции, фиксирует её и возвращает
     удаленный объект Task. Если задача не найдена, вызывается исключение.
     """
     logger.info(f"Попытка удалить задачу с id={id}")
-    task = session.get(Task, id)
+    # Блокировка задачи: результаты чанков не добавят транзакции между подсчётом и удалением
+    task = session.get(Task, id, with_for_update=True)
     if not task:
         logger.error(f"Задача с id={id} не найдена для удаления")
         raise Exception("User not found")
+    task_id = task.task_id
+    # Транзакции задачи удаляются явно (а не каскадом по ключу) одновременно с уменьшением счётчиков
+    transactions = FinTransaction.task_id == task.id
+    increment_counters({name: -count for name, count in count_fin_transactions(session, transactions).items()}, session)
+    session.query(FinTransaction).filter(transactions).delete(synchronize_session=False)  # type: ignore[arg-type]
     session.delete(task)
     session.commit()
+    task_status_cache.pop(task_id)
     logger.info(f"Задача с id={id} успешно удалена")
     return task
 
@@ -106,11 +234,14 @@ def delete_all_tasks(session: Session) -> None:
     Возвращает:
         None
 
-    Эта функция удаляет все записи задач из базы данных
-    посредством выполнения массовой операции удаления в таблице Task
-    и фиксирует транзакцию для сохранения изменений.
+    Эта функция удаляет все записи задач и их финансовые транзакции из базы данных
+    посредством выполнения массовой операции удаления в таблицах FinTransaction и Task,
+    пересчитывает счётчики статистики и фиксирует всё одной транзакцией.
     """
     logger.warning("Инициировано удаление всех задач")
+    session.query(FinTransaction).filter(FinTransaction.task_id.is_not(None)).delete(synchronize_session=False)  # type: ignore[union-attr]
     count = session.query(Task).delete()
-    session.commit()
+    # Транзакции без задачи остаются: счётчики пересчитываются по оставшимся записям (commit внутри)
+    reconcile_counters(session)
+    task_status_cache.clear()
     logger.info(f"Удалено {count} задач")
@@ -1,11 +1,21 @@
-from typing import List, Optional
+from typing import Any, List, Optional, cast
 
+from sqlalchemy import inspect
+from sqlalchemy.orm import InstanceState, joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import Session
+from src.database.config import get_settings
+from src.models.stats_counter import USER_TOTAL
 from src.models.user import User
+from src.services.cache.ttl_cache import TTLCache
+from src.services.crud.stats_counter import increment_counters, reset_counters
 from src.services.logging.logging import get_logger
 
 logger = get_logger(logger_name="UserCRUD")
 
+# Отсоединённые от сессий копии пользователей (вместе с ролью) по email для аутентификации по cookie
+user_cache: TTLCache[User] = TTLCache(ttl=get_settings().USER_CACHE_TTL, maxsize=get_settings().USER_CACHE_SIZE)
+
 
 def get_all_users(session: Session) -> List[User]:
     """
@@ -64,6 +74,61 @@ def get_user_by_email(email: str, session: Session) -> Optional[User]:
     return None
 
 
+def _detached_copy(instance: Any) -> Any:
+    """
+    Создать отсоединённую копию объекта только из значений колонок, не привязанную ни к одной сессии.
+    """
+    mapper = inspect(instance).mapper
+    copy = mapper.class_(**{attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+def get_user_by_email_cached(email: str, session: Session) -> Optional[User]:
+    """
+    Получить пользователя по email через кэш user_cache.
+
+    При промахе пользователь читается из БД вместе с ролью, а в кэш кладётся его копия.
+    При попадании копия присоединяется к сессии через merge(load=False) без обращения к БД,
+    поэтому вызывающий код получает обычный объект сессии, включая user.roles.
+    Отсутствующие пользователи не кэшируются. Прочитанный пользователь не кэшируется, если во время
+    чтения его запись была сброшена (update_user, delete_user_by_id): иначе устаревшие данные
+    или удалённый пользователь отдавались бы до истечения TTL.
+
+    Аргументы:
+        email: Адрес электронной почты пользователя.
+        session: Сессия базы данных запроса.
+
+    Возвращает:
+        Объект User или None, если пользователь не найден.
+    """
+    cached = user_cache.get(email)
+    if cached is not None:
+        logger.debug(f"Пользователь с email={email} найден в кэше")
+        return session.merge(cached, load=False)
+
+    version = user_cache.version()
+    user: Optional[User] = session.query(User).options(joinedload(User.roles)).filter(User.email == email).first()  # type: ignore[arg-type]
+    if user is None:
+        logger.warning(f"Пользователь с email={email} не найден")
+        return None
+    snapshot = _detached_copy(user)
+    if user.roles is not None:
+        # В sqlalchemy.orm.attributes функция без аннотаций типов
+        set_committed_value(snapshot, "roles", _detached_copy(user.roles))  # type: ignore[no-untyped-call]
+    if user_cache.set_if_unchanged(email, snapshot, version):
+        logger.debug(f"Пользователь с email={email} помещён в кэш")
+    return user
+
+
+def invalidate_cached_user(*emails: str) -> None:
+    """
+    Удалить пользователей из кэша user_cache после изменения или удаления.
+    """
+    for email in emails:
+        user_cache.pop(email)
+
+
 def get_user_by_name(name: str, session: Session) -> Optional[User]:
     """
     Получить пользователя из базы данных по его имени.
@@ -98,6 +163,7 @@ def create_user(new_user: User, session: Session) -> User | None:
     """
     logger.info("Создается новый пользователь")
     session.add(new_user)
+    increment_counters({USER_TOTAL: 1}, session)
     session.commit()
     session.refresh(new_user)
     logger.info(f"Пользователь успешно создан (id={new_user.id})")
@@ -116,8 +182,12 @@ def update_user(user: User, session: Session) -> User | None:
         объект User с обновленным состоянием из базы данных, или None, если операция не удалась.
     """
     logger.info(f"Обновление пользователя c id={user.id}")
+    # Email мог измениться: сбрасываем из кэша и прежнее, и новое значение
+    state = cast(InstanceState[User], inspect(user, raiseerr=True))
+    previous_emails = state.attrs.email.history.deleted or ()
     session.add(user)
     session.commit()
+    invalidate_cached_user(*previous_emails, user.email)
     session.refresh(user)
     logger.info(f"Пользователь с id={user.id} успешно обновлен")
     return user
@@ -143,7 +213,9 @@ def delete_user_by_id(id: int, session: Session) -> User:
         logger.error(f"Пользователь с id={id} не найден для удаления")
         raise Exception("User not found")
     session.delete(user)
+    increment_counters({USER_TOTAL: -1}, session)
     session.commit()
+    invalidate_cached_user(user.email)
     logger.info(f"Пользователь с id={id} успешно удален")
     return user
 
@@ -160,5 +232,7 @@ def delete_all_users(session: Session) -> None:
     """
     logger.warning("Инициировано удаление всех пользователей")
     count = session.query(User).delete()
+    reset_counters([USER_TOTAL], session)
     session.commit()
+    user_cache.clear()
     logger.info(f"Удалено {count} пользователей")
@@ -0,0 +1,151 @@
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Set
+
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from src.services.crud.task import get_task_status_by_task_id
+from src.services.logging.logging import get_logger
+
+logger = get_logger(logger_name="services.events.task_events")
+
+# Статусы, после которых задача больше не меняется ("failed" - API, "error" - HTML-страница)
+TERMINAL_STATUSES = frozenset(["success", "failed", "error"])
+# Интервал комментария-пульса в SSE-потоке: не даёт прокси закрыть простаивающее соединение
+HEARTBEAT_SEC = 15.0
+SUBSCRIBER_QUEUE_SIZE = 16
+
+TaskEvent = Dict[str, Any]
+
+
+class TaskEventHub:
+    """
+    Внутрипроцессный pub/sub событий задач: подписчики (SSE-соединения) ждут событий своей задачи
+    в собственных очередях, publish раскладывает событие по очередям подписчиков task_id.
+
+    Все методы вызываются из потока цикла событий; из других потоков - через loop.call_soon_threadsafe.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE) -> None:
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set["asyncio.Queue[TaskEvent]"]] = defaultdict(set)
+
+    def subscriber_count(self, task_id: Optional[str] = None) -> int:
+        if task_id is not None:
+            return len(self._subscribers.get(task_id, ()))
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    @contextmanager
+    def subscribe(self, task_id: str) -> Iterator["asyncio.Queue[TaskEvent]"]:
+        queue: "asyncio.Queue[TaskEvent]" = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[task_id].add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(task_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[task_id]
+
+    def publish(self, task_id: str, event: TaskEvent) -> int:
+        """
+        Передать событие всем подписчикам задачи. Возвращает число получателей.
+
+        Медленный подписчик с заполненной очередью теряет самое старое событие, а не задерживает остальных.
+        """
+        queues = self._subscribers.get(task_id, ())
+        for queue in queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+        if queues:
+            logger.debug("Событие задачи %s передано %d подписчикам", task_id, len(queues))
+        return len(queues)
+
+    def publish_status(self, task_id: str, status: str) -> int:
+        return self.publish(task_id, {"task_id": task_id, "status": status})
+
+
+def format_sse(event: TaskEvent, name: str = "status") -> bytes:
+    return f"event: {name}\ndata: {json.dumps(event)}\n\n".encode("utf-8")
+
+
+async def stream_task_events(
+    hub: TaskEventHub,
+    task_id: str,
+    load_status: Callable[[], Optional[str]],
+    heartbeat: float = HEARTBEAT_SEC,
+) -> AsyncIterator[bytes]:
+    """
+    SSE-поток статуса задачи: текущий статус сразу, затем изменения до финального статуса.
+
+    Подписка оформляется до чтения статуса из БД, поэтому завершение между чтением и подпиской
+    не теряется. После финального статуса поток закрывается.
+    """
+    with hub.subscribe(task_id) as queue:
+        status = load_status()
+        if status is None:
+            return
+        yield format_sse({"task_id": task_id, "status": status})
+        while status not in TERMINAL_STATUSES:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            status = event["status"]
+            yield format_sse(event)
+
+
+async def wait_for_terminal_status(
+    hub: TaskEventHub,
+    task_id: str,
+    load_status: Callable[[], Optional[str]],
+    timeout: float,
+) -> Optional[str]:
+    """
+    Long-poll: дождаться финального статуса задачи не дольше timeout секунд.
+
+    Как и в SSE-потоке, подписка оформляется до чтения статуса. Возвращает последний известный
+    статус (None - задача не найдена); по таймауту это может быть и нефинальный статус.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    with hub.subscribe(task_id) as queue:
+        status = load_status()
+        while status is not None and status not in TERMINAL_STATUSES:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            status = event["status"]
+    return status
+
+
+def status_loader(task_id: str, bind: Any) -> Callable[[], Optional[str]]:
+    """Чтение статуса задачи отдельной короткой сессией: сессия запроса на время ожидания не удерживается."""
+
+    def load_status() -> Optional[str]:
+        with Session(bind) as status_session:
+            return get_task_status_by_task_id(task_id, status_session)
+
+    return load_status
+
+
+def task_events_response(task_id: str, bind: Any) -> StreamingResponse:
+    """SSE-ответ со статусом задачи; статус перечитывается отдельной сессией уже после подписки на события."""
+    return StreamingResponse(
+        stream_task_events(task_event_hub, task_id, status_loader(task_id, bind)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Глобальный хаб событий задач процесса приложения
+task_event_hub = TaskEventHub()
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Optional
+
+import psycopg
+from sqlalchemy import text
+from sqlalchemy.engine import URL
+from sqlalchemy.orm import Session
+from src.models.task import Task
+from src.services.cache.ttl_cache import TTLCache
+from src.services.crud.task import cache_task_status, task_status_cache
+from src.services.logging.logging import get_logger
+from src.services.metrics.metrics import TASK_DURATION
+
+from .task_events import TERMINAL_STATUSES, TaskEventHub, task_event_hub
+
+logger = get_logger(logger_name="services.events.task_notify")
+
+# Канал Postgres LISTEN/NOTIFY, в который публикуются смены статуса задач
+TASK_STATUS_CHANNEL = "task_status"
+RECONNECT_DELAY_SEC = 1.0
+# Идентификатор процесса приложения: свои уведомления уже переданы в локальный хаб при commit
+PROCESS_ID = uuid.uuid4().hex
+
+
+def notify_task_status(session: Session, task_id: str, status: str) -> None:
+    """
+    Поставить NOTIFY о смене статуса задачи в текущую транзакцию сессии.
+
+    Postgres доставляет уведомление слушателям только после commit и не доставляет его при rollback,
+    поэтому вызывать до session.commit(). Для других СУБД (SQLite в тестах) ничего не делает.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    payload = json.dumps({"task_id": task_id, "status": status, "origin": PROCESS_ID})
+    session.connection().execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": TASK_STATUS_CHANNEL, "payload": payload})
+
+
+def commit_task_status(session: Session, task: Task, status: str) -> None:
+    """
+    Сменить статус задачи и зафиксировать транзакцию сессии вместе с остальными её изменениями.
+
+    Уведомление другим репликам уходит вместе с commit; после него обновляется кэш статусов
+    и будятся ожидающие в этом процессе. Для завершающих статусов время от создания задачи
+    записывается в метрику task_duration_seconds.
+    """
+    # created_at читается до commit: после него атрибуты задачи истекают
+    created_at = task.created_at
+    task.status = status
+    notify_task_status(session, task.task_id, status)
+    session.commit()
+    if status in TERMINAL_STATUSES and created_at is not None:
+        TASK_DURATION.labels(status).observe(max(0.0, (datetime.utcnow() - created_at).total_seconds()))
+    cache_task_status(task)
+    task_event_hub.publish_status(task.task_id, status)
+
+
+def listener_conninfo(url: URL) -> str:
+    """Строка подключения libpq для psycopg из URL SQLAlchemy-движка (без драйвера "+psycopg")."""
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class TaskStatusListener:
+    """
+    Единственное на процесс соединение с LISTEN на TASK_STATUS_CHANNEL.
+
+    Уведомления о смене статуса, отправленные любой репликой приложения, передаются в TaskEventHub,
+    и ожидающие long-poll запросы и SSE-потоки этого процесса просыпаются сразу после commit результата.
+    Запись задачи в кэше статусов удаляется до передачи события, поэтому разбуженный запрос читает новый статус.
+    Соединение обслуживается задачей в цикле событий приложения и переподключается после разрыва;
+    после (пере)подключения кэш статусов очищается целиком - уведомления за время разрыва потеряны.
+    """
+
+    def __init__(self, hub: TaskEventHub, cache: Optional[TTLCache[Any]] = None, channel: str = TASK_STATUS_CHANNEL) -> None:
+        self.hub = hub
+        self.cache = cache
+        self.channel = channel
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._connected = asyncio.Event()
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def start(self, conninfo: str) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(conninfo))
+        logger.info("Слушатель уведомлений о статусе задач запущен (канал '%s')", self.channel)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Слушатель уведомлений о статусе задач остановлен")
+
+    def dispatch(self, payload: str) -> bool:
+        """Передать уведомление в хаб. Возвращает False для некорректных и собственных уведомлений процесса."""
+        try:
+            event: Any = json.loads(payload)
+            task_id, status = event["task_id"], event["status"]
+        except (ValueError, TypeError, KeyError) as exc:
+            logger.error("Некорректное уведомление о статусе задачи: %s", exc)
+            return False
+        if event.get("origin") == PROCESS_ID:
+            return False
+        if self.cache is not None:
+            self.cache.pop(task_id)
+        self.hub.publish_status(task_id, status)
+        return True
+
+    async def _run(self, conninfo: str) -> None:
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as connection:
+                    await connection.execute(f"LISTEN {self.channel}")
+                    if self.cache is not None:
+                        self.cache.clear()
+                    self._connected.set()
+                    logger.info("Слушатель подключён к Postgres (LISTEN %s)", self.channel)
+                    async for notify in connection.notifies():
+                        self.dispatch(notify.payload)
+            except psycopg.Error as exc:
+                logger.error("Ошибка соединения слушателя уведомлений с Postgres: %s", exc)
+            finally:
+                self._connected.clear()
+            await asyncio.sleep(RECONNECT_DELAY_SEC)
+
+
+# Глобальный слушатель процесса; запускается при старте приложения для Postgres
+task_status_listener = TaskStatusListener(task_event_hub, cache=task_status_cache)
@@ -0,0 +1,111 @@
+from typing import Any, Dict, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .messages import BLOCK_COLUMNS, INPUT_COLUMNS, REQUIRED_COLUMNS, SCALAR_COLUMNS, assemble_messages, gc_paused
+
+# Типы содержимого, принимаемые загрузкой колоночных файлов
+PARQUET_CONTENT_TYPES = frozenset(["application/vnd.apache.parquet", "application/x-parquet", "application/parquet"])
+ARROW_FILE_CONTENT_TYPES = frozenset(["application/vnd.apache.arrow.file", "application/x-arrow"])
+ARROW_STREAM_CONTENT_TYPES = frozenset(["application/vnd.apache.arrow.stream"])
+COLUMNAR_CONTENT_TYPES = PARQUET_CONTENT_TYPES | ARROW_FILE_CONTENT_TYPES | ARROW_STREAM_CONTENT_TYPES
+
+
+class ColumnarFile:
+    """
+    Транзакции из файла Parquet или Arrow IPC (file/stream), отображённого в память.
+
+    Читаются только колонки INPUT_COLUMNS, присутствующие в файле: для Parquet остальные колонки
+    не распаковываются вовсе, пакеты Arrow IPC ссылаются на отображённый файл без копирования.
+    Выбрасывает ValueError для повреждённого файла или при отсутствии обязательных колонок.
+    """
+
+    def __init__(self, path: str, content_type: str) -> None:
+        if content_type not in COLUMNAR_CONTENT_TYPES:
+            raise ValueError(f"Unsupported content type: {content_type}")
+        self.content_type = content_type
+        self._source = pa.memory_map(path)
+        try:
+            if content_type in PARQUET_CONTENT_TYPES:
+                self._parquet: Optional[pq.ParquetFile] = pq.ParquetFile(self._source)
+                schema = self._parquet.schema_arrow
+            else:
+                self._parquet = None
+                schema = self._open_ipc().schema
+        except pa.ArrowException as exc:
+            self.close()
+            raise ValueError(f"Invalid columnar file: {exc}") from exc
+        self.columns = [column for column in INPUT_COLUMNS if column in schema.names]
+        missing = [column for column in REQUIRED_COLUMNS if column not in self.columns]
+        if missing:
+            self.close()
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    def _open_ipc(self) -> Any:
+        self._source.seek(0)
+        if self.content_type in ARROW_FILE_CONTENT_TYPES:
+            return pa.ipc.open_file(self._source)
+        return pa.ipc.open_stream(self._source)
+
+    def batches(self, batch_rows: int) -> Iterator[pa.RecordBatch]:
+        """Пакеты не больше batch_rows строк только с нужными колонками."""
+        if self._parquet is not None:
+            yield from self._parquet.iter_batches(batch_size=batch_rows, columns=self.columns)
+            return
+        reader = self._open_ipc()
+        if self.content_type in ARROW_FILE_CONTENT_TYPES:
+            source = (reader.get_batch(index) for index in range(reader.num_record_batches))
+        else:
+            source = iter(reader)
+        for batch in source:
+            batch = batch.select(self.columns)
+            for offset in range(0, batch.num_rows, batch_rows):
+                yield batch.slice(offset, batch_rows)
+
+    def close(self) -> None:
+        self._source.close()
+
+    def __enter__(self) -> "ColumnarFile":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _column_values(batch: pa.RecordBatch, name: str) -> List[Any]:
+    """Значения колонки как объекты Python; null, NaN и отсутствующая колонка - None."""
+    index = batch.schema.get_field_index(name)
+    if index < 0:
+        return [None] * batch.num_rows
+    column = batch.column(index)
+    if pa.types.is_floating(column.type):
+        column = pc.if_else(pc.is_nan(column), pa.scalar(None, column.type), column)
+    values: List[Any] = column.to_pylist()
+    return values
+
+
+def _key_values(batch: pa.RecordBatch, name: str, target: pa.DataType) -> List[Any]:
+    column = batch.column(batch.schema.get_field_index(name))
+    if column.null_count:
+        raise ValueError(f"Column {name} contains nulls")
+    values: List[Any] = pc.cast(column, target, safe=False).to_pylist()
+    return values
+
+
+def batch_to_messages(batch: pa.RecordBatch) -> List[Dict[str, Any]]:
+    """
+    Сообщения для очереди из пакета Arrow в формате frame_to_messages.
+
+    Значения берутся напрямую из буферов колонок (to_pylist), без промежуточного DataFrame.
+    TransactionID/TransactionDT приводятся к целым, TransactionAmt - к float; null в них - ValueError.
+    В отличие от CSV, целочисленные колонки с пропусками остаются целыми (Arrow хранит null отдельно).
+    """
+    with gc_paused():
+        transaction_ids = _key_values(batch, "TransactionID", pa.int64())
+        transaction_dts = _key_values(batch, "TransactionDT", pa.int64())
+        amounts = _key_values(batch, "TransactionAmt", pa.float64())
+        scalars = list(zip(*(_column_values(batch, name) for name in SCALAR_COLUMNS)))
+        blocks = [[list(row) for row in zip(*(_column_values(batch, name) for name in columns))] for columns in BLOCK_COLUMNS.values()]
+        return assemble_messages(transaction_ids, transaction_dts, amounts, scalars, blocks)
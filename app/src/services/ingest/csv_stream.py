@@ -0,0 +1,121 @@
+import io
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterator, List, Optional
+
+import pandas as pd
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+if TYPE_CHECKING:
+    from python_multipart.multipart import MultipartCallbacks
+
+
+class CsvChunker:
+    """
+    Инкрементальный разбор CSV, приходящего произвольными кусками байт.
+
+    Первая непустая строка - заголовок; далее накапливается не больше chunk_rows строк,
+    после чего они разбираются в DataFrame. В памяти одновременно держатся только заголовок,
+    незавершённая строка и строки текущего чанка. Строки делятся по переводу строки,
+    поэтому поля с переводами строк внутри кавычек не поддерживаются.
+    """
+
+    def __init__(self, chunk_rows: int) -> None:
+        self.chunk_rows = chunk_rows
+        self.header: Optional[bytes] = None
+        self.rows = 0
+        self._tail = b""
+        self._lines: List[bytes] = []
+
+    def feed(self, data: bytes) -> Iterator[pd.DataFrame]:
+        lines = (self._tail + data).split(b"\n")
+        self._tail = lines.pop()
+        for line in lines:
+            yield from self._add_line(line)
+
+    def close(self) -> Iterator[pd.DataFrame]:
+        tail, self._tail = self._tail, b""
+        yield from self._add_line(tail)
+        if self._lines:
+            yield self._frame()
+
+    def _add_line(self, line: bytes) -> Iterator[pd.DataFrame]:
+        if not line.strip():
+            return
+        if self.header is None:
+            self.header = line.removeprefix(b"\xef\xbb\xbf")
+            return
+        self._lines.append(line)
+        if len(self._lines) >= self.chunk_rows:
+            yield self._frame()
+
+    def _frame(self) -> pd.DataFrame:
+        assert self.header is not None
+        buffer = b"\n".join([self.header, *self._lines])
+        self.rows += len(self._lines)
+        self._lines = []
+        return pd.read_csv(io.BytesIO(buffer))
+
+
+async def iter_multipart_file(request: Request, field_name: str) -> AsyncIterator[bytes]:
+    """
+    Содержимое файлового поля field_name из тела multipart/form-data по мере поступления.
+
+    Тело читается потоком (request.stream()) без буферизации формы целиком, остальные поля пропускаются.
+    Выбрасывает ValueError, если запрос не multipart/form-data.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise ValueError("Expected multipart/form-data request")
+
+    headers: Dict[bytes, bytes] = {}
+    header_field: List[bytes] = []
+    header_value: List[bytes] = []
+    in_field = False
+    pending: List[bytes] = []
+
+    def on_part_begin() -> None:
+        headers.clear()
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header_field.append(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header_value.append(data[start:end])
+
+    def on_header_end() -> None:
+        headers[b"".join(header_field).lower()] = b"".join(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished() -> None:
+        nonlocal in_field
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        in_field = options.get(b"name") == field_name.encode("utf-8")
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if in_field:
+            pending.append(data[start:end])
+
+    def on_part_end() -> None:
+        nonlocal in_field
+        in_field = False
+
+    callbacks: "MultipartCallbacks" = {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    }
+    parser = MultipartParser(boundary, callbacks)
+    async for chunk in request.stream():
+        parser.write(chunk)
+        if pending:
+            yield b"".join(pending)
+            pending.clear()
+    parser.finalize()
+    if pending:
+        yield b"".join(pending)
@@ -0,0 +1,50 @@
+from typing import Any, Dict, List
+
+from sqlalchemy.orm import Session
+from src.models.task import Task
+from src.models.task_chunk import TaskChunk
+from src.services.events.task_notify import commit_task_status
+from src.services.rm.rm import RabbitMQClient
+
+
+def publish_chunk(client: RabbitMQClient, task_id: str, chunk: int, input_data: List[Dict[str, Any]]) -> None:
+    """Отправить сообщения чанка в очередь как часть задачи task_id. Выбрасывает RuntimeError при ошибке отправки."""
+    if not client.send_task({"task_id": task_id, "chunk": chunk, "input_data": input_data}):
+        raise RuntimeError(f"Не удалось отправить чанк {chunk} в очередь.")
+
+
+def record_chunk_result(session: Session, task: Task, chunk: int) -> bool:
+    """
+    Отметить получение результата чанка в текущей транзакции; строка задачи должна быть заблокирована.
+
+    Возвращает False, если результат этого чанка уже был получен (повторная доставка): received_chunks
+    считает только разные номера чанков.
+    """
+    if session.get(TaskChunk, (task.id, chunk)) is not None:
+        return False
+    session.add(TaskChunk(task_id=task.id, chunk=chunk))
+    task.received_chunks += 1
+    return True
+
+
+def all_chunks_received(task: Task) -> bool:
+    """Получены ли результаты всех чанков задачи; до окончания загрузки (expected_chunks неизвестно) - нет."""
+    return task.expected_chunks is not None and task.received_chunks >= task.expected_chunks
+
+
+def finish_chunked_task(session: Session, task: Task, chunks: int) -> Task:
+    """
+    Зафиксировать число отправленных чанков задачи после публикации последнего.
+
+    Задача блокируется на время обновления: результаты чанков (send_task_result) могли прийти раньше,
+    и если получены все, задача завершается здесь. Задача без чанков завершается с ошибкой.
+    """
+    task = session.query(Task).filter(Task.id == task.id).with_for_update().one()  # type: ignore[arg-type]
+    task.expected_chunks = chunks
+    if chunks == 0:
+        commit_task_status(session, task, "error")
+    elif all_chunks_received(task):
+        commit_task_status(session, task, "success")
+    else:
+        session.commit()
+    return task
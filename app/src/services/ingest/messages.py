@@ -0,0 +1,139 @@
+import gc
+import threading
+from contextlib import contextmanager
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+
+import pandas as pd
+
+# Скалярные признаки сообщения в порядке полей; отсутствующая колонка даёт None
+SCALAR_COLUMNS = [
+    "ProductCD",
+    "card1",
+    "card2",
+    "card3",
+    "card4",
+    "card5",
+    "card6",
+    "addr1",
+    "addr2",
+    "dist1",
+    "dist2",
+    "P_emaildomain",
+    "R_emaildomain",
+]
+# Блоки признаков, передаваемые списками: имя поля сообщения -> колонки CSV по порядку
+BLOCK_COLUMNS: Dict[str, List[str]] = {
+    "C": [f"C{i}" for i in range(1, 15)],
+    "D": [f"D{i}" for i in range(1, 16)],
+    "M": [f"M{i}" for i in range(1, 10)],
+    "V": [f"V{i}" for i in range(1, 340)],
+    "id": [f"id_{i:02d}" for i in range(1, 28)],
+}
+MESSAGE_FIELDS = ["TransactionID", "TransactionDT", "TransactionAmt", *SCALAR_COLUMNS, *BLOCK_COLUMNS]
+# Колонки входной таблицы, из которых собирается сообщение; первые четыре обязательны
+INPUT_COLUMNS = ["TransactionID", "TransactionDT", "TransactionAmt", *SCALAR_COLUMNS, *chain.from_iterable(BLOCK_COLUMNS.values())]
+REQUIRED_COLUMNS = INPUT_COLUMNS[:4]
+
+
+def nan_to_none(value: Any) -> Optional[Any]:
+    return None if pd.isna(value) else value
+
+
+def row_to_message(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Сообщение для очереди из одной записи df.to_dict(orient="records").
+
+    Построчный эталон для frame_to_messages: используется в тестах и бенчмарке для сверки результата.
+    """
+    return {
+        "TransactionID": int(row["TransactionID"]),
+        "TransactionDT": int(row["TransactionDT"]),
+        "TransactionAmt": float(row["TransactionAmt"]),
+        "ProductCD": nan_to_none(row["ProductCD"]),
+        **{column: nan_to_none(row.get(column)) for column in SCALAR_COLUMNS[1:]},
+        **{field: [nan_to_none(row.get(column)) for column in columns] for field, columns in BLOCK_COLUMNS.items()},
+    }
+
+
+def _block_values(df: pd.DataFrame, columns: List[str]) -> List[List[Any]]:
+    """Значения колонок построчно как объекты Python; NaN и отсутствующие колонки - None."""
+    block = df.reindex(columns=columns)
+    values = block.to_numpy(dtype=object, copy=True)
+    values[block.isna().to_numpy()] = None
+    rows: List[List[Any]] = values.tolist()
+    return rows
+
+
+# Число активных gc_paused в процессе и состояние сборщика до первой из них (под _gc_pause_lock)
+_gc_pause_lock = threading.Lock()
+_gc_pause_depth = 0
+_gc_was_enabled = False
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """
+    Приостановить циклический сборщик мусора на время создания большого числа объектов.
+
+    Сообщения не содержат циклических ссылок, а без паузы сборщик многократно обходит
+    миллионы только что созданных значений. Флаг gc общий для процесса, поэтому паузы
+    считаются под блокировкой: сборщик выключает первая из одновременных пауз, а включает
+    последняя завершившаяся, и только если он был включён до первой.
+    """
+    global _gc_pause_depth, _gc_was_enabled
+    with _gc_pause_lock:
+        if _gc_pause_depth == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pause_depth += 1
+    try:
+        yield
+    finally:
+        with _gc_pause_lock:
+            _gc_pause_depth -= 1
+            if _gc_pause_depth == 0 and _gc_was_enabled:
+                gc.enable()
+
+
+def frame_to_messages(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Сообщения для очереди из DataFrame транзакций (результат совпадает с row_to_message по каждой строке).
+
+    Блоки колонок преобразуются целиком: NaN заменяются на None по маске, значения переводятся
+    в объекты Python одним to_numpy(dtype=object).tolist(), а в цикле по строкам только собираются словари.
+    На время преобразования циклический сборщик мусора приостанавливается.
+    Как и построчный вариант, требует колонки TransactionID, TransactionDT, TransactionAmt и ProductCD (KeyError).
+    """
+    with gc_paused():
+        return _frame_to_messages(df)
+
+
+def _frame_to_messages(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    transaction_ids = df["TransactionID"].astype("int64").tolist()
+    transaction_dts = df["TransactionDT"].astype("int64").tolist()
+    amounts = df["TransactionAmt"].astype("float64").tolist()
+    if "ProductCD" not in df.columns:
+        raise KeyError("ProductCD")
+    scalars = _block_values(df, SCALAR_COLUMNS)
+    blocks = [_block_values(df, columns) for columns in BLOCK_COLUMNS.values()]
+    return assemble_messages(transaction_ids, transaction_dts, amounts, scalars, blocks)
+
+
+def assemble_messages(
+    transaction_ids: Sequence[int],
+    transaction_dts: Sequence[int],
+    amounts: Sequence[float],
+    scalars: Sequence[Sequence[Any]],
+    blocks: Sequence[Sequence[List[Any]]],
+) -> List[Dict[str, Any]]:
+    """
+    Собрать сообщения из уже преобразованных значений: scalars - построчно значения SCALAR_COLUMNS,
+    blocks - для каждого блока BLOCK_COLUMNS построчно списки его значений.
+    """
+    return [
+        dict(zip(MESSAGE_FIELDS, [transaction_id, transaction_dt, amount, *row_scalars, *row_blocks]))
+        for transaction_id, transaction_dt, amount, row_scalars, *row_blocks in zip(
+            transaction_ids, transaction_dts, amounts, scalars, *blocks
+        )
+    ]
@@ -1,50 +1,141 @@
+import atexit
 import logging
+import os
+import queue
+import reprlib
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Any, Optional
 
+LOG_DIR = Path("./logs")
+LOG_FILE = LOG_DIR / "myapp.log"
 
-def get_logger(level=logging.DEBUG, logger_name="default logger") -> logging.Logger:
-    """
-    Создает и настраивает логгер с указанным уровнем логирования и именем.
+# Формат сообщений лога:
+# %(asctime)s - временная метка
+# %(name)s - имя логгера
+# %(levelname)s - уровень важности сообщения
+# %(message)s - текст сообщения
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-    Args:
-        level (int): Уровень логирования (по умолчанию logging.DEBUG)
-        logger_name (str): Имя логгера (по умолчанию 'default logger')
+# Уровень логирования из окружения (например, LOG_LEVEL=INFO) переопределяет уровень по умолчанию в get_logger
+LOG_LEVEL = os.getenv("LOG_LEVEL")
+
+# Максимальная длина представления полезной нагрузки в сообщениях лога
+MAX_PAYLOAD_CHARS = 512
+
+# repr больших коллекций строится только по первым элементам
+_payload_repr = reprlib.Repr()
+_payload_repr.maxlist = _payload_repr.maxtuple = _payload_repr.maxdict = 10
+_payload_repr.maxlevel = 3
+_payload_repr.maxstring = _payload_repr.maxother = MAX_PAYLOAD_CHARS
+
+_listener: Optional[QueueListener] = None
+# Процесс, запустивший поток _listener: дочерний процесс, созданный fork, наследует объект, но не поток
+_listener_pid: Optional[int] = None
+_setup_lock = threading.Lock()
 
-    Returns:
-        logging.Logger: Настроенный объект логгера
+
+def setup_logging() -> None:
+    """
+    Один раз на процесс настроить запись логов через очередь.
+
+    Корневой логгер получает единственный QueueHandler: вызывающий поток только кладёт запись
+    в очередь, а запись в файл ./logs/myapp.log и в консоль выполняет отдельный поток QueueListener.
+    На каждый приёмник (файл, консоль) создаётся ровно один обработчик, сколько бы раз
+    ни вызывались setup_logging и get_logger.
 
     Raises:
         OSError: Если невозможно создать директорию для логов
     """
-    # Создаем директорию для логов, если она не существует
-    log_dir = Path("./logs")
-    log_dir.mkdir(exist_ok=True)
+    global _listener, _listener_pid
+    if _listener is not None:
+        return
+    with _setup_lock:
+        if _listener is not None:
+            return
+        LOG_DIR.mkdir(exist_ok=True)
+        formatter = logging.Formatter(LOG_FORMAT)
+        file_handler = logging.FileHandler(LOG_FILE)
+        file_handler.setFormatter(formatter)
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        root = logging.getLogger()
+        root.addHandler(QueueHandler(log_queue))
+        root.setLevel(logging.DEBUG)
 
-    # Устанавливаем базовую конфигурацию логирования
-    logging.basicConfig(level=level)
+        _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        _listener_pid = os.getpid()
+        atexit.register(shutdown_logging)
 
-    # Создаем обработчик для записи логов в файл
-    handler = logging.FileHandler("./logs/myapp.log")
 
-    # Определяем формат сообщений лога:
-    # %(asctime)s - временная метка
-    # %(name)s - имя логгера
-    # %(levelname)s - уровень важности сообщения
-    # %(message)s - текст сообщения
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
+def shutdown_logging() -> None:
+    """
+    Остановить поток записи логов, дописав все записи из очереди.
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
 
-    # Применяем форматирование к обработчику
-    handler.setFormatter(formatter)
 
-    # Получаем логгер с указанным именем
-    logger = logging.getLogger(logger_name)
+def setup_child_process_logging() -> None:
+    """
+    Настроить логирование в дочернем процессе (например, в процессе пула оценки).
+
+    Процесс, созданный fork, наследует QueueHandler корневого логгера, но не поток QueueListener,
+    который разбирает очередь: записи копились бы в очереди без ограничения и терялись. Процесс,
+    созданный spawn, при импорте модулей приложения запускает собственный QueueListener с тем же
+    файлом лога; он останавливается. Обработчики корневого логгера заменяются одним StreamHandler,
+    пишущим в консоль напрямую, а setup_logging в этом процессе остаётся без действия.
+    """
+    setup_logging()
+    with _setup_lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            # Остановленный объект остаётся в _listener, поэтому setup_logging не настроит очередь заново
+            _listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(console_handler)
+    atexit.unregister(shutdown_logging)
 
-    # Добавляем обработчик к логгеру
-    logger.addHandler(handler)
 
-    # Устанавливаем уровень логирования
-    logger.setLevel(level)
+def truncate_payload(payload: Any, limit: int = MAX_PAYLOAD_CHARS) -> str:
+    """
+    Строковое представление полезной нагрузки для лога, обрезанное до limit символов.
+
+    Коллекции представляются первыми элементами (reprlib), поэтому стоимость не растёт с размером пакета.
+    Вызывать под проверкой logger.isEnabledFor(...), чтобы не строить представление зря.
+    """
+    text = payload if isinstance(payload, str) else _payload_repr.repr(payload)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [ещё {len(text) - limit} символов]"
+
+
+def get_logger(level=logging.DEBUG, logger_name="default logger") -> logging.Logger:
+    """
+    Возвращает логгер с указанным уровнем логирования и именем.
 
+    Обработчики к логгеру не добавляются: записи передаются корневому логгеру,
+    настроенному в setup_logging().
+
+    Args:
+        level (int): Уровень логирования (по умолчанию logging.DEBUG, переопределяется LOG_LEVEL)
+        logger_name (str): Имя логгера (по умолчанию 'default logger')
+
+    Returns:
+        logging.Logger: Настроенный объект логгера
+    """
+    setup_logging()
+    logger = logging.getLogger(logger_name)
+    logger.setLevel(LOG_LEVEL.upper() if LOG_LEVEL else level)
     return logger
@@ -0,0 +1,80 @@
+import time
+from contextvars import ContextVar
+from typing import Any, List, Optional
+
+from prometheus_client import Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import ConnectionPoolEntry, QueuePool
+
+# Границы корзин задержек в секундах; верхние - для long-poll запросов результата
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Время от постановки задачи до завершения: от долей секунды до крупных пакетных загрузок
+TASK_DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса до отправки последнего байта ответа",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Суммарное время SQL-запросов за один HTTP-запрос",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Ожидание соединения из пула SQLAlchemy (включая открытие соединения сверх pool_size)",
+    buckets=LATENCY_BUCKETS,
+)
+RABBITMQ_PUBLISH_LATENCY = Histogram(
+    "rabbitmq_publish_seconds",
+    "Время публикации задачи в RabbitMQ (соединение, объявление очереди и basic_publish)",
+    ["queue", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+TASKS_BY_STATUS = Gauge("tasks", "Число задач в БД по статусу (считается при каждом опросе /metrics)", ["status"])
+TASK_DURATION = Histogram(
+    "task_duration_seconds",
+    "Время от создания задачи (статус init) до завершения",
+    ["status"],
+    buckets=TASK_DURATION_BUCKETS,
+)
+
+# Накопитель времени SQL текущего HTTP-запроса; задаётся MetricsMiddleware.
+# Список изменяется по ссылке, поэтому время учитывается и из потоков пула (контекст копируется туда)
+request_db_time: ContextVar[Optional[List[float]]] = ContextVar("request_db_time", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    accumulator = request_db_time.get()
+    if accumulator is not None:
+        accumulator[0] += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context: Any) -> None:
+    # Запрос с ошибкой не доходит до after_cursor_execute
+    connection = context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool, записывающий в POOL_CHECKOUT_WAIT время получения соединения из пула."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
@@ -0,0 +1,53 @@
+import time
+from typing import Optional
+
+from src.permission.route_resolver import RouteTemplateResolver
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import REQUEST_DB_TIME, REQUEST_LATENCY, request_db_time
+
+# Метка маршрута для путей, не совпавших ни с одним маршрутом: сырые пути в метках не нужны
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware метрик HTTP-запросов: время обработки и суммарное время SQL по шаблону маршрута.
+
+    Маршрут в метках - шаблон (например, `/api/predict/task/result/{task_id}`), поэтому число рядов
+    не зависит от идентификаторов в путях. Время считается до отправки последнего байта ответа,
+    то есть для потоковых ответов включает отдачу тела. Добавляется последней, чтобы снаружи
+    всех остальных middleware: ответы 401/403 проверки доступа тоже учитываются.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        # Создаётся при первом запросе, когда известен роутер приложения
+        self.route_resolver: Optional[RouteTemplateResolver] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        db_time = [0.0]
+        token = request_db_time.set(db_time)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_db_time.reset(token)
+            if self.route_resolver is None:
+                self.route_resolver = RouteTemplateResolver(scope["app"].router)
+            method = scope["method"]
+            route = self.route_resolver.resolve(method, scope["path"]) or UNMATCHED_ROUTE
+            REQUEST_LATENCY.labels(method, route, str(status_code)).observe(time.perf_counter() - started)
+            REQUEST_DB_TIME.labels(method, route).observe(db_time[0])
@@ -1,10 +1,12 @@
 import json
 import logging
+import time
 from typing import Any
 
 import pika
 from pika.exceptions import AMQPError
-from src.services.logging.logging import get_logger
+from src.services.logging.logging import get_logger, truncate_payload
+from src.services.metrics.metrics import RABBITMQ_PUBLISH_LATENCY
 
 from .rmqconf import RabbitMQConfig
 
@@ -13,6 +15,9 @@ logging.getLogger("pika").setLevel(logging.INFO)
 
 logger = get_logger(logger_name="RabbitMQClient")
 
+# Заголовок сообщения с временем публикации (мс от эпохи): по нему воркер считает ожидание в очереди
+PUBLISHED_AT_HEADER = "x-published-at-ms"
+
 
 class RabbitMQClient:
     """
@@ -30,7 +35,16 @@ class RabbitMQClient:
     def send_task(self, task: Any) -> bool:
         """
         Отправляет ML задачу в очередь RabbitMQ.
+
+        Время публикации (вместе с соединением и объявлением очереди) записывается в метрику
+        rabbitmq_publish_seconds с исходом ok/error.
         """
+        started = time.perf_counter()
+        sent = self._send_task(task)
+        RABBITMQ_PUBLISH_LATENCY.labels(self.queue_name, "ok" if sent else "error").observe(time.perf_counter() - started)
+        return sent
+
+    def _send_task(self, task: Any) -> bool:
         logger.info(f"Попытка отправить задачу в очередь '{self.queue_name}'")
         try:
             connection = pika.BlockingConnection(self.connection_params)
@@ -43,10 +57,12 @@ class RabbitMQClient:
 
             # Подготавливаем сообщение
             message = json.dumps(task)
-            logger.debug(f"Сообщение подготовлено для отправки: {message}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Сообщение подготовлено для отправки (%d байт): %s", len(message), truncate_payload(message))
 
             # Отправляем сообщение
-            channel.basic_publish(exchange="", routing_key=self.queue_name, body=message)
+            properties = pika.BasicProperties(headers={PUBLISHED_AT_HEADER: int(time.time() * 1000)})
+            channel.basic_publish(exchange="", routing_key=self.queue_name, properties=properties, body=message)
             logger.info(f"Сообщение успешно отправлено в очередь '{self.queue_name}'")
             connection.close()
             logger.debug("Соединение с RabbitMQ закрыто")
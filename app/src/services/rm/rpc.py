@@ -0,0 +1,205 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+import pika
+from pika.exceptions import AMQPError
+from src.database.config import get_settings
+from src.services.logging.logging import get_logger
+
+from .rm import PUBLISHED_AT_HEADER, rabbitmq_config
+from .rmqconf import RabbitMQConfig
+
+logger = get_logger(logger_name="RabbitMQRpcClient")
+
+# Псевдо-очередь RabbitMQ Direct Reply-to: ответы приходят прямо в канал отправителя без объявления очереди
+REPLY_TO_QUEUE = "amq.rabbitmq.reply-to"
+RECONNECT_DELAY_SEC = 1.0
+
+
+class RpcDispatcher:
+    """
+    Ожидающие ответа RPC-запросы по correlation_id.
+
+    Фьючерсы создаются в цикле событий вызывающего, а разрешаются из потока соединения RabbitMQ,
+    поэтому результат передаётся через loop.call_soon_threadsafe.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[str, Tuple[asyncio.AbstractEventLoop, "asyncio.Future[Any]"]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def register(self, correlation_id: str) -> "asyncio.Future[Any]":
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[Any]" = loop.create_future()
+        with self._lock:
+            self._pending[correlation_id] = (loop, future)
+        return future
+
+    def discard(self, correlation_id: str) -> None:
+        with self._lock:
+            self._pending.pop(correlation_id, None)
+
+    def resolve(self, correlation_id: Optional[str], result: Any) -> bool:
+        """
+        Передать ответ ожидающему запросу. Возвращает False для неизвестного или уже
+        отменённого по таймауту correlation_id.
+        """
+        if correlation_id is None:
+            return False
+        with self._lock:
+            entry = self._pending.pop(correlation_id, None)
+        if entry is None:
+            return False
+        loop, future = entry
+        loop.call_soon_threadsafe(_set_result, future, result)
+        return True
+
+    def fail_all(self, exc: BaseException) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for loop, future in pending.values():
+            loop.call_soon_threadsafe(_set_exception, future, exc)
+
+
+def _set_result(future: "asyncio.Future[Any]", result: Any) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_exception(future: "asyncio.Future[Any]", exc: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exc)
+
+
+class RabbitMQRpcClient:
+    """
+    RPC-клиент поверх RabbitMQ: запрос публикуется в rpc_queue_name с reply_to и correlation_id,
+    воркер отвечает в reply_to, ответ возвращается ожидающей корутине.
+
+    Соединение pika не потокобезопасно, поэтому им владеет отдельный поток: он читает ответы
+    (Direct Reply-to) и выполняет публикации, переданные через add_callback_threadsafe.
+    У запроса выставляется expiration, равный таймауту, - брокер отбрасывает запросы,
+    которые уже никто не ждёт.
+    """
+
+    def __init__(self, config: RabbitMQConfig, max_pending: int) -> None:
+        self.config = config
+        self.max_pending = max_pending
+        self.dispatcher = RpcDispatcher()
+        self._connection: Optional[pika.BlockingConnection] = None
+        self._channel: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._connected = threading.Event()
+
+    @property
+    def started(self) -> bool:
+        return self._running
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="rabbitmq-rpc", daemon=True)
+        self._thread.start()
+        logger.info("RPC-клиент RabbitMQ запущен (очередь '%s')", self.config.rpc_queue_name)
+
+    def stop(self) -> None:
+        if not self._running:
+            return
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.dispatcher.fail_all(ConnectionError("RPC client stopped"))
+        logger.info("RPC-клиент RabbitMQ остановлен")
+
+    def _on_reply(self, channel: Any, method: Any, properties: Any, body: bytes) -> None:
+        try:
+            result = json.loads(body)
+        except ValueError as exc:
+            logger.error("Некорректный ответ RPC (correlation_id=%s): %s", properties.correlation_id, exc)
+            result = {"error": "Invalid RPC reply"}
+        if not self.dispatcher.resolve(properties.correlation_id, result):
+            logger.warning("Ответ RPC без ожидающего запроса (correlation_id=%s)", properties.correlation_id)
+
+    def _run(self) -> None:
+        while self._running:
+            try:
+                self._connection = pika.BlockingConnection(self.config.get_connection_params())
+                self._channel = self._connection.channel()
+                self._channel.queue_declare(queue=self.config.rpc_queue_name)
+                self._channel.basic_consume(queue=REPLY_TO_QUEUE, on_message_callback=self._on_reply, auto_ack=True)
+                self._connected.set()
+                logger.info("RPC-клиент подключён к RabbitMQ")
+                while self._running:
+                    self._connection.process_data_events(time_limit=1)
+            except AMQPError as exc:
+                logger.error("Ошибка соединения RPC-клиента с RabbitMQ: %s", exc)
+            except Exception:
+                # Любая другая ошибка (в обработчике ответа, в сокете вне иерархии pika) не завершает поток:
+                # иначе все последующие RPC-вызовы заканчивались бы таймаутом
+                logger.exception("Непредвиденная ошибка потока RPC-клиента, переподключение")
+            finally:
+                self._connected.clear()
+                self.dispatcher.fail_all(ConnectionError("RabbitMQ RPC connection lost"))
+                try:
+                    if self._connection is not None and self._connection.is_open:
+                        self._connection.close()
+                except Exception as exc:
+                    logger.warning("Не удалось закрыть соединение RPC-клиента: %s", exc)
+                self._connection = None
+                self._channel = None
+            if self._running:
+                time.sleep(RECONNECT_DELAY_SEC)
+
+    def _publish(self, correlation_id: str, body: bytes, timeout: float) -> None:
+        properties = pika.BasicProperties(
+            reply_to=REPLY_TO_QUEUE,
+            correlation_id=correlation_id,
+            content_type="application/json",
+            expiration=str(max(1, int(timeout * 1000))),
+            headers={PUBLISHED_AT_HEADER: int(time.time() * 1000)},
+        )
+        try:
+            self._channel.basic_publish(exchange="", routing_key=self.config.rpc_queue_name, properties=properties, body=body)
+        except AMQPError as exc:
+            logger.error("Не удалось опубликовать RPC-запрос %s: %s", correlation_id, exc)
+            self.dispatcher.resolve(correlation_id, {"error": "RPC publish failed"})
+
+    async def call(self, payload: Any, timeout: float) -> Any:
+        """
+        Отправить RPC-запрос и дождаться ответа воркера.
+
+        Выбрасывает ConnectionError, если соединения нет или оно разорвано во время ожидания,
+        OverflowError при превышении max_pending ожидающих запросов и asyncio.TimeoutError по таймауту.
+        """
+        connection = self._connection
+        if not self._connected.is_set() or connection is None:
+            raise ConnectionError("RabbitMQ RPC connection is not established")
+        if len(self.dispatcher) >= self.max_pending:
+            raise OverflowError("Too many pending RPC requests")
+
+        correlation_id = str(uuid.uuid4())
+        body = json.dumps(payload).encode("utf-8")
+        future = self.dispatcher.register(correlation_id)
+        try:
+            try:
+                connection.add_callback_threadsafe(lambda: self._publish(correlation_id, body, timeout))
+            except AMQPError as exc:
+                # Соединение закрылось между проверкой состояния и передачей публикации его потоку
+                raise ConnectionError(f"RabbitMQ RPC connection is not available: {exc!r}") from exc
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self.dispatcher.discard(correlation_id)
+
+
+# Глобальный RPC-клиент; запускается при старте приложения, если RPC_SCORING_ENABLED
+rpc_client = RabbitMQRpcClient(rabbitmq_config, max_pending=get_settings().RPC_SCORING_MAX_PENDING)
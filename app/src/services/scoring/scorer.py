@@ -0,0 +1,182 @@
+import asyncio
+import importlib
+import multiprocessing
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from types import ModuleType
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from src.database.config import get_settings
+from src.services.logging.logging import get_logger, setup_child_process_logging
+
+logger = get_logger(logger_name="services.scoring")
+
+# Модуль ml_worker с AntifraudModelHandler (ml_worker/antifraud_model_handler.py)
+HANDLER_MODULE = "antifraud_model_handler"
+# Размер окна задержек для p50/p99
+LATENCY_WINDOW = 1000
+
+# Модуль обработчика в процессе пула; загружается один раз в инициализаторе процесса
+_handler_module: Optional[ModuleType] = None
+
+
+def _init_worker(model_path: str) -> None:
+    """
+    Инициализатор процесса пула: подключить код ml_worker и заранее загрузить модель.
+
+    ml_worker разрешает пути к артефактам модели относительно рабочего каталога,
+    поэтому процесс пула переходит в model_path. Логи процесса пишутся в консоль напрямую,
+    без очереди логов приложения.
+    """
+    global _handler_module
+    setup_child_process_logging()
+    os.chdir(model_path)
+    sys.path.insert(0, model_path)
+    _handler_module = importlib.import_module(HANDLER_MODULE)
+    _handler_module.get_antifraud_handler()
+
+
+def _score_batch(rows: List[Dict[str, Any]]) -> List[Tuple[int, Optional[int]]]:
+    """
+    Оценить пакет транзакций в процессе пула. Возвращает только (TransactionID, isFraud),
+    чтобы не передавать между процессами полные записи.
+    """
+    assert _handler_module is not None, "Процесс пула оценки не инициализирован"
+    predictions = _handler_module.run_antifraud_task({"input_data": rows})
+    return [(prediction.TransactionID, prediction.isFraud) for prediction in predictions]
+
+
+class InProcessScorer:
+    """
+    Синхронная оценка транзакций моделью AntifraudModelHandler в собственном пуле процессов приложения.
+
+    В отличие от очереди задач (RabbitMQ, ml_worker, обратный вызов и опрос статуса) ответ возвращается
+    в том же HTTP-запросе. Одновременно обрабатывается не более max_concurrency пакетов: сверх лимита
+    запрос сразу отклоняется с 503, а пакет, не уложившийся в timeout, - с 504. Слот освобождается,
+    только когда процесс действительно закончил работу, поэтому таймауты не переполняют пул.
+    """
+
+    def __init__(self, model_path: Optional[str], workers: int, max_concurrency: int, timeout: float, max_batch: int) -> None:
+        self.model_path = model_path
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.scored = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        """
+        Запустить пул процессов и дождаться загрузки модели в каждом из них.
+        """
+        if self._executor is not None:
+            return
+        if not self.model_path:
+            raise RuntimeError("SCORING_MODEL_PATH is not set in settings!")
+        logger.info("Запуск пула оценки: %d процессов, модель из %s", self.workers, self.model_path)
+        # spawn, а не fork: в процессе приложения уже работают потоки (запись логов, ответы RPC, LISTEN),
+        # и копия процесса с захваченными ими блокировками могла бы зависнуть
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_path,),
+        )
+        # Пробные вызовы запускают процессы: модель загружается в инициализаторе до первых запросов
+        for future in [self._executor.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+        logger.info("Пул оценки готов")
+
+    def shutdown(self) -> None:
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        logger.info("Пул оценки остановлен")
+
+    def _release(self, _: "Future[Any]") -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def score(self, rows: List[Dict[str, Any]]) -> List[Tuple[int, Optional[int]]]:
+        """
+        Оценить пакет транзакций. Выбрасывает HTTPException 503 (режим выключен или превышен лимит
+        одновременных пакетов), 413 (слишком большой пакет) или 504 (превышен timeout).
+        """
+        if self._executor is None:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="In-process scoring is disabled")
+        if len(rows) > self.max_batch:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Batch is too large for synchronous scoring (max {self.max_batch})",
+            )
+        with self._lock:
+            if self._in_flight >= self.max_concurrency:
+                self.rejected += 1
+                logger.warning("Лимит одновременной оценки исчерпан (%d пакетов)", self._in_flight)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Scoring concurrency limit reached",
+                    headers={"Retry-After": "1"},
+                )
+            self._in_flight += 1
+
+        started = time.perf_counter()
+        future = self._executor.submit(_score_batch, rows)
+        future.add_done_callback(self._release)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning("Оценка пакета из %d транзакций не уложилась в %.3f с", len(rows), self.timeout)
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Scoring timed out")
+        self._latencies.append(time.perf_counter() - started)
+        self.scored += len(rows)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Счётчики и квантили задержки оценки (в миллисекундах) по последним LATENCY_WINDOW пакетам.
+        """
+        latencies = list(self._latencies)
+        p50 = p99 = None
+        if len(latencies) > 1:
+            quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50, p99 = quantiles[49] * 1e3, quantiles[98] * 1e3
+        elif latencies:
+            p50 = p99 = latencies[0] * 1e3
+        return {
+            "enabled": self.started,
+            "in_flight": self._in_flight,
+            "batches": len(latencies),
+            "scored": self.scored,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "p50_ms": p50,
+            "p99_ms": p99,
+        }
+
+
+_settings = get_settings()
+in_process_scorer = InProcessScorer(
+    model_path=_settings.SCORING_MODEL_PATH,
+    workers=_settings.SCORING_WORKERS,
+    max_concurrency=_settings.SCORING_MAX_CONCURRENCY,
+    timeout=_settings.SCORING_TIMEOUT,
+    max_batch=_settings.SCORING_MAX_BATCH,
+)
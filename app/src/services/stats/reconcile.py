@@ -0,0 +1,34 @@
+import asyncio
+
+from sqlmodel import Session
+from src.database.database import engine
+from src.services.crud.stats_counter import reconcile_counters
+from src.services.logging.logging import get_logger
+
+logger = get_logger(logger_name="stats.reconcile")
+
+
+def run_reconciliation() -> None:
+    """
+    Однократно сверить счётчики статистики с фактическими данными в отдельной сессии.
+    """
+    with Session(engine) as session:
+        reconcile_counters(session)
+
+
+async def reconcile_counters_periodically(interval: int) -> None:
+    """
+    Фоновая задача: периодически исправляет дрейф счётчиков дашборда.
+
+    Тяжёлые COUNT(*) выполняются в пуле потоков, чтобы не блокировать event loop.
+
+    Аргументы:
+        interval: Интервал между сверками в секундах.
+    """
+    logger.info("Запущена фоновая сверка счётчиков (интервал %s с)", interval)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(run_reconciliation)
+        except Exception as exc:
+            logger.error("Ошибка сверки счётчиков статистики: %s", exc, exc_info=True)
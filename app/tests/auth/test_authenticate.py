@@ -1,5 +1,5 @@
 import pytest
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, status
 from sqlmodel import Session
 from src.auth.authenticate import (
     authenticate,
@@ -8,6 +8,11 @@ from src.auth.authenticate import (
 )
 from tests.common.test_router_common import *
 
+
+def make_request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+
 # @pytest.fixture
 # def create_test_user(session: Session):
 #    user = User(name="Test User", email="test@example.com", hashed_password="hashedpassword", is_active=True, role_id=0)
@@ -30,19 +35,19 @@ from tests.common.test_router_common import *
 def test_authenticate_invalid_token(secret_key: str) -> None:
     invalid_token = "thisisnotavalidtoken"
     with pytest.raises(HTTPException, match="Invalid token") as excinfo:
-        authenticate(invalid_token, secret_key=secret_key)
+        authenticate(make_request(), invalid_token, secret_key=secret_key)
     assert excinfo.value.status_code == status.HTTP_400_BAD_REQUEST
 
 
 def test_authenticate_missing_token(secret_key: str) -> None:
     with pytest.raises(HTTPException) as excinfo:
-        authenticate("", secret_key=secret_key)  # Используйте секретный ключ внутри
+        authenticate(make_request(), "", secret_key=secret_key)  # Используйте секретный ключ внутри
     assert excinfo.value.status_code == status.HTTP_403_FORBIDDEN
     assert excinfo.value.detail == "Sign in for access"
 
 
 def test_get_current_user(session: Session, test_token: str, secret_key: str, email: str) -> None:
-    user = get_current_user(session, test_token, secret_key=secret_key)
+    user = get_current_user(make_request(), session, test_token, secret_key=secret_key)
     assert user is not None
     assert user.email == email
 
@@ -50,17 +55,29 @@ def test_get_current_user(session: Session, test_token: str, secret_key: str, em
 def test_get_current_user_invalid_token(session: Session) -> None:
     invalid_token = "thisisnotavalidtoken"
     with pytest.raises(HTTPException) as excinfo:
-        get_current_user(session, invalid_token)
+        get_current_user(make_request(), session, invalid_token)
     assert excinfo.value.status_code == status.HTTP_400_BAD_REQUEST
     assert excinfo.value.detail == "Invalid token"
 
 
 def test_authenticate_via_cookies(session: Session, test_token: str, secret_key: str, email: str) -> None:
-    user = authenticate_via_cookies(session, test_token, secret_key=secret_key)
+    user = authenticate_via_cookies(make_request(), session, test_token, secret_key=secret_key)
     assert user is not None
     assert user.email == email
 
 
 def test_authenticate_via_cookies_no_token(session: Session, secret_key: str) -> None:
-    user = authenticate_via_cookies(session, "", secret_key=secret_key)
+    user = authenticate_via_cookies(make_request(), session, "", secret_key=secret_key)
     assert user is None
+
+
+def test_get_current_user_reuses_request_payload(session: Session, test_token: str, secret_key: str, email: str) -> None:
+    request = make_request()
+    first = get_current_user(request, session, test_token, secret_key=secret_key)
+    payload = request.state.token_payload
+    assert request.state.access_token == test_token
+    # Повторная зависимость в том же запросе берёт payload из request.state
+    second = get_current_user(request, session, test_token, secret_key=secret_key)
+    assert request.state.token_payload is payload
+    assert first is not None and second is not None
+    assert second.email == email
@@ -1,4 +1,9 @@
-from src.auth.hash_password import HashPassword
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from src.auth.hash_password import HashPassword, PasswordHashExecutor, password_hash_executor, pwd_context
 from tests.common.test_router_common import *  # [wildcard-import]
 
 hash_password = HashPassword()
@@ -23,3 +28,35 @@ def test_verify_hash() -> None:
     # Проверьте, что неправильные пароли не проходят проверку
     assert not hash_password.verify_hash("wrongpassword", hashed)
     assert not hash_password.verify_hash("AnotherSecurePassword", hashed)  # Чувствительность к регистру
+
+
+def test_verify_and_update_rehashes_outdated_cost() -> None:
+    password = "rehashme"
+    outdated = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash(password)
+
+    verified, new_hash = hash_password.verify_and_update(password, outdated)
+    assert verified
+    assert new_hash is not None
+    assert pwd_context.identify(new_hash) == "bcrypt"
+    assert not pwd_context.needs_update(new_hash)
+    assert hash_password.verify_hash(password, new_hash)
+
+    # Актуальный хэш не пересчитывается, неверный пароль не приводит к пересчёту
+    assert hash_password.verify_and_update(password, new_hash) == (True, None)
+    assert hash_password.verify_and_update("wrongpassword", outdated) == (False, None)
+
+
+def test_async_hashing_in_executor() -> None:
+    async def run() -> None:
+        hashed = await hash_password.create_hash_async("asyncpassword")
+        assert await hash_password.verify_and_update_async("asyncpassword", hashed) == (True, None)
+
+    asyncio.run(run())
+    assert password_hash_executor.pending == 0
+
+
+def test_executor_rejects_when_queue_full() -> None:
+    executor = PasswordHashExecutor(max_workers=1, max_pending=0)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(executor.run(hash_password.create_hash, "password"))
+    assert excinfo.value.status_code == 503
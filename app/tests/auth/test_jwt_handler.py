@@ -3,7 +3,13 @@ from datetime import datetime, timedelta
 import pytest
 from fastapi import HTTPException
 from jose import jwt
-from src.auth.jwt_handler import create_access_token, verify_access_token
+from src.auth.jwt_handler import (
+    VerifiedTokenCache,
+    create_access_token,
+    verified_token_cache,
+    verify_access_token,
+    verify_access_token_cached,
+)
 from tests.common.test_router_common import *  # [wildcard-import]
 
 # Сделаем временную SECRET_KEY для теста
@@ -56,3 +62,46 @@ def test_invalid_token() -> None:
 
     assert excinfo.value.status_code == 400
     assert excinfo.value.detail == "Invalid token"
+
+
+def test_verify_access_token_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    token = create_access_token(user={"id": 123, "name": "testuser"}, secret_key=SECRET_KEY)
+    verified_token_cache.clear()
+    first = verify_access_token_cached(token, secret_key=SECRET_KEY)
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("токен верифицирован повторно")
+
+    monkeypatch.setattr("src.auth.jwt_handler.verify_access_token", fail)
+    assert verify_access_token_cached(token, secret_key=SECRET_KEY) is first
+    # Другой секрет - другой ключ кэша
+    with pytest.raises(AssertionError):
+        verify_access_token_cached(token, secret_key="othersecret")
+    verified_token_cache.clear()
+
+
+def test_verified_token_cache_expiry_and_lru() -> None:
+    cache = VerifiedTokenCache(maxsize=2)
+    expired = {"user": {}, "expires": (datetime.utcnow() - timedelta(seconds=10)).timestamp()}
+    valid = {"user": {}, "expires": (datetime.utcnow() + timedelta(hours=1)).timestamp()}
+    cache.put("expired", SECRET_KEY, expired)
+    assert cache.get("expired", SECRET_KEY) is None
+    assert len(cache) == 0
+
+    cache.put("a", SECRET_KEY, valid)
+    cache.put("b", SECRET_KEY, valid)
+    assert cache.get("a", SECRET_KEY) is valid
+    cache.put("c", SECRET_KEY, valid)
+    # Вытеснена наименее недавно использованная запись
+    assert cache.get("b", SECRET_KEY) is None
+    assert cache.get("a", SECRET_KEY) is valid
+    assert cache.get("c", SECRET_KEY) is valid
+
+
+def test_expired_token_not_cached() -> None:
+    expired_payload = {"user": {"id": 1}, "expires": (datetime.utcnow() - timedelta(seconds=10)).timestamp()}
+    expired_token = jwt.encode(expired_payload, SECRET_KEY, algorithm="HS256")
+    for _ in range(2):
+        with pytest.raises(HTTPException) as excinfo:
+            verify_access_token_cached(expired_token, secret_key=SECRET_KEY)
+        assert excinfo.value.detail == "Token expired!"
@@ -0,0 +1,23 @@
+"""
+Заглушка ml_worker/antifraud_model_handler.py для тестов синхронной оценки.
+
+Помечает мошеннической транзакцию с суммой больше 1000; транзакция с отрицательной суммой
+обрабатывается SLOW_SECONDS секунд, чтобы проверить таймаут и лимит одновременной оценки.
+"""
+
+import time
+from types import SimpleNamespace
+from typing import Any, List
+
+SLOW_SECONDS = 1.0
+
+
+def get_antifraud_handler() -> None:
+    return None
+
+
+def run_antifraud_task(input_json: Any) -> List[SimpleNamespace]:
+    rows = input_json["input_data"]
+    if any(row["TransactionAmt"] < 0 for row in rows):
+        time.sleep(SLOW_SECONDS)
+    return [SimpleNamespace(TransactionID=row["TransactionID"], isFraud=int(row["TransactionAmt"] > 1000)) for row in rows]
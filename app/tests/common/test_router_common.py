@@ -11,7 +11,8 @@ from src.database.config import get_settings
 from src.database.database import get_session
 from src.models.role import Role
 from src.models.user import User
-from src.services.crud.user import create_user
+from src.services.crud.task import task_status_cache
+from src.services.crud.user import create_user, user_cache
 
 
 @pytest.fixture(name="secret_key")
@@ -53,6 +54,9 @@ def admin_role_fixture(session: Session) -> Role:
 def session_fixture() -> Generator[Session, None, None]:
     engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
     SQLModel.metadata.create_all(engine)
+    # Кэши пользователей и статусов задач общие для процесса: записи из предыдущего теста относятся к другой БД
+    user_cache.clear()
+    task_status_cache.clear()
     with Session(engine) as session:
         yield session
 
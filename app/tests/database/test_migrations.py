@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import sqlalchemy as sa
+from alembic import command
+from sqlmodel import Session, SQLModel, create_engine
+from src.database.database import alembic_config
+from src.models.task import Task
+
+# Схема таблиц задач и транзакций до появления миграций (создана create_all предыдущей версии)
+LEGACY_SCHEMA = [
+    "CREATE TABLE model (id INTEGER PRIMARY KEY)",
+    """CREATE TABLE task (
+        id INTEGER PRIMARY KEY, task_id VARCHAR NOT NULL, status VARCHAR NOT NULL,
+        model_id INTEGER REFERENCES model (id), created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL
+    )""",
+    """CREATE TABLE fintransaction (
+        id INTEGER PRIMARY KEY, created_at DATETIME NOT NULL,
+        task_id INTEGER REFERENCES task (id) ON DELETE CASCADE
+    )""",
+    "INSERT INTO task (id, task_id, status, created_at) VALUES (1, 'legacy', 'success', '2025-01-01 00:00:00')",
+]
+
+
+def test_upgrade_legacy_database(tmp_path: Path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.exec_driver_sql(statement)
+        command.upgrade(alembic_config(connection), "head")
+
+    inspector = sa.inspect(engine)
+    assert {"statscounter", "taskchunk", "alembic_version"} <= set(inspector.get_table_names())
+    assert {"updated_at", "idempotency_key", "expected_chunks", "received_chunks"} <= {column["name"] for column in inspector.get_columns("task")}
+    assert "ux_task_idempotency_key" in {index["name"] for index in inspector.get_indexes("task")}
+    assert {"ix_fintransaction_created_at_id", "ix_fintransaction_task_id"} <= {index["name"] for index in inspector.get_indexes("fintransaction")}
+
+    with Session(engine) as session:
+        task = session.get(Task, 1)
+        assert task is not None
+        assert (task.received_chunks, task.expected_chunks, task.idempotency_key) == (0, None, None)
+        assert task.updated_at == task.created_at
+
+
+def test_upgrade_is_noop_for_current_schema(tmp_path: Path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'current.db'}")
+    SQLModel.metadata.create_all(engine)
+    # База, созданная create_all без отметки Alembic: миграция проверяет схему и ничего не меняет
+    with engine.begin() as connection:
+        command.upgrade(alembic_config(connection), "head")
+        assert connection.exec_driver_sql("SELECT version_num FROM alembic_version").scalar() == "5f1c2a9d7b3e"
+        command.upgrade(alembic_config(connection), "head")
@@ -0,0 +1,70 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from src.auth.jwt_handler import create_access_token
+from src.models.access_policy import AccessPolicy
+from src.models.role import Role
+from src.permission.policy_cache import AccessPolicyCache, access_policy_cache
+from tests.common.test_router_common import *
+
+
+def create_policies(session: Session) -> None:
+    user_role = Role(name="user")
+    session.add(user_role)
+    session.commit()
+    session.add_all(
+        [
+            AccessPolicy(role_id=user_role.id, resource="/dashboard", action="GET"),
+            AccessPolicy(role_id=user_role.id, resource="/predict_fin_transaction", action="POST"),
+            AccessPolicy(role_id=user_role.id, resource="/api/predict/task/status/{task_id}", action="GET"),
+            # Политика в старом формате, без параметров пути
+            AccessPolicy(role_id=user_role.id, resource="/api/predict/task/result/", action="GET"),
+        ]
+    )
+    session.commit()
+
+
+def test_is_allowed(session: Session) -> None:
+    create_policies(session)
+    cache = AccessPolicyCache(ttl=60)
+    cache.load(session)
+
+    assert not cache.is_stale()
+    assert cache.is_allowed("user", "/dashboard", "get")
+    assert cache.is_allowed("user", "/predict_fin_transaction", "POST")
+    assert cache.is_allowed("user", "/api/predict/task/status/{task_id}", "GET")
+    assert cache.is_allowed("user", "/api/predict/task/result/{task_id}", "GET")
+    assert not cache.is_allowed("user", "/api/predict/task/status/", "GET")
+    assert not cache.is_allowed("user", "/dashboard", "POST")
+    assert not cache.is_allowed("user", "/users", "GET")
+    assert not cache.is_allowed("guest", "/dashboard", "GET")
+
+
+def test_stale_until_loaded_and_after_ttl(session: Session) -> None:
+    cache = AccessPolicyCache(ttl=60)
+    assert cache.is_stale()
+    cache.load(session)
+    assert not cache.is_stale()
+
+    expired = AccessPolicyCache(ttl=-1)
+    expired.load(session)
+    assert expired.is_stale()
+
+
+def test_middleware_uses_cached_policies(client: TestClient, session: Session, secret_key: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    create_policies(session)
+    # Общий кэш процесса восстанавливается после теста
+    monkeypatch.setattr(access_policy_cache, "_policies", access_policy_cache._policies)
+    monkeypatch.setattr(access_policy_cache, "_loaded_at", access_policy_cache._loaded_at)
+    access_policy_cache.load(session)
+    token = create_access_token({"id": 1, "email": "user@example.com", "role": "user"}, secret_key=secret_key)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/api/tasks/", headers=headers)
+    assert response.status_code == 403
+
+    # Доступ разрешён по шаблону маршрута: запрос доходит до обработчика, задача не найдена
+    response = client.get(f"/api/predict/task/status/{uuid.uuid4()}", headers=headers)
+    assert response.status_code == 404
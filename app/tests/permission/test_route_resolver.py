@@ -0,0 +1,17 @@
+from src.app import app
+from src.permission.route_resolver import RouteTemplateResolver
+
+
+def test_resolve_route_template() -> None:
+    resolver = RouteTemplateResolver(app.router)
+    assert resolver.resolve("GET", "/dashboard") == "/dashboard"
+    assert resolver.resolve("GET", "/api/predict/task/status/3f1c9a52-8d7e-4c1b-9a0e-2b6f5d4c3a21") == "/api/predict/task/status/{task_id}"
+    assert resolver.resolve("GET", "/api/tasks/42") == "/api/tasks/{id}"
+    assert resolver.resolve("POST", "/api/tasks/new") == "/api/tasks/new"
+
+
+def test_resolve_route_template_partial_and_missing() -> None:
+    resolver = RouteTemplateResolver(app.router)
+    # Совпадение только по пути: роутер ответит 405, но шаблон известен
+    assert resolver.resolve("PUT", "/dashboard") == "/dashboard"
+    assert resolver.resolve("GET", "/no/such/route") is None
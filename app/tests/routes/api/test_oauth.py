@@ -2,8 +2,9 @@ import uuid
 
 from fastapi import status
 from fastapi.testclient import TestClient
+from passlib.context import CryptContext
 from sqlmodel import Session
-from src.auth.hash_password import HashPassword
+from src.auth.hash_password import HashPassword, pwd_context
 from src.models.role import Role
 from src.models.user import User
 from tests.common.test_router_common import *
@@ -114,3 +115,27 @@ def test_signin_invalid_password(client: TestClient, session: Session, test_user
     )
     assert response.status_code == 401
     assert response.json() == {"detail": "Invalid details passed."}
+
+
+def test_signin_rehashes_outdated_password_hash(client: TestClient, session: Session, test_user: User) -> None:
+    user_role = session.query(Role).filter_by(name="user").first()
+    assert user_role is not None
+    outdated_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("testpassword")
+    user = User(
+        name="Legacy User",
+        email="legacy@example.com",
+        hashed_password=outdated_hash,
+        role_id=user_role.id,
+    )
+    session.add(user)
+    session.commit()
+
+    response = client.post(
+        "/api/oauth/signin",
+        data={"username": "legacy@example.com", "password": "testpassword"},
+    )
+    assert response.status_code == 200
+    session.refresh(user)
+    assert user.hashed_password != outdated_hash
+    assert not pwd_context.needs_update(user.hashed_password)
+    assert HashPassword().verify_hash("testpassword", user.hashed_password)
@@ -0,0 +1,394 @@
+import asyncio
+import uuid
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from src.models.fin_transaction import FinTransaction
+from src.models.model import Model
+from src.models.task import Task
+from tests.common.test_router_common import *
+
+
+def create_success_task(session: Session, rows: int) -> Task:
+    task = Task(task_id=str(uuid.uuid4()), status="success")
+    session.add(task)
+    session.commit()
+    session.refresh(task)
+    for i in range(rows):
+        session.add(
+            FinTransaction(
+                TransactionID=1000 + i,
+                TransactionDT=86400,
+                TransactionAmt=68.5,
+                ProductCD="W",
+                C=[1.0] * 14,
+                D=[None] * 15,
+                M=["T"] * 9,
+                V=[1.0] * 339,
+                isFraud=i % 2,
+                task_id=task.id,
+            )
+        )
+    session.commit()
+    return task
+
+
+def test_get_task_result_streams_all_rows(client: TestClient, session: Session, test_token: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    import src.routes.api.predict as predict_module
+
+    # Маленькая пачка, чтобы проверить склейку нескольких чанков
+    monkeypatch.setattr(predict_module, "STREAM_BATCH_SIZE", 2)
+    headers = {"Authorization": f"Bearer {test_token}"}
+    task = create_success_task(session, rows=5)
+
+    response = client.get(f"/api/predict/task/result/{task.task_id}", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["task_id"] == task.task_id
+    assert data["status"] == "success"
+    assert [p["TransactionID"] for p in data["predictions"]] == [1000, 1001, 1002, 1003, 1004]
+    assert [p["isFraud"] for p in data["predictions"]] == [0, 1, 0, 1, 0]
+    assert len(data["predictions"][0]["V"]) == 339
+
+
+def test_get_task_result_empty_task(client: TestClient, session: Session, test_token: str) -> None:
+    headers = {"Authorization": f"Bearer {test_token}"}
+    task = create_success_task(session, rows=0)
+
+    response = client.get(f"/api/predict/task/result/{task.task_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"task_id": task.task_id, "status": "success", "predictions": []}
+
+
+def test_get_task_result_pending(client: TestClient, session: Session, test_token: str) -> None:
+    headers = {"Authorization": f"Bearer {test_token}"}
+    task = Task(task_id=str(uuid.uuid4()), status="init")
+    session.add(task)
+    session.commit()
+
+    response = client.get(f"/api/predict/task/result/{task.task_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "init"
+    assert response.json()["predictions"] is None
+
+
+def test_get_task_result_wait_times_out(client: TestClient, session: Session, test_token: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    from src.database.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "TASK_RESULT_MAX_WAIT", 0.05)
+    headers = {"Authorization": f"Bearer {test_token}"}
+    task = Task(task_id=str(uuid.uuid4()), status="init")
+    session.add(task)
+    session.commit()
+
+    response = client.get(f"/api/predict/task/result/{task.task_id}?wait=30", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"task_id": task.task_id, "status": "init", "predictions": None}
+
+
+def test_get_task_result_wait_finished_task(client: TestClient, session: Session, test_token: str) -> None:
+    task = create_success_task(session, rows=1)
+    response = client.get(f"/api/predict/task/result/{task.task_id}?wait=30", headers={"Authorization": f"Bearer {test_token}"})
+    assert response.status_code == 200
+    assert [p["TransactionID"] for p in response.json()["predictions"]] == [1000]
+
+
+def test_get_task_status_conditional(client: TestClient, session: Session, test_token: str) -> None:
+    headers = {"Authorization": f"Bearer {test_token}"}
+    task = Task(task_id=str(uuid.uuid4()), status="init")
+    session.add(task)
+    session.commit()
+
+    response = client.get(f"/api/predict/task/status/{task.task_id}", headers=headers)
+    assert response.status_code == 200
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+
+    response = client.get(f"/api/predict/task/status/{task.task_id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    response = client.get(f"/api/predict/task/status/{task.task_id}", headers={**headers, "If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    client.post(f"/api/predict/send_task_result?task_id={task.task_id}", json=[make_prediction_payload(1, 68.5)])
+    response = client.get(f"/api/predict/task/status/{task.task_id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["status"] == "success"
+    assert response.headers["etag"] != etag
+
+
+def test_get_task_result_conditional(client: TestClient, session: Session, test_token: str) -> None:
+    headers = {"Authorization": f"Bearer {test_token}"}
+    task = create_success_task(session, rows=2)
+
+    response = client.get(f"/api/predict/task/result/{task.task_id}", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    response = client.get(f"/api/predict/task/result/{task.task_id}", headers={**headers, "If-None-Match": f'W/{etag}, "other"'})
+    assert response.status_code == 304
+
+
+def make_prediction_payload(transaction_id: int, amount: float) -> dict:
+    return {
+        "TransactionID": transaction_id,
+        "TransactionDT": 86400,
+        "TransactionAmt": amount,
+        "ProductCD": "W",
+        "C": [1.0] * 14,
+        "D": [None] * 15,
+        "M": ["T"] * 9,
+        "V": [1.0] * 339,
+        "id": [None] * 27,
+    }
+
+
+def test_score_transactions(client: TestClient, test_token: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    import src.routes.api.predict as predict_module
+    from src.services.scoring.scorer import InProcessScorer
+
+    stub_model_path = str(Path(__file__).resolve().parents[2] / "common" / "stub_model")
+    scorer = InProcessScorer(model_path=stub_model_path, workers=1, max_concurrency=2, timeout=5.0, max_batch=10)
+    scorer.start()
+    monkeypatch.setattr(predict_module, "in_process_scorer", scorer)
+    headers = {"Authorization": f"Bearer {test_token}"}
+    try:
+        response = client.post(
+            "/api/predict/score",
+            json=[make_prediction_payload(1, 68.5), make_prediction_payload(2, 2500.0)],
+            headers=headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["items"] == [{"TransactionID": 1, "isFraud": 0}, {"TransactionID": 2, "isFraud": 1}]
+        assert data["latency_ms"] > 0
+
+        stats = client.get("/api/predict/score/stats", headers=headers).json()
+        assert stats["enabled"] is True
+        assert stats["scored"] == 2
+        assert stats["p50_ms"] is not None
+    finally:
+        scorer.shutdown()
+
+
+def test_score_transactions_disabled(client: TestClient, test_token: str) -> None:
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.post("/api/predict/score", json=[make_prediction_payload(1, 68.5)], headers=headers)
+    assert response.status_code == 503
+    assert response.json() == {"detail": "In-process scoring is disabled"}
+
+
+def enable_rpc_scoring(monkeypatch: pytest.MonkeyPatch, call: Any) -> None:
+    import src.routes.api.predict as predict_module
+    from src.database.config import get_settings
+
+    settings = get_settings().model_copy(update={"RPC_SCORING_ENABLED": True})
+    monkeypatch.setattr(predict_module, "get_settings", lambda: settings)
+    monkeypatch.setattr(predict_module.rpc_client, "call", call)
+
+
+def test_score_transactions_rpc(client: TestClient, test_token: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    requests: list = []
+
+    async def call(payload: Any, timeout: float) -> Any:
+        requests.append(payload)
+        return {"predictions": [{"TransactionID": row["TransactionID"], "isFraud": int(row["TransactionAmt"] > 1000)} for row in payload["input_data"]]}
+
+    enable_rpc_scoring(monkeypatch, call)
+    response = client.post(
+        "/api/predict/score/rpc",
+        json=[make_prediction_payload(1, 68.5), make_prediction_payload(2, 2500.0)],
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["items"] == [{"TransactionID": 1, "isFraud": 0}, {"TransactionID": 2, "isFraud": 1}]
+    assert [row["TransactionID"] for row in requests[0]["input_data"]] == [1, 2]
+
+
+@pytest.mark.parametrize(
+    "error, status_code",
+    [(asyncio.TimeoutError(), 504), (OverflowError(), 503), (ConnectionError(), 503)],
+)
+def test_score_transactions_rpc_errors(client: TestClient, test_token: str, monkeypatch: pytest.MonkeyPatch, error: Exception, status_code: int) -> None:
+    async def call(payload: Any, timeout: float) -> Any:
+        raise error
+
+    enable_rpc_scoring(monkeypatch, call)
+    response = client.post("/api/predict/score/rpc", json=[make_prediction_payload(1, 68.5)], headers={"Authorization": f"Bearer {test_token}"})
+    assert response.status_code == status_code
+
+
+def test_score_transactions_rpc_worker_error(client: TestClient, test_token: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def call(payload: Any, timeout: float) -> Any:
+        return {"error": "model failed"}
+
+    enable_rpc_scoring(monkeypatch, call)
+    response = client.post("/api/predict/score/rpc", json=[make_prediction_payload(1, 68.5)], headers={"Authorization": f"Bearer {test_token}"})
+    assert response.status_code == 502
+
+
+def test_score_transactions_rpc_disabled(client: TestClient, test_token: str) -> None:
+    response = client.post("/api/predict/score/rpc", json=[make_prediction_payload(1, 68.5)], headers={"Authorization": f"Bearer {test_token}"})
+    assert response.status_code == 503
+    assert response.json() == {"detail": "RPC scoring is disabled"}
+
+
+def test_task_events_finished_task(client: TestClient, session: Session, test_token: str) -> None:
+    task = create_success_task(session, rows=1)
+    response = client.get(f"/api/predict/task/events/{task.task_id}", headers={"Authorization": f"Bearer {test_token}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == f'event: status\ndata: {{"task_id": "{task.task_id}", "status": "success"}}\n\n'
+
+
+def test_task_events_not_found(client: TestClient, test_token: str) -> None:
+    response = client.get(f"/api/predict/task/events/{uuid.uuid4()}", headers={"Authorization": f"Bearer {test_token}"})
+    assert response.status_code == 404
+
+
+@pytest.fixture(name="sent_tasks")
+def sent_tasks_fixture(session: Session, monkeypatch: pytest.MonkeyPatch) -> list:
+    import src.routes.api.predict as predict_module
+
+    session.add(Model(name="test", path="runs:/test/model", is_active=True))
+    session.commit()
+    sent: list = []
+    monkeypatch.setattr(predict_module.rabbit_client, "send_task", lambda task: sent.append(task) or True)
+    return sent
+
+
+def test_create_task_deduplicates_same_batch(client: TestClient, test_token: str, sent_tasks: list) -> None:
+    headers = {"Authorization": f"Bearer {test_token}"}
+    batch = [make_prediction_payload(1, 68.5), make_prediction_payload(2, 10.0)]
+
+    first = client.post("/api/predict/task/create", json=batch, headers=headers)
+    second = client.post("/api/predict/task/create", json=batch, headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert second.json()["task_id"] == first.json()["task_id"]
+    assert "idempotent-replayed" not in first.headers
+    assert second.headers["idempotent-replayed"] == "true"
+    assert len(sent_tasks) == 1
+
+    other = client.post("/api/predict/task/create", json=batch[:1], headers=headers)
+    assert other.json()["task_id"] != first.json()["task_id"]
+    assert len(sent_tasks) == 2
+
+
+def test_create_task_idempotency_key_header(client: TestClient, test_token: str, sent_tasks: list) -> None:
+    headers = {"Authorization": f"Bearer {test_token}"}
+
+    first = client.post("/api/predict/task/create", json=[make_prediction_payload(1, 68.5)], headers={**headers, "Idempotency-Key": "order-1"})
+    retry = client.post("/api/predict/task/create", json=[make_prediction_payload(2, 10.0)], headers={**headers, "Idempotency-Key": "order-1"})
+    other = client.post("/api/predict/task/create", json=[make_prediction_payload(1, 68.5)], headers={**headers, "Idempotency-Key": "order-2"})
+    assert retry.json()["task_id"] == first.json()["task_id"]
+    assert other.json()["task_id"] != first.json()["task_id"]
+    assert len(sent_tasks) == 2
+
+
+def test_create_task_publish_failure_releases_key(client: TestClient, session: Session, test_token: str, sent_tasks: list, monkeypatch: pytest.MonkeyPatch) -> None:
+    import src.routes.api.predict as predict_module
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    batch = [make_prediction_payload(1, 68.5)]
+    monkeypatch.setattr(predict_module.rabbit_client, "send_task", lambda task: False)
+    response = client.post("/api/predict/task/create", json=batch, headers=headers)
+    assert response.status_code == 503
+    # Задача остаётся и завершается с ошибкой: её task_id мог получить параллельный запрос
+    failed = session.query(Task).one()
+    assert failed.status == "error"
+    assert failed.idempotency_key is None
+
+    monkeypatch.setattr(predict_module.rabbit_client, "send_task", lambda task: sent_tasks.append(task) or True)
+    response = client.post("/api/predict/task/create", json=batch, headers=headers)
+    assert response.status_code == 200
+    assert "idempotent-replayed" not in response.headers
+    assert response.json()["task_id"] != failed.task_id
+    assert len(sent_tasks) == 1
+
+
+def make_parquet(rows: int) -> bytes:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.table(
+        {
+            "TransactionID": list(range(1000, 1000 + rows)),
+            "isFraud": [0] * rows,
+            "TransactionDT": [86400] * rows,
+            "TransactionAmt": [10.0 + i for i in range(rows)],
+            "ProductCD": ["W"] * rows,
+            "V1": [None] * rows,
+        }
+    )
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink)
+    return sink.getvalue().to_pybytes()
+
+
+def test_upload_task_parquet(client: TestClient, session: Session, test_token: str, sent_tasks: list, monkeypatch: pytest.MonkeyPatch) -> None:
+    from src.database.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "UPLOAD_CHUNK_ROWS", 2)
+    headers = {"Authorization": f"Bearer {test_token}", "Content-Type": "application/vnd.apache.parquet"}
+    response = client.post("/api/predict/task/upload", content=make_parquet(5), headers=headers)
+    assert response.status_code == 200
+    task_id = response.json()["task_id"]
+
+    assert [(message["task_id"], message["chunk"]) for message in sent_tasks] == [(task_id, 0), (task_id, 1), (task_id, 2)]
+    assert [row["TransactionID"] for message in sent_tasks for row in message["input_data"]] == [1000, 1001, 1002, 1003, 1004]
+    assert sent_tasks[0]["input_data"][0]["V"][0] is None
+    task = session.query(Task).filter(Task.task_id == task_id).one()
+    assert (task.status, task.expected_chunks) == ("init", 3)
+
+
+def test_upload_task_spools_off_event_loop(client: TestClient, session: Session, test_token: str, sent_tasks: list, monkeypatch: pytest.MonkeyPatch) -> None:
+    import src.routes.api.predict as predict_module
+
+    to_thread = asyncio.to_thread
+    offloaded: list = []
+
+    async def record_to_thread(func: Any, *args: Any) -> Any:
+        offloaded.append((getattr(func, "__name__", ""), bytes(args[0]) if args and isinstance(args[0], bytearray) else b""))
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(predict_module, "UPLOAD_SPOOL_WRITE_BYTES", 256)
+    monkeypatch.setattr(predict_module.asyncio, "to_thread", record_to_thread)
+    body = make_parquet(5)
+    headers = {"Authorization": f"Bearer {test_token}", "Content-Type": "application/vnd.apache.parquet"}
+    response = client.post("/api/predict/task/upload", content=iter(body[i : i + 100] for i in range(0, len(body), 100)), headers=headers)
+    assert response.status_code == 200
+
+    # Тело записано во временный файл пачками не меньше порога (кроме последней) в потоке
+    writes = [data for name, data in offloaded if name == "write"]
+    assert b"".join(writes) == body
+    assert len(writes) > 1 and all(len(data) >= 256 for data in writes[:-1])
+    assert [name for name, _ in offloaded].count("flush") == 1
+    assert len(sent_tasks) == 1
+
+
+def test_upload_task_rejects_bad_input(client: TestClient, session: Session, test_token: str, sent_tasks: list, monkeypatch: pytest.MonkeyPatch) -> None:
+    from src.database.config import get_settings
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.post("/api/predict/task/upload", content=b"a,b\n1,2\n", headers={**headers, "Content-Type": "text/csv"})
+    assert response.status_code == 415
+    response = client.post("/api/predict/task/upload", content=b"a,b\n1,2\n", headers={**headers, "Content-Type": "application/vnd.apache.parquet"})
+    assert response.status_code == 400
+    monkeypatch.setattr(get_settings(), "BULK_UPLOAD_MAX_BYTES", 16)
+    response = client.post("/api/predict/task/upload", content=make_parquet(1), headers={**headers, "Content-Type": "application/vnd.apache.parquet"})
+    assert response.status_code == 413
+    assert session.query(Task).count() == 0
+    assert sent_tasks == []
+
+
+def test_upload_task_publish_failure(client: TestClient, session: Session, test_token: str, sent_tasks: list, monkeypatch: pytest.MonkeyPatch) -> None:
+    import src.routes.api.predict as predict_module
+
+    monkeypatch.setattr(predict_module.rabbit_client, "send_task", lambda task: False)
+    headers = {"Authorization": f"Bearer {test_token}", "Content-Type": "application/vnd.apache.parquet"}
+    response = client.post("/api/predict/task/upload", content=make_parquet(3), headers=headers)
+    assert response.status_code == 503
+    assert session.query(Task).one().status == "error"
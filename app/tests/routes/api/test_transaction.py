@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from fastapi import status
 from fastapi.testclient import TestClient
 from sqlmodel import Session
@@ -12,7 +14,46 @@ def test_retrieve_all_transactions(client: TestClient, session: Session, test_to
     headers = {"Authorization": f"Bearer {test_token}"}
     response = client.get("/api/transaction/", headers=headers)
     assert response.status_code == status.HTTP_200_OK
-    assert isinstance(response.json(), list)
+    assert isinstance(response.json()["items"], list)
+    assert response.json()["next_cursor"] is None
+
+
+def test_retrieve_transactions_paginated(client: TestClient, session: Session, test_token: str) -> None:
+    headers = {"Authorization": f"Bearer {test_token}"}
+    for i in range(5):
+        session.add(
+            FinTransaction(
+                TransactionID=1000 + i,
+                TransactionDT=1710000000,
+                TransactionAmt=100.50,
+                ProductCD="W",
+                created_at=datetime(2025, 1, 1, 12, 0, i),
+            )
+        )
+    session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/transaction/", headers=headers, params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen.extend(item["TransactionID"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [1004, 1003, 1002, 1001, 1000]
+
+
+def test_retrieve_transactions_invalid_cursor(client: TestClient, test_token: str) -> None:
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get("/api/transaction/", headers=headers, params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
 def test_retrieve_transaction(client: TestClient, session: Session, test_user: User, test_token: str) -> None:
@@ -0,0 +1,97 @@
+from typing import Any, List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from src.models.model import Model
+from src.models.task import Task
+from tests.common.test_router_common import *
+
+HEADER = "TransactionID,isFraud,TransactionDT,TransactionAmt,ProductCD,card1,C1,V1,id_01\n"
+
+
+def make_csv(rows: int) -> bytes:
+    return (HEADER + "".join(f"{1000 + i},0,86400,{10.0 + i},W,13926,1.0,,-5.0\n" for i in range(rows))).encode()
+
+
+@pytest.fixture(name="sent_chunks")
+def sent_chunks_fixture(session: Session, monkeypatch: pytest.MonkeyPatch) -> List[Any]:
+    import src.routes.predict_transactions as predict_transactions_module
+    from src.database.config import get_settings
+
+    session.add(Model(name="test", path="runs:/test/model", is_active=True))
+    session.commit()
+    monkeypatch.setattr(get_settings(), "UPLOAD_CHUNK_ROWS", 2)
+    sent: List[Any] = []
+    monkeypatch.setattr(predict_transactions_module.rabbitmq_client, "send_task", lambda task: sent.append(task) or True)
+    return sent
+
+
+def upload(client: TestClient, test_token: str, content: bytes) -> str:
+    client.cookies.set("access_token", f"Bearer {test_token}")
+    response = client.post(
+        "/predict_fin_transaction/upload",
+        files={"transactions_file": ("tx.csv", content, "text/csv")},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
+    return response.headers["location"].split("task_id=")[1]
+
+
+def test_upload_publishes_chunks(client: TestClient, session: Session, test_token: str, sent_chunks: List[Any]) -> None:
+    task_id = upload(client, test_token, make_csv(5))
+
+    assert [chunk["chunk"] for chunk in sent_chunks] == [0, 1, 2]
+    assert all(chunk["task_id"] == task_id for chunk in sent_chunks)
+    assert [row["TransactionID"] for chunk in sent_chunks for row in chunk["input_data"]] == [1000, 1001, 1002, 1003, 1004]
+    assert sent_chunks[0]["input_data"][0]["V"][0] is None
+    assert sent_chunks[0]["input_data"][0]["id"][0] == -5.0
+
+    task = session.query(Task).filter(Task.task_id == task_id).one()
+    assert (task.status, task.expected_chunks, task.received_chunks) == ("init", 3, 0)
+
+    for chunk in sent_chunks:
+        result = [{**row, "isFraud": 0} for row in chunk["input_data"]]
+        response = client.post(f"/api/predict/send_task_result?task_id={task_id}&chunk={chunk['chunk']}", json=result)
+        assert response.status_code == 200
+        session.refresh(task)
+        assert task.status == ("success" if chunk["chunk"] == 2 else "init")
+    assert len(task.fintransaction) == 5
+
+
+def test_duplicate_chunk_result_is_ignored(client: TestClient, session: Session, test_token: str, sent_chunks: List[Any]) -> None:
+    task_id = upload(client, test_token, make_csv(5))
+    task = session.query(Task).filter(Task.task_id == task_id).one()
+
+    def send(chunk: Any) -> None:
+        result = [{**row, "isFraud": 0} for row in chunk["input_data"]]
+        response = client.post(f"/api/predict/send_task_result?task_id={task_id}&chunk={chunk['chunk']}", json=result)
+        assert response.status_code == 200
+
+    # Повторные доставки чанков 0 и 1 не засчитываются как недостающий чанк 2
+    for chunk in (sent_chunks[0], sent_chunks[0], sent_chunks[1], sent_chunks[1]):
+        send(chunk)
+    session.refresh(task)
+    assert (task.status, task.received_chunks) == ("init", 2)
+    assert len(task.fintransaction) == 4
+
+    send(sent_chunks[2])
+    send(sent_chunks[2])
+    session.refresh(task)
+    assert (task.status, task.received_chunks) == ("success", 3)
+    assert len(task.fintransaction) == 5
+
+
+def test_upload_empty_file_fails_task(client: TestClient, session: Session, test_token: str, sent_chunks: List[Any]) -> None:
+    task_id = upload(client, test_token, HEADER.encode())
+    assert sent_chunks == []
+    assert session.query(Task).filter(Task.task_id == task_id).one().status == "error"
+
+
+def test_upload_publish_failure_fails_task(client: TestClient, session: Session, test_token: str, sent_chunks: List[Any], monkeypatch: pytest.MonkeyPatch) -> None:
+    import src.routes.predict_transactions as predict_transactions_module
+
+    monkeypatch.setattr(predict_transactions_module.rabbitmq_client, "send_task", lambda task: False)
+    task_id = upload(client, test_token, make_csv(3))
+    task = session.query(Task).filter(Task.task_id == task_id).one()
+    assert (task.status, task.expected_chunks) == ("error", None)
@@ -0,0 +1,138 @@
+from sqlmodel import Session
+from src.models.fin_transaction import FinTransaction
+from src.models.stats_counter import (
+    FIN_TRANSACTION_FRAUD,
+    FIN_TRANSACTION_LEGIT,
+    FIN_TRANSACTION_TOTAL,
+    USER_TOTAL,
+)
+from src.models.task import Task
+from src.models.user import User
+from src.services.crud.fin_transaction import (
+    create_fin_transaction,
+    delete_all_fin_transactions,
+    delete_fin_trnsaction_by_id,
+)
+from src.services.crud.stats_counter import (
+    get_counters,
+    increment_counters,
+    reconcile_counters,
+)
+from src.services.crud.task import create_task, delete_all_tasks, delete_task_by_id
+from tests.common.test_router_common import *
+
+
+def make_transaction(transaction_id: int, is_fraud: int | None) -> FinTransaction:
+    return FinTransaction(
+        TransactionID=transaction_id,
+        TransactionDT=1710000000,
+        TransactionAmt=100,
+        ProductCD="W",
+        isFraud=is_fraud,
+    )
+
+
+def test_get_counters_defaults_to_zero(session: Session) -> None:
+    counters = get_counters(session)
+    assert counters == {
+        FIN_TRANSACTION_TOTAL: 0,
+        FIN_TRANSACTION_FRAUD: 0,
+        FIN_TRANSACTION_LEGIT: 0,
+        USER_TOTAL: 0,
+    }
+
+
+def test_increment_counters(session: Session) -> None:
+    increment_counters({FIN_TRANSACTION_TOTAL: 3, FIN_TRANSACTION_FRAUD: 1}, session)
+    session.commit()
+    increment_counters({FIN_TRANSACTION_TOTAL: -1}, session)
+    session.commit()
+
+    counters = get_counters(session)
+    assert counters[FIN_TRANSACTION_TOTAL] == 2
+    assert counters[FIN_TRANSACTION_FRAUD] == 1
+
+
+def test_increment_counters_creates_missing_counter_once(session: Session) -> None:
+    # Оба приращения до commit: второй upsert попадает в ветку ON CONFLICT DO UPDATE
+    increment_counters({USER_TOTAL: 1}, session)
+    increment_counters({USER_TOTAL: 1, FIN_TRANSACTION_TOTAL: 0}, session)
+    session.commit()
+
+    counters = get_counters(session)
+    assert counters[USER_TOTAL] == 2
+    assert counters[FIN_TRANSACTION_TOTAL] == 0
+
+
+def test_crud_maintains_counters(session: Session, test_user: User) -> None:
+    fraud = create_fin_transaction(make_transaction(1, 1), session)
+    create_fin_transaction(make_transaction(2, 0), session)
+    create_fin_transaction(make_transaction(3, None), session)
+
+    counters = get_counters(session)
+    assert counters[FIN_TRANSACTION_TOTAL] == 3
+    assert counters[FIN_TRANSACTION_FRAUD] == 1
+    assert counters[FIN_TRANSACTION_LEGIT] == 1
+    assert counters[USER_TOTAL] == 1
+
+    delete_fin_trnsaction_by_id(fraud.id, session)
+    counters = get_counters(session)
+    assert counters[FIN_TRANSACTION_TOTAL] == 2
+    assert counters[FIN_TRANSACTION_FRAUD] == 0
+
+    delete_all_fin_transactions(session)
+    assert get_counters(session)[FIN_TRANSACTION_TOTAL] == 0
+
+
+def test_reconcile_counters_repairs_drift(session: Session, test_user: User) -> None:
+    # Записи, добавленные в обход CRUD, не отражаются в счётчиках
+    session.add_all([make_transaction(1, 1), make_transaction(2, 1), make_transaction(3, 0)])
+    session.commit()
+    assert get_counters(session)[FIN_TRANSACTION_TOTAL] == 0
+
+    reconciled = reconcile_counters(session)
+
+    assert reconciled == get_counters(session)
+    assert reconciled[FIN_TRANSACTION_TOTAL] == 3
+    assert reconciled[FIN_TRANSACTION_FRAUD] == 2
+    assert reconciled[FIN_TRANSACTION_LEGIT] == 1
+    assert reconciled[USER_TOTAL] == 1
+
+
+def make_task_transactions(session: Session, task_id: str, *is_fraud: int | None) -> Task:
+    task = create_task(Task(task_id=task_id, status="success", model_id=1), session)
+    for i, is_fraud_value in enumerate(is_fraud):
+        transaction = make_transaction(1000 * task.id + i, is_fraud_value)
+        transaction.task_id = task.id
+        create_fin_transaction(transaction, session)
+    return task
+
+
+def test_delete_task_decrements_counters(session: Session) -> None:
+    task = make_task_transactions(session, "task1", 1, 0, None)
+    make_task_transactions(session, "task2", 1)
+    create_fin_transaction(make_transaction(99, 0), session)
+    assert get_counters(session)[FIN_TRANSACTION_TOTAL] == 5
+
+    delete_task_by_id(task.id, session)
+
+    counters = get_counters(session)
+    assert counters[FIN_TRANSACTION_TOTAL] == 2
+    assert counters[FIN_TRANSACTION_FRAUD] == 1
+    assert counters[FIN_TRANSACTION_LEGIT] == 1
+    assert session.query(FinTransaction).count() == 2
+    assert reconcile_counters(session) == counters
+
+
+def test_delete_all_tasks_recounts_counters(session: Session) -> None:
+    make_task_transactions(session, "task1", 1, 0)
+    make_task_transactions(session, "task2", 1)
+    create_fin_transaction(make_transaction(99, 0), session)
+
+    delete_all_tasks(session)
+
+    counters = get_counters(session)
+    assert counters[FIN_TRANSACTION_TOTAL] == 1
+    assert counters[FIN_TRANSACTION_FRAUD] == 0
+    assert counters[FIN_TRANSACTION_LEGIT] == 1
+    assert session.query(FinTransaction).count() == 1
@@ -1,11 +1,17 @@
+from typing import Any
+
+import pytest
 from sqlmodel import Session
 from src.models.task import Task
 from src.services.crud.task import (
     create_task,
     delete_all_tasks,
     delete_task_by_id,
+    find_task_by_idempotency_key,
     get_all_tasks,
     get_task_by_id,
+    get_task_status_cached,
+    task_status_cache,
 )
 from tests.common.test_router_common import *
 
@@ -62,3 +68,60 @@ def test_delete_all_tasks(session: Session) -> None:
 
     delete_all_tasks(session)
     assert len(get_all_tasks(session)) == 0
+
+
+def test_get_task_status_cached(session: Session) -> None:
+    task = create_task(Task(task_id="cached_task", status="init", model_id=1), session)
+    snapshot = get_task_status_cached("cached_task", session)
+    assert snapshot is not None
+    assert (snapshot.id, snapshot.status) == (task.id, "init")
+    assert snapshot.etag.startswith('"')
+
+    # Повторное чтение - из кэша, без обращения к БД
+    session.query(Task).filter(Task.id == task.id).update({"status": "success"})
+    session.commit()
+    assert get_task_status_cached("cached_task", session) == snapshot
+
+    task_status_cache.pop("cached_task")
+    assert get_task_status_cached("cached_task", session).status == "success"
+    assert get_task_status_cached("missing", session) is None
+
+
+def test_get_task_status_cached_skips_store_after_concurrent_invalidation(session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    create_task(Task(task_id="racing_task", status="init", model_id=1), session)
+    task_status_cache.pop("racing_task")
+    exec_ = session.exec
+
+    def exec_with_notify(*args: Any, **kwargs: Any) -> Any:
+        result = exec_(*args, **kwargs)
+        # Уведомление о смене статуса обработано после чтения, но до записи в кэш
+        task_status_cache.pop("racing_task")
+        return result
+
+    monkeypatch.setattr(session, "exec", exec_with_notify)
+    assert get_task_status_cached("racing_task", session).status == "init"
+    assert task_status_cache.get("racing_task") is None
+
+    monkeypatch.undo()
+    assert get_task_status_cached("racing_task", session).status == "init"
+    assert task_status_cache.get("racing_task") is not None
+
+
+def test_delete_task_invalidates_status_cache(session: Session) -> None:
+    task = create_task(Task(task_id="deleted_task", status="init", model_id=1), session)
+    assert get_task_status_cached("deleted_task", session) is not None
+    delete_task_by_id(task.id, session)
+    assert get_task_status_cached("deleted_task", session) is None
+
+
+def test_find_task_by_idempotency_key(session: Session) -> None:
+    task = create_task(Task(task_id="keyed_task", status="init", model_id=1, idempotency_key="k1"), session)
+    updated_at = task.updated_at
+    assert find_task_by_idempotency_key("k1", session, window=60).id == task.id
+    assert find_task_by_idempotency_key("k2", session, window=60) is None
+
+    # Окно истекло: ключ освобождается, время изменения задачи сохраняется
+    assert find_task_by_idempotency_key("k1", session, window=-60) is None
+    session.refresh(task)
+    assert task.idempotency_key is None
+    assert task.updated_at == updated_at
@@ -1,3 +1,6 @@
+from datetime import datetime
+
+import pytest
 from sqlmodel import Session
 from src.models.fin_transaction import FinTransaction
 from src.models.user import User
@@ -5,8 +8,8 @@ from src.services.crud.fin_transaction import (
     create_fin_transaction,
     delete_all_fin_transactions,
     delete_fin_trnsaction_by_id,
-    get_all_fin_transactions,
     get_fin_transaction_by_id,
+    get_fin_transactions_page,
 )
 from tests.common.test_router_common import *
 
@@ -30,37 +33,33 @@ def test_create_transaction(session: Session, test_user: User) -> None:
     assert created_transaction.TransactionAmt == 100
 
 
-def test_get_all_transactions(session: Session, test_user: User) -> None:
-    transactions = [
-        FinTransaction(
-            TransactionID=12345,
-            TransactionDT=1710000000,
-            TransactionAmt=100,
-            ProductCD="W",
-            card1=1111,
-            card2=2222,
-            card4="visa",
-            isFraud=1,
-            task_id=5,
-        ),
-        FinTransaction(
-            TransactionID=54321,
-            TransactionDT=1710000000,
-            TransactionAmt=200,
-            ProductCD="W",
-            card1=1111,
-            card2=2222,
-            card4="visa",
-            isFraud=1,
-            task_id=5,
-        ),
-    ]
-    session.add_all(transactions)
+def test_get_transactions_page(session: Session, test_user: User) -> None:
+    # Две записи с одинаковым created_at проверяют разрешение коллизий по id
+    created = [datetime(2025, 1, 1, 12, 0, 0), datetime(2025, 1, 1, 12, 0, 0), datetime(2025, 1, 1, 12, 0, 1)]
+    for i, created_at in enumerate(created):
+        session.add(
+            FinTransaction(
+                TransactionID=100 + i,
+                TransactionDT=1710000000,
+                TransactionAmt=100,
+                ProductCD="W",
+                created_at=created_at,
+            )
+        )
     session.commit()
 
-    retrieved_transactions = get_all_fin_transactions(session)
-    assert len(retrieved_transactions) == 2
-    assert all(isinstance(t, FinTransaction) for t in retrieved_transactions)
+    first_page, cursor = get_fin_transactions_page(session, limit=2)
+    assert [t.TransactionID for t in first_page] == [102, 101]
+    assert cursor is not None
+
+    second_page, cursor = get_fin_transactions_page(session, limit=2, cursor=cursor)
+    assert [t.TransactionID for t in second_page] == [100]
+    assert cursor is None
+
+
+def test_get_transactions_page_invalid_cursor(session: Session) -> None:
+    with pytest.raises(ValueError):
+        get_fin_transactions_page(session, limit=2, cursor="garbage")
 
 
 def test_get_transaction_by_id(session: Session, test_user: User) -> None:
@@ -133,4 +132,4 @@ def test_delete_all_transactions(session: Session, test_user: User) -> None:
     session.commit()
 
     delete_all_fin_transactions(session)
-    assert len(get_all_fin_transactions(session)) == 0
+    assert get_fin_transactions_page(session) == ([], None)
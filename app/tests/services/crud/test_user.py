@@ -1,3 +1,5 @@
+import pytest
+from sqlalchemy import event
 from sqlmodel import Session
 from src.models.role import Role
 from src.models.user import User
@@ -7,8 +9,12 @@ from src.services.crud.user import (
     delete_user_by_id,
     get_all_users,
     get_user_by_email,
+    get_user_by_email_cached,
     get_user_by_id,
     get_user_by_name,
+    invalidate_cached_user,
+    update_user,
+    user_cache,
 )
 from tests.common.test_router_common import *
 
@@ -146,3 +152,70 @@ def test_delete_all_users(session: Session, test_user: User) -> None:
 
     delete_all_users(session)
     assert len(get_all_users(session)) == 0
+
+
+def test_get_user_by_email_cached(session: Session, test_user: User) -> None:
+    statements: list[str] = []
+
+    def count_statements(*args: object) -> None:
+        statements.append(str(args[2]))
+
+    user = get_user_by_email_cached(test_user.email, session)
+    assert user is not None
+    assert test_user.email in user_cache._entries
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", count_statements)
+    try:
+        with Session(engine) as other_session:
+            cached = get_user_by_email_cached(test_user.email, other_session)
+            assert cached is not None
+            assert cached.id == test_user.id
+            assert cached.roles.name == test_user.roles.name
+            assert cached in other_session
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statements)
+    # Повторная аутентификация не обращается к БД
+    assert statements == []
+
+
+def test_get_user_by_email_cached_missing(session: Session) -> None:
+    assert get_user_by_email_cached("missing@example.com", session) is None
+    assert len(user_cache) == 0
+
+
+def test_get_user_by_email_cached_skips_store_after_concurrent_invalidation(session: Session, test_user: User) -> None:
+    def invalidate(*args: object) -> None:
+        # Другой запрос изменил или удалил пользователя после чтения, но до записи в кэш
+        invalidate_cached_user(test_user.email)
+
+    engine = session.get_bind()
+    event.listen(engine, "after_cursor_execute", invalidate)
+    try:
+        assert get_user_by_email_cached(test_user.email, session) is not None
+    finally:
+        event.remove(engine, "after_cursor_execute", invalidate)
+    assert test_user.email not in user_cache._entries
+
+    assert get_user_by_email_cached(test_user.email, session) is not None
+    assert test_user.email in user_cache._entries
+
+
+@pytest.mark.parametrize("change_email", [False, True])
+def test_update_user_invalidates_cache(session: Session, test_user: User, change_email: bool) -> None:
+    old_email = test_user.email
+    get_user_by_email_cached(old_email, session)
+    test_user.name = "Renamed"
+    if change_email:
+        test_user.email = "renamed@example.com"
+    update_user(test_user, session)
+    assert old_email not in user_cache._entries
+    cached = get_user_by_email_cached(test_user.email, session)
+    assert cached is not None
+    assert cached.name == "Renamed"
+
+
+def test_delete_user_invalidates_cache(session: Session, test_user: User) -> None:
+    get_user_by_email_cached(test_user.email, session)
+    delete_user_by_id(test_user.id, session)
+    assert get_user_by_email_cached(test_user.email, session) is None
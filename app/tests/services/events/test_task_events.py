@@ -0,0 +1,101 @@
+import asyncio
+import json
+from typing import List, Optional
+
+from src.services.events.task_events import TaskEventHub, format_sse, stream_task_events, wait_for_terminal_status
+from tests.common.test_router_common import *
+
+
+def parse_events(chunks: List[bytes]) -> List[Optional[str]]:
+    """Статусы из SSE-событий; пульс (комментарий) - None."""
+    result: List[Optional[str]] = []
+    for chunk in chunks:
+        text = chunk.decode("utf-8")
+        if text.startswith(":"):
+            result.append(None)
+        else:
+            result.append(json.loads(text.split("data: ", 1)[1])["status"])
+    return result
+
+
+def test_publish_fans_out_to_task_subscribers() -> None:
+    hub = TaskEventHub()
+
+    async def scenario() -> None:
+        with hub.subscribe("a") as first, hub.subscribe("a") as second, hub.subscribe("b") as other:
+            assert hub.publish_status("a", "success") == 2
+            assert first.get_nowait() == second.get_nowait() == {"task_id": "a", "status": "success"}
+            assert other.empty()
+        assert hub.subscriber_count() == 0
+        assert hub.publish_status("a", "success") == 0
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_drops_oldest_event() -> None:
+    hub = TaskEventHub(queue_size=2)
+
+    async def scenario() -> None:
+        with hub.subscribe("a") as queue:
+            for status in ("init", "processing", "success"):
+                hub.publish_status("a", status)
+            assert [queue.get_nowait()["status"] for _ in range(2)] == ["processing", "success"]
+
+    asyncio.run(scenario())
+
+
+def test_stream_waits_for_terminal_status() -> None:
+    hub = TaskEventHub()
+
+    async def scenario() -> List[bytes]:
+        chunks: List[bytes] = []
+
+        async def consume() -> None:
+            async for chunk in stream_task_events(hub, "a", lambda: "init", heartbeat=0.05):
+                chunks.append(chunk)
+
+        consumer = asyncio.create_task(consume())
+        while hub.subscriber_count("a") == 0:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.08)
+        hub.publish_status("a", "success")
+        await asyncio.wait_for(consumer, timeout=1.0)
+        return chunks
+
+    statuses = parse_events(asyncio.run(scenario()))
+    assert statuses[0] == "init"
+    assert None in statuses  # пульс, пока задача не завершена
+    assert statuses[-1] == "success"
+    assert hub.subscriber_count() == 0
+
+
+def test_stream_finished_task_closes_immediately() -> None:
+    hub = TaskEventHub()
+
+    async def collect() -> List[bytes]:
+        return [chunk async for chunk in stream_task_events(hub, "a", lambda: "success")]
+
+    chunks = asyncio.run(collect())
+    assert chunks == [format_sse({"task_id": "a", "status": "success"})]
+
+
+def test_wait_for_terminal_status_wakes_on_event() -> None:
+    hub = TaskEventHub()
+
+    async def scenario() -> Optional[str]:
+        waiter = asyncio.create_task(wait_for_terminal_status(hub, "a", lambda: "init", timeout=5.0))
+        while hub.subscriber_count("a") == 0:
+            await asyncio.sleep(0.01)
+        hub.publish_status("a", "processing")
+        hub.publish_status("a", "success")
+        return await asyncio.wait_for(waiter, timeout=1.0)
+
+    assert asyncio.run(scenario()) == "success"
+    assert hub.subscriber_count() == 0
+
+
+def test_wait_for_terminal_status_timeout_returns_current_status() -> None:
+    hub = TaskEventHub()
+    assert asyncio.run(wait_for_terminal_status(hub, "a", lambda: "init", timeout=0.05)) == "init"
+    assert asyncio.run(wait_for_terminal_status(hub, "a", lambda: None, timeout=5.0)) is None
+    assert hub.subscriber_count() == 0
@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+from sqlalchemy.engine import make_url
+from sqlmodel import Session
+from src.services.cache.ttl_cache import TTLCache
+from src.services.events.task_events import TaskEventHub
+from src.services.events.task_notify import PROCESS_ID, TaskStatusListener, listener_conninfo, notify_task_status
+from tests.common.test_router_common import *
+
+
+def test_dispatch_publishes_foreign_notifications() -> None:
+    hub = TaskEventHub()
+    listener = TaskStatusListener(hub)
+
+    async def scenario() -> None:
+        with hub.subscribe("a") as queue:
+            assert listener.dispatch(json.dumps({"task_id": "a", "status": "success", "origin": "other-replica"}))
+            assert queue.get_nowait() == {"task_id": "a", "status": "success"}
+
+    asyncio.run(scenario())
+
+
+def test_dispatch_invalidates_cached_status() -> None:
+    cache: TTLCache[str] = TTLCache(ttl=60, maxsize=10)
+    cache.set("a", "init")
+    cache.set("b", "init")
+    listener = TaskStatusListener(TaskEventHub(), cache=cache)
+
+    assert listener.dispatch(json.dumps({"task_id": "a", "status": "success", "origin": "other-replica"}))
+    assert cache.get("a") is None
+    assert cache.get("b") == "init"
+
+
+def test_dispatch_skips_own_and_invalid_notifications() -> None:
+    hub = TaskEventHub()
+    listener = TaskStatusListener(hub)
+
+    async def scenario() -> None:
+        with hub.subscribe("a") as queue:
+            assert not listener.dispatch(json.dumps({"task_id": "a", "status": "success", "origin": PROCESS_ID}))
+            assert not listener.dispatch("not json")
+            assert not listener.dispatch(json.dumps({"status": "success"}))
+            assert queue.empty()
+
+    asyncio.run(scenario())
+
+
+def test_notify_task_status_is_noop_outside_postgres(session: Session) -> None:
+    notify_task_status(session, "a", "success")
+    session.commit()
+
+
+def test_listener_conninfo_drops_driver() -> None:
+    url = make_url("postgresql+psycopg://user:secret@db:5432/app")
+    assert listener_conninfo(url) == "postgresql://user:secret@db:5432/app"
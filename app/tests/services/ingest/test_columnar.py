@@ -0,0 +1,92 @@
+import io
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from src.services.ingest.columnar import ColumnarFile, batch_to_messages
+from src.services.ingest.messages import frame_to_messages
+
+CSV = (
+    "TransactionID,isFraud,TransactionDT,TransactionAmt,ProductCD,card4,addr1,P_emaildomain,C1,D15,M9,V1,V339,id_01,id_12,extra\n"
+    "2987000,0,86400,68.5,W,discover,315.0,,1.0,,T,1.0,,,,x\n"
+    "2987001,1,86401,29.0,,mastercard,,gmail.com,,0.0,,,0.0,-5.0,NotFound,y\n"
+    "2987002,0,86469,59.0,H,,330.0,outlook.com,1.0,,F,1.0,1.0,,Found,z\n"
+)
+
+
+def make_frame() -> pd.DataFrame:
+    return pd.read_csv(io.StringIO(CSV))
+
+
+def write(path: Path, content_type: str, table: pa.Table) -> str:
+    if content_type == "application/vnd.apache.parquet":
+        pq.write_table(table, path, row_group_size=2)
+    elif content_type == "application/vnd.apache.arrow.file":
+        with pa.ipc.new_file(path, table.schema) as writer:
+            writer.write_table(table, max_chunksize=2)
+    else:
+        with pa.ipc.new_stream(path, table.schema) as writer:
+            writer.write_table(table, max_chunksize=2)
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "content_type",
+    ["application/vnd.apache.parquet", "application/vnd.apache.arrow.file", "application/vnd.apache.arrow.stream"],
+)
+def test_columnar_file_reads_needed_columns_in_batches(tmp_path: Path, content_type: str) -> None:
+    df = make_frame()
+    path = write(tmp_path / "tx", content_type, pa.Table.from_pandas(df, preserve_index=False))
+
+    with ColumnarFile(path, content_type) as source:
+        assert "isFraud" not in source.columns and "extra" not in source.columns
+        batches = list(source.batches(1))
+        assert [batch.num_rows for batch in batches] == [1, 1, 1]
+        assert all(batch.schema.names == source.columns for batch in batches)
+        messages = [message for batch in batches for message in batch_to_messages(batch)]
+
+    assert messages == frame_to_messages(df)
+
+
+def test_batch_to_messages_nulls_and_native_types() -> None:
+    table = pa.table(
+        {
+            "TransactionID": pa.array([1.0, 2.0]),
+            "TransactionDT": pa.array([10, 20], pa.int32()),
+            "TransactionAmt": pa.array([5, 6]),
+            "ProductCD": pa.array(["W", None]).dictionary_encode(),
+            "card1": pa.array([13926, None]),
+            "V1": pa.array([float("nan"), 0.5]),
+        }
+    )
+    first, second = batch_to_messages(table.to_batches()[0])
+    assert (first["TransactionID"], first["TransactionDT"], first["TransactionAmt"]) == (1, 10, 5.0)
+    assert type(first["TransactionID"]) is int and type(first["TransactionAmt"]) is float
+    assert first["ProductCD"] == "W" and second["ProductCD"] is None
+    assert first["card1"] == 13926 and second["card1"] is None
+    assert first["V"][0] is None and second["V"][0] == 0.5
+    assert first["card2"] is None and len(first["V"]) == 339 and second["id"] == [None] * 27
+
+
+def test_batch_to_messages_rejects_null_keys() -> None:
+    table = pa.table({"TransactionID": [1, None], "TransactionDT": [1, 2], "TransactionAmt": [1.0, 2.0], "ProductCD": ["W", "W"]})
+    with pytest.raises(ValueError, match="TransactionID"):
+        batch_to_messages(table.to_batches()[0])
+
+
+def test_columnar_file_requires_key_columns(tmp_path: Path) -> None:
+    path = write(tmp_path / "tx", "application/vnd.apache.parquet", pa.table({"TransactionID": [1], "TransactionAmt": [1.0]}))
+    with pytest.raises(ValueError, match="TransactionDT, ProductCD"):
+        ColumnarFile(path, "application/vnd.apache.parquet")
+
+
+def test_columnar_file_rejects_invalid_content(tmp_path: Path) -> None:
+    path = tmp_path / "tx"
+    path.write_bytes(b"TransactionID,TransactionDT\n1,2\n")
+    for content_type in ("application/vnd.apache.parquet", "application/vnd.apache.arrow.stream"):
+        with pytest.raises(ValueError, match="Invalid columnar file"):
+            ColumnarFile(str(path), content_type)
+    with pytest.raises(ValueError, match="Unsupported"):
+        ColumnarFile(str(path), "text/csv")
@@ -0,0 +1,77 @@
+import asyncio
+from typing import List
+
+import pandas as pd
+import pytest
+from src.services.ingest.csv_stream import CsvChunker, iter_multipart_file
+from starlette.requests import Request
+
+CSV = b"\xef\xbb\xbfTransactionID,TransactionAmt,ProductCD\r\n1,10.5,W\r\n2,,H\r\n\r\n3,7.0,W\r\n4,1.0,C\r\n5,2.5,W"
+
+
+def chunk_all(data: bytes, piece: int, chunk_rows: int) -> List[pd.DataFrame]:
+    chunker = CsvChunker(chunk_rows)
+    frames: List[pd.DataFrame] = []
+    for start in range(0, len(data), piece):
+        frames.extend(chunker.feed(data[start : start + piece]))
+    frames.extend(chunker.close())
+    assert chunker.rows == sum(len(frame) for frame in frames)
+    return frames
+
+
+@pytest.mark.parametrize("piece", [1, 7, len(CSV)])
+def test_chunker_splits_rows_regardless_of_piece_boundaries(piece: int) -> None:
+    frames = chunk_all(CSV, piece, chunk_rows=2)
+    assert [len(frame) for frame in frames] == [2, 2, 1]
+    combined = pd.concat(frames, ignore_index=True)
+    assert list(combined.columns) == ["TransactionID", "TransactionAmt", "ProductCD"]
+    assert combined["TransactionID"].tolist() == [1, 2, 3, 4, 5]
+    assert combined["ProductCD"].tolist() == ["W", "H", "W", "C", "W"]
+    assert pd.isna(combined["TransactionAmt"][1])
+
+
+def test_chunker_header_only() -> None:
+    assert chunk_all(b"TransactionID,TransactionAmt\n", 4, chunk_rows=2) == []
+
+
+def make_multipart_request(parts: List[bytes]) -> Request:
+    boundary = "testboundary"
+    body = (
+        b"--testboundary\r\n"
+        b'Content-Disposition: form-data; name="comment"\r\n\r\n'
+        b"ignored\r\n"
+        b"--testboundary\r\n"
+        b'Content-Disposition: form-data; name="transactions_file"; filename="tx.csv"\r\n'
+        b"Content-Type: text/csv\r\n\r\n" + b"".join(parts) + b"\r\n--testboundary--\r\n"
+    )
+    messages = [{"type": "http.request", "body": body[i : i + 5], "more_body": i + 5 < len(body)} for i in range(0, len(body), 5)]
+
+    async def receive() -> dict:
+        return messages.pop(0)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={boundary}".encode())],
+    }
+    return Request(scope, receive)
+
+
+def test_iter_multipart_file_streams_only_file_field() -> None:
+    async def collect() -> List[bytes]:
+        return [data async for data in iter_multipart_file(make_multipart_request([CSV]), "transactions_file")]
+
+    pieces = asyncio.run(collect())
+    assert len(pieces) > 1
+    assert b"".join(pieces) == CSV
+
+
+def test_iter_multipart_file_rejects_other_content_types() -> None:
+    async def collect() -> None:
+        request = Request({"type": "http", "method": "POST", "path": "/", "headers": [(b"content-type", b"text/csv")]})
+        async for _ in iter_multipart_file(request, "transactions_file"):
+            pass
+
+    with pytest.raises(ValueError):
+        asyncio.run(collect())
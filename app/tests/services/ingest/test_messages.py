@@ -0,0 +1,123 @@
+import gc
+import io
+import json
+from contextlib import ExitStack, nullcontext
+from typing import Any, Callable, ContextManager
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.services.ingest import messages as messages_module
+from src.services.ingest.messages import BLOCK_COLUMNS, MESSAGE_FIELDS, frame_to_messages, gc_paused, row_to_message
+
+CSV = (
+    "TransactionID,TransactionDT,TransactionAmt,ProductCD,card1,card4,addr1,P_emaildomain,C1,C14,D1,D15,M1,M9,V1,V339,id_01,id_12,id_27\n"
+    "2987000,86400,68.5,W,13926,discover,315.0,,1.0,1.0,14.0,,T,,1.0,,,,\n"
+    "2987001,86401,29.0,,2755,mastercard,,gmail.com,,2.0,0.0,0.0,,F,,0.0,-5.0,NotFound,Found\n"
+    "2987002,86469,59.0,H,,,330.0,outlook.com,1.0,,,,F,T,1.0,1.0,,Found,\n"
+)
+
+
+def reference(df: pd.DataFrame) -> list:
+    return [row_to_message(row) for row in df.to_dict(orient="records")]
+
+
+def test_frame_to_messages_matches_row_conversion() -> None:
+    df = pd.read_csv(io.StringIO(CSV))
+    messages = frame_to_messages(df)
+    assert messages == reference(df)
+    assert json.dumps(messages) == json.dumps(reference(df))
+    assert [list(message) for message in messages] == [MESSAGE_FIELDS] * 3
+
+
+def test_frame_to_messages_nan_and_missing_columns_become_none() -> None:
+    messages = frame_to_messages(pd.read_csv(io.StringIO(CSV)))
+    first, second = messages[0], messages[1]
+    assert first["P_emaildomain"] is None and first["card2"] is None
+    assert second["ProductCD"] is None
+    assert [len(first[field]) for field in BLOCK_COLUMNS] == [14, 15, 9, 339, 27]
+    assert first["C"][0] == 1.0 and first["C"][1] is None and first["D"][14] is None
+    assert second["id"][0] == -5.0 and second["id"][11] == "NotFound" and second["id"][26] == "Found"
+    assert type(first["TransactionID"]) is int and type(first["TransactionAmt"]) is float
+    assert first["card1"] == 13926.0 and type(first["V"][0]) is float
+
+
+def test_frame_to_messages_numeric_types_are_native() -> None:
+    df = pd.DataFrame(
+        {
+            "TransactionID": np.array([1.0, 2.0]),
+            "TransactionDT": [10, 20],
+            "TransactionAmt": [5, 6],
+            "ProductCD": ["W", np.nan],
+            "card1": np.array([1, 2], dtype="int32"),
+            "V1": [True, False],
+        }
+    )
+    messages = frame_to_messages(df)
+    assert messages == reference(df)
+    assert [type(value) for value in (messages[0]["TransactionID"], messages[0]["TransactionAmt"], messages[0]["card1"])] == [int, float, int]
+    assert messages[0]["V"][0] is True
+
+
+def test_frame_to_messages_requires_key_columns() -> None:
+    df = pd.read_csv(io.StringIO(CSV)).drop(columns=["ProductCD"])
+    with pytest.raises(KeyError):
+        frame_to_messages(df)
+    with pytest.raises(KeyError):
+        reference(df)
+
+
+def test_frame_to_messages_empty_frame() -> None:
+    assert frame_to_messages(pd.read_csv(io.StringIO(CSV)).iloc[:0]) == []
+
+
+def test_frame_to_messages_restores_gc_state() -> None:
+    df = pd.read_csv(io.StringIO(CSV))
+    assert gc.isenabled()
+    frame_to_messages(df)
+    assert gc.isenabled()
+    gc.disable()
+    try:
+        frame_to_messages(df)
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+    with pytest.raises(KeyError):
+        frame_to_messages(df.drop(columns=["TransactionDT"]))
+    assert gc.isenabled()
+
+
+def test_gc_paused_overlapping_pauses() -> None:
+    assert gc.isenabled()
+    with ExitStack() as first, ExitStack() as second:
+        first.enter_context(gc_paused())
+        second.enter_context(gc_paused())
+        # Первая пауза завершилась раньше второй: сборщик остаётся выключенным до конца второй
+        first.close()
+        assert not gc.isenabled()
+    assert gc.isenabled()
+
+
+def count_collections(pause: Callable[[], ContextManager[Any]], df: pd.DataFrame, monkeypatch: pytest.MonkeyPatch) -> int:
+    collections = []
+
+    def on_gc(phase: str, info: dict) -> None:
+        if phase == "start":
+            collections.append(info["generation"])
+
+    monkeypatch.setattr(messages_module, "gc_paused", pause)
+    gc.collect()
+    gc.callbacks.append(on_gc)
+    try:
+        with pause():
+            frame_to_messages(df)
+    finally:
+        gc.callbacks.remove(on_gc)
+    return len(collections)
+
+
+def test_gc_paused_skips_collections_while_building_messages(monkeypatch: pytest.MonkeyPatch) -> None:
+    df = pd.concat([pd.read_csv(io.StringIO(CSV))] * 2000, ignore_index=True)
+    # Без паузы сборщик многократно запускается на созданных словарях и списках сообщений
+    assert count_collections(nullcontext, df, monkeypatch) > 10
+    assert count_collections(gc_paused, df, monkeypatch) == 0
@@ -0,0 +1,28 @@
+import logging
+from logging.handlers import QueueHandler
+
+from src.services.logging.logging import get_logger, setup_logging, truncate_payload
+from tests.common.test_router_common import *
+
+
+def test_get_logger_does_not_duplicate_handlers() -> None:
+    first = get_logger(logger_name="tests.logging.duplicates")
+    second = get_logger(logger_name="tests.logging.duplicates")
+    setup_logging()
+
+    assert first is second
+    assert first.handlers == []
+    queue_handlers = [handler for handler in logging.getLogger().handlers if isinstance(handler, QueueHandler)]
+    assert len(queue_handlers) == 1
+
+
+def test_truncate_payload() -> None:
+    assert truncate_payload("short") == "short"
+    assert truncate_payload({"a": 1}) == "{'a': 1}"
+
+    # Большие коллекции представлены первыми элементами
+    payload = {"V": [1.0 for _ in range(339)]}
+    assert truncate_payload(payload) == "{'V': [1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, ...]}"
+
+    text = "x" * 60
+    assert truncate_payload(text, limit=50) == "x" * 50 + "... [ещё 10 символов]"
@@ -0,0 +1,91 @@
+from typing import Dict
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, create_engine
+from src.models.task import Task
+from src.services.events.task_notify import commit_task_status
+from src.services.metrics.metrics import TimedQueuePool, request_db_time
+from src.services.metrics.middleware import MetricsMiddleware
+from tests.common.test_router_common import *
+
+
+def sample(name: str, labels: Dict[str, str] | None = None) -> float:
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def test_sql_time_is_accumulated_into_request_context() -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+        accumulator = [0.0]
+        token = request_db_time.set(accumulator)
+        try:
+            connection.execute(text("SELECT 1"))
+        finally:
+            request_db_time.reset(token)
+    assert accumulator[0] > 0
+
+
+def test_timed_queue_pool_records_checkout_wait() -> None:
+    engine = create_engine("sqlite://", poolclass=TimedQueuePool, pool_size=1, max_overflow=0)
+    before = sample("db_pool_checkout_wait_seconds_count")
+    with engine.connect():
+        pass
+    assert sample("db_pool_checkout_wait_seconds_count") == before + 1
+
+
+def test_middleware_labels_requests_by_route_template() -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics-test/{item_id}")
+    def item(item_id: int) -> Dict[str, int]:
+        # Синхронный обработчик выполняется в пуле потоков: время SQL должно учитываться и там
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return {"item_id": item_id}
+
+    labels = {"method": "GET", "route": "/metrics-test/{item_id}", "status": "200"}
+    unmatched = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = sample("http_request_duration_seconds_count", labels)
+    before_unmatched = sample("http_request_duration_seconds_count", unmatched)
+    before_db = sample("http_request_db_seconds_sum", {"method": "GET", "route": "/metrics-test/{item_id}"})
+
+    client = TestClient(app)
+    assert client.get("/metrics-test/1").status_code == 200
+    assert client.get("/metrics-test/2").status_code == 200
+    assert client.get("/no-such-route").status_code == 404
+
+    assert sample("http_request_duration_seconds_count", labels) == before + 2
+    assert sample("http_request_duration_seconds_count", unmatched) == before_unmatched + 1
+    assert sample("http_request_db_seconds_sum", {"method": "GET", "route": "/metrics-test/{item_id}"}) > before_db
+
+
+def test_commit_task_status_records_task_duration(session: Session) -> None:
+    task = Task(task_id="timed_task", status="init")
+    session.add(task)
+    session.commit()
+
+    before = sample("task_duration_seconds_count", {"status": "success"})
+    commit_task_status(session, task, "processing")
+    assert sample("task_duration_seconds_count", {"status": "success"}) == before
+    commit_task_status(session, task, "success")
+    assert sample("task_duration_seconds_count", {"status": "success"}) == before + 1
+
+
+def test_metrics_endpoint_reports_tasks_by_status(client: TestClient, session: Session) -> None:
+    session.add_all([Task(task_id="t1", status="init"), Task(task_id="t2", status="success"), Task(task_id="t3", status="success")])
+    session.commit()
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'tasks{status="init"} 1.0' in response.text
+    assert 'tasks{status="success"} 2.0' in response.text
+    assert "http_request_duration_seconds_bucket" in response.text
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+from typing import Any, Callable, List, Optional
+
+import pytest
+from pika.exceptions import AMQPConnectionError, ConnectionWrongStateError
+from src.services.rm import rpc
+from src.services.rm.rm import PUBLISHED_AT_HEADER
+from src.services.rm.rmqconf import RabbitMQConfig
+from src.services.rm.rpc import REPLY_TO_QUEUE, RabbitMQRpcClient, RpcDispatcher
+from tests.common.test_router_common import *
+
+
+class FakeChannel:
+    """Канал, который вместо брокера сразу отвечает на запрос из «воркера» в другом потоке."""
+
+    def __init__(self, client: RabbitMQRpcClient, reply: Optional[Callable[[Any], Any]]) -> None:
+        self.client = client
+        self.reply = reply
+        self.published: List[Any] = []
+
+    def basic_publish(self, exchange: str, routing_key: str, properties: Any, body: bytes) -> None:
+        self.published.append((routing_key, properties, json.loads(body)))
+        if self.reply is not None:
+            answer = json.dumps(self.reply(json.loads(body))).encode("utf-8")
+            self.client._on_reply(self, None, SimpleNamespace(correlation_id=properties.correlation_id), answer)
+
+
+class FakeConnection:
+    def add_callback_threadsafe(self, callback: Callable[[], None]) -> None:
+        threading.Thread(target=callback).start()
+
+
+def make_client(reply: Optional[Callable[[Any], Any]], max_pending: int = 10) -> RabbitMQRpcClient:
+    client = RabbitMQRpcClient(RabbitMQConfig(), max_pending=max_pending)
+    client._connection = FakeConnection()
+    client._channel = FakeChannel(client, reply)
+    client._connected.set()
+    return client
+
+
+def test_call_resolves_reply_by_correlation_id() -> None:
+    client = make_client(lambda body: {"predictions": [{"TransactionID": row["TransactionID"], "isFraud": 0} for row in body["input_data"]]})
+
+    async def scenario() -> List[Any]:
+        return await asyncio.gather(*(client.call({"input_data": [{"TransactionID": i}]}, timeout=1.0) for i in range(5)))
+
+    replies = asyncio.run(scenario())
+    assert [reply["predictions"][0]["TransactionID"] for reply in replies] == list(range(5))
+    assert len(client.dispatcher) == 0
+
+    routing_key, properties, _ = client._channel.published[0]
+    assert routing_key == client.config.rpc_queue_name
+    assert properties.reply_to == REPLY_TO_QUEUE
+    assert properties.expiration == "1000"
+    assert isinstance(properties.headers[PUBLISHED_AT_HEADER], int)
+    assert len({published[1].correlation_id for published in client._channel.published}) == 5
+
+
+def test_call_timeout_discards_pending_request() -> None:
+    client = make_client(reply=None)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(client.call({"input_data": []}, timeout=0.05))
+    assert len(client.dispatcher) == 0
+    # Опоздавший ответ не находит ожидающего запроса и игнорируется
+    assert client.dispatcher.resolve(client._channel.published[0][1].correlation_id, {}) is False
+
+
+def test_call_without_connection() -> None:
+    client = RabbitMQRpcClient(RabbitMQConfig(), max_pending=10)
+    with pytest.raises(ConnectionError):
+        asyncio.run(client.call({"input_data": []}, timeout=0.1))
+
+
+def test_call_on_closing_connection() -> None:
+    client = make_client(reply=None)
+
+    class ClosedConnection:
+        def add_callback_threadsafe(self, callback: Callable[[], None]) -> None:
+            raise ConnectionWrongStateError("BlockingConnection.add_callback_threadsafe() called on closed connection")
+
+    client._connection = ClosedConnection()
+    with pytest.raises(ConnectionError):
+        asyncio.run(client.call({"input_data": []}, timeout=0.1))
+    assert len(client.dispatcher) == 0
+
+
+def test_consumer_thread_reconnects_after_unexpected_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = RabbitMQRpcClient(RabbitMQConfig(), max_pending=10)
+    attempts: List[str] = []
+
+    def connect(params: Any) -> Any:
+        attempts.append("connect")
+        if len(attempts) == 1:
+            raise ValueError("ошибка вне иерархии pika")
+        client._running = False
+        raise AMQPConnectionError("broker unavailable")
+
+    monkeypatch.setattr(rpc.pika, "BlockingConnection", connect)
+    monkeypatch.setattr(rpc, "RECONNECT_DELAY_SEC", 0)
+    client._running = True
+    # Ошибка первой попытки не завершает цикл: поток переподключается, пока клиент не остановлен
+    client._run()
+    assert attempts == ["connect", "connect"]
+    assert not client._connected.is_set()
+
+
+def test_call_rejects_over_max_pending() -> None:
+    client = make_client(reply=None, max_pending=1)
+
+    async def scenario() -> None:
+        pending = asyncio.ensure_future(client.call({"input_data": []}, timeout=1.0))
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(OverflowError):
+                await client.call({"input_data": []}, timeout=1.0)
+        finally:
+            pending.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_dispatcher_fail_all() -> None:
+    dispatcher = RpcDispatcher()
+
+    async def scenario() -> None:
+        future = dispatcher.register("abc")
+        threading.Thread(target=dispatcher.fail_all, args=(ConnectionError("lost"),)).start()
+        with pytest.raises(ConnectionError):
+            await asyncio.wait_for(future, timeout=1.0)
+
+    asyncio.run(scenario())
+    assert len(dispatcher) == 0
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import threading
+from logging.handlers import QueueHandler
+from pathlib import Path
+from typing import Any, Dict, Generator, List
+
+import pytest
+from fastapi import HTTPException
+from src.services.scoring.scorer import InProcessScorer
+from tests.common.test_router_common import *
+
+STUB_MODEL_PATH = str(Path(__file__).resolve().parents[2] / "common" / "stub_model")
+
+
+def make_rows(*amounts: float) -> List[Dict[str, Any]]:
+    return [{"TransactionID": 1000 + i, "TransactionAmt": amount} for i, amount in enumerate(amounts)]
+
+
+def root_handler_types() -> List[str]:
+    return [type(handler).__name__ for handler in logging.getLogger().handlers]
+
+
+def thread_names() -> List[str]:
+    return [thread.name for thread in threading.enumerate()]
+
+
+@pytest.fixture(name="scorer")
+def scorer_fixture() -> Generator[InProcessScorer, None, None]:
+    scorer = InProcessScorer(model_path=STUB_MODEL_PATH, workers=1, max_concurrency=1, timeout=0.5, max_batch=3)
+    scorer.start()
+    yield scorer
+    scorer.shutdown()
+
+
+def test_score_batch(scorer: InProcessScorer) -> None:
+    result = asyncio.run(scorer.score(make_rows(10.0, 5000.0)))
+    assert result == [(1000, 0), (1001, 1)]
+
+    stats = scorer.stats()
+    assert stats["enabled"] is True
+    assert stats["batches"] == 1
+    assert stats["scored"] == 2
+    assert stats["p50_ms"] is not None and stats["p99_ms"] is not None
+
+
+def test_score_disabled() -> None:
+    scorer = InProcessScorer(model_path=None, workers=1, max_concurrency=1, timeout=0.5, max_batch=3)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(scorer.score(make_rows(10.0)))
+    assert excinfo.value.status_code == 503
+    assert scorer.stats()["enabled"] is False
+
+
+def test_score_batch_too_large(scorer: InProcessScorer) -> None:
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(scorer.score(make_rows(1.0, 2.0, 3.0, 4.0)))
+    assert excinfo.value.status_code == 413
+
+
+def test_score_timeout_and_concurrency_limit(scorer: InProcessScorer) -> None:
+    async def run() -> None:
+        # Медленный пакет не укладывается в таймаут, но занимает слот, пока процесс не закончит
+        with pytest.raises(HTTPException) as timeout_exc:
+            await scorer.score(make_rows(-1.0))
+        assert timeout_exc.value.status_code == 504
+        with pytest.raises(HTTPException) as limit_exc:
+            await scorer.score(make_rows(10.0))
+        assert limit_exc.value.status_code == 503
+
+    asyncio.run(run())
+    stats = scorer.stats()
+    assert stats["timeouts"] == 1
+    assert stats["rejected"] == 1
+
+
+def test_pool_process_logs_without_inherited_queue(scorer: InProcessScorer) -> None:
+    assert scorer._executor is not None
+    handler_types = scorer._executor.submit(root_handler_types).result()
+    assert QueueHandler.__name__ not in handler_types
+    assert handler_types == [logging.StreamHandler.__name__]
+    # Процесс создан spawn: поток записи логов, запущенный при импорте модулей приложения, остановлен
+    assert scorer._executor._mp_context.get_start_method() == "spawn"
+    assert scorer._executor.submit(thread_names).result() == ["MainThread"]
@@ -0,0 +1,224 @@
+"""
+Локальная замена RabbitMQ для нагрузочного стенда.
+
+LocalBroker хранит именованные очереди в памяти процесса стенда и раздаётся сервисам через
+multiprocessing.managers. В процессах приложения и воркера install() подменяет pika.BlockingConnection
+на BlockingConnection этого модуля: код сервисов не меняется, а сообщения вместо AMQP уходят в LocalBroker.
+Поддержано только то, что используют сервисы: queue_declare, basic_publish, basic_qos, basic_consume,
+start_consuming и basic_ack/nack/reject.
+
+Брокер сам считает время ожидания сообщения в очереди (публикация -> выдача потребителю) по своим часам,
+а сервисы добавляют свои измерения через record(); стенд забирает их вызовом metrics().
+"""
+
+import itertools
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from multiprocessing.managers import BaseManager
+from types import SimpleNamespace
+from typing import Any, DefaultDict, Deque, Dict, List, Optional, Sequence, Tuple, cast
+
+import pika
+
+# Адрес сервера брокера "host:port" и ключ авторизации (hex) для процессов сервисов
+ADDRESS_ENV = "LOADTEST_BROKER_ADDRESS"
+AUTHKEY_ENV = "LOADTEST_BROKER_AUTHKEY"
+# Сколько ждать сообщения за один запрос к брокеру в start_consuming
+POLL_TIMEOUT_SEC = 0.5
+
+# (время публикации, тело, свойства сообщения)
+Message = Tuple[float, bytes, Dict[str, Any]]
+# (delivery_tag, имя очереди, тело, свойства сообщения)
+Delivery = Tuple[int, str, bytes, Dict[str, Any]]
+
+
+class LocalBroker:
+    """Очереди сообщений и журнал измерений. Методы вызываются из потоков сервера менеджера."""
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._queues: DefaultDict[str, Deque[Message]] = defaultdict(deque)
+        self._unacked: Dict[int, Tuple[str, Message]] = {}
+        self._tags = itertools.count(1)
+        self._metrics: DefaultDict[str, List[float]] = defaultdict(list)
+
+    def declare(self, queue: str) -> None:
+        with self._cond:
+            self._queues[queue]
+
+    def publish(self, queue: str, body: bytes, properties: Dict[str, Any]) -> None:
+        with self._cond:
+            self._queues[queue].append((time.time(), body, properties))
+            self._cond.notify_all()
+
+    def get(self, queues: Sequence[str], timeout: float) -> Optional[Delivery]:
+        """Первое сообщение из любой из очередей queues; None, если за timeout секунд сообщений не было."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                for name in queues:
+                    if self._queues[name]:
+                        message = self._queues[name].popleft()
+                        tag = next(self._tags)
+                        self._unacked[tag] = (name, message)
+                        self._metrics[f"queue_wait:{name}"].append(time.time() - message[0])
+                        return tag, name, message[1], message[2]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def ack(self, tag: int) -> None:
+        with self._cond:
+            self._unacked.pop(tag, None)
+
+    def nack(self, tag: int, requeue: bool) -> None:
+        with self._cond:
+            delivery = self._unacked.pop(tag, None)
+            if delivery is not None and requeue:
+                name, message = delivery
+                self._queues[name].appendleft(message)
+                self._cond.notify_all()
+
+    def depth(self) -> Dict[str, int]:
+        """Число сообщений в каждой очереди и ещё не подтверждённых."""
+        with self._cond:
+            depth = {name: len(queue) for name, queue in self._queues.items()}
+            depth["unacked"] = len(self._unacked)
+            return depth
+
+    def record(self, metric: str, value: float) -> None:
+        with self._cond:
+            self._metrics[metric].append(value)
+
+    def metrics(self) -> Dict[str, List[float]]:
+        with self._cond:
+            return {name: list(values) for name, values in self._metrics.items()}
+
+
+class BrokerManager(BaseManager):
+    pass
+
+
+def serve(broker: LocalBroker) -> Tuple[str, bytes, threading.Thread]:
+    """
+    Запустить сервер брокера в фоновом потоке текущего процесса на свободном порту localhost.
+
+    Возвращает адрес "host:port", ключ авторизации и поток сервера.
+    """
+    BrokerManager.register("broker", callable=lambda: broker)
+    authkey = os.urandom(16)
+    server = BrokerManager(address=("127.0.0.1", 0), authkey=authkey).get_server()
+    thread = threading.Thread(target=server.serve_forever, name="local-broker", daemon=True)
+    thread.start()
+    host, port = cast(Tuple[str, int], server.address)
+    return f"{host}:{port}", authkey, thread
+
+
+_client_lock = threading.Lock()
+_client: Optional[Any] = None
+
+
+def connect() -> Any:
+    """Прокси LocalBroker для процесса сервиса (один на процесс); адрес и ключ - из окружения."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            host, port = os.environ[ADDRESS_ENV].rsplit(":", 1)
+            BrokerManager.register("broker")
+            manager = BrokerManager(address=(host, int(port)), authkey=bytes.fromhex(os.environ[AUTHKEY_ENV]))
+            manager.connect()
+            _client = manager.broker()  # type: ignore[attr-defined]
+        return _client
+
+
+def _properties_dict(properties: Optional[pika.BasicProperties]) -> Dict[str, Any]:
+    if properties is None:
+        return {}
+    fields = ("content_type", "correlation_id", "reply_to", "expiration", "headers")
+    return {name: getattr(properties, name) for name in fields if getattr(properties, name) is not None}
+
+
+class BlockingChannel:
+    """Канал pika поверх LocalBroker. Сообщения выдаются по одному: следующее - после возврата из обработчика."""
+
+    def __init__(self, broker: Any) -> None:
+        self._broker = broker
+        self._consumers: Dict[str, Tuple[Any, bool]] = {}
+        self._consuming = False
+        self.is_open = True
+        self.is_closed = False
+
+    def queue_declare(self, queue: str, **kwargs: Any) -> SimpleNamespace:
+        self._broker.declare(queue)
+        return SimpleNamespace(method=SimpleNamespace(queue=queue, message_count=0, consumer_count=0))
+
+    def basic_qos(self, **kwargs: Any) -> None:
+        pass
+
+    def basic_publish(self, exchange: str, routing_key: str, body: Any, properties: Optional[pika.BasicProperties] = None, **kwargs: Any) -> None:
+        payload = body.encode("utf-8") if isinstance(body, str) else bytes(body)
+        self._broker.publish(routing_key, payload, _properties_dict(properties))
+
+    def basic_consume(self, queue: str, on_message_callback: Any, auto_ack: bool = False, **kwargs: Any) -> str:
+        self._consumers[queue] = (on_message_callback, auto_ack)
+        return f"ctag-{queue}"
+
+    def start_consuming(self) -> None:
+        self._consuming = True
+        while self._consuming and self._consumers:
+            delivery = self._broker.get(list(self._consumers), POLL_TIMEOUT_SEC)
+            if delivery is None:
+                continue
+            tag, queue, body, properties = delivery
+            callback, auto_ack = self._consumers[queue]
+            if auto_ack:
+                self._broker.ack(tag)
+            method = SimpleNamespace(delivery_tag=tag, routing_key=queue, exchange="", redelivered=False)
+            callback(self, method, pika.BasicProperties(**properties), body)
+
+    def stop_consuming(self, *args: Any) -> None:
+        self._consuming = False
+
+    def basic_ack(self, delivery_tag: int = 0, **kwargs: Any) -> None:
+        self._broker.ack(delivery_tag)
+
+    def basic_nack(self, delivery_tag: int = 0, requeue: bool = True, **kwargs: Any) -> None:
+        self._broker.nack(delivery_tag, requeue)
+
+    def basic_reject(self, delivery_tag: int = 0, requeue: bool = True, **kwargs: Any) -> None:
+        self._broker.nack(delivery_tag, requeue)
+
+    def close(self) -> None:
+        self._consuming = False
+        self.is_open = False
+        self.is_closed = True
+
+
+class BlockingConnection:
+    """Замена pika.BlockingConnection: соединение с LocalBroker процесса стенда."""
+
+    def __init__(self, parameters: Any = None) -> None:
+        self._broker = connect()
+        self.is_open = True
+        self.is_closed = False
+
+    def channel(self) -> BlockingChannel:
+        return BlockingChannel(self._broker)
+
+    def process_data_events(self, time_limit: float = 0) -> None:
+        time.sleep(time_limit or 0)
+
+    def sleep(self, duration: float) -> None:
+        time.sleep(duration)
+
+    def close(self) -> None:
+        self.is_open = False
+        self.is_closed = True
+
+
+def install() -> None:
+    """Подменить pika.BlockingConnection в текущем процессе; вызывать до импорта модулей сервиса."""
+    pika.BlockingConnection = BlockingConnection
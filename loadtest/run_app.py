@@ -0,0 +1,52 @@
+"""
+Процесс приложения для нагрузочного стенда: FastAPI-приложение из app/ под uvicorn.
+
+pika.BlockingConnection подменяется на local_broker, движок БД - на LOADTEST_DATABASE_URL
+(файл SQLite или локальный Postgres). Запускается стендом (harness.py), не вручную:
+    python loadtest/run_app.py PORT
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import local_broker
+import uvicorn
+from sqlalchemy.pool import NullPool
+from sqlmodel import create_engine
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+DATABASE_URL_ENV = "LOADTEST_DATABASE_URL"
+
+
+def main() -> None:
+    port = int(sys.argv[1])
+    # Как в Dockerfile приложения: импорты и от app (src.*), и от app/src
+    sys.path[:0] = [str(APP_DIR), str(APP_DIR / "src")]
+    os.chdir(APP_DIR)
+    local_broker.install()
+
+    from src.database import database
+
+    url = os.environ[DATABASE_URL_ENV]
+    if url.startswith("sqlite"):
+        # Соединение с файлом SQLite дешёвое, поэтому без пула: ожидание свободного соединения из QueuePool
+        # в async-обработчике блокирует цикл событий, который и должен вернуть соединения в пул.
+        # timeout - ожидание блокировки записи другим соединением
+        database.engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30}, poolclass=NullPool)
+    else:
+        # Параметры пула - как у движка приложения
+        database.engine = create_engine(url, pool_size=5, max_overflow=10)
+
+    # Модули приложения импортируют engine по имени, поэтому src.app - только после подмены
+    from src.app import app
+
+    # Часть маршрутов импортирует модуль БД от app/src, то есть второй копией со своим engine
+    if "database.database" in sys.modules:
+        setattr(sys.modules["database.database"], "engine", database.engine)
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
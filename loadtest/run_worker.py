@@ -0,0 +1,51 @@
+"""
+Процесс ml_worker для нагрузочного стенда: потребитель очереди задач из ml_worker/ без изменений.
+
+pika.BlockingConnection подменяется на local_broker; время run_antifraud_task на каждое сообщение
+записывается в брокер как метрика "inference". С аргументом --stub-model вместо модели MLflow
+используется заглушка loadtest/stub_model. Запускается стендом (harness.py), не вручную:
+    python loadtest/run_worker.py [--stub-model]
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, List
+
+import local_broker
+
+LOADTEST_DIR = Path(__file__).resolve().parent
+ML_WORKER_DIR = LOADTEST_DIR.parent / "ml_worker"
+
+
+def main() -> None:
+    sys.path.insert(0, str(ML_WORKER_DIR))
+    if "--stub-model" in sys.argv[1:]:
+        # antifraud_model_handler заглушки находится раньше настоящего
+        sys.path.insert(0, str(LOADTEST_DIR / "stub_model"))
+    # Относительные пути ml_worker (PIPELINE_PATH, .env) - от его каталога
+    os.chdir(ML_WORKER_DIR)
+    local_broker.install()
+
+    import main as worker_main
+    from rmq import rmqworker
+    from rmq.rmqconf import RabbitMQConfig
+
+    broker = local_broker.connect()
+    run_antifraud_task = rmqworker.run_antifraud_task
+
+    def timed_run_antifraud_task(input_json: Any) -> List[Any]:
+        started = time.perf_counter()
+        try:
+            result: List[Any] = run_antifraud_task(input_json)
+            return result
+        finally:
+            broker.record("inference", time.perf_counter() - started)
+
+    rmqworker.run_antifraud_task = timed_run_antifraud_task
+    worker_main.run_worker(worker_main.create_worker("ml", RabbitMQConfig()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Заглушка ml_worker/antifraud_model_handler.py для нагрузочного стенда без MLflow.
+
+Помечает мошеннической транзакцию с суммой больше 1000. Время инференса имитируется задержкой
+LOADTEST_STUB_MS_PER_ROW миллисекунд на строку (по умолчанию 0 - замеряется только обвязка).
+"""
+
+import os
+import time
+from typing import Any, List
+
+from rmq.schemas import PredictionCreate
+
+MS_PER_ROW = float(os.getenv("LOADTEST_STUB_MS_PER_ROW", "0"))
+
+
+def get_antifraud_handler() -> None:
+    return None
+
+
+def run_antifraud_task(input_json: Any) -> List[PredictionCreate]:
+    rows = input_json["input_data"]
+    if MS_PER_ROW:
+        time.sleep(MS_PER_ROW * len(rows) / 1000)
+    return [PredictionCreate(**{**row, "isFraud": row["TransactionAmt"] > 1000}) for row in rows]
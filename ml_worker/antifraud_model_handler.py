@@ -1,9 +1,13 @@
 import logging
+import threading
 from typing import Any, Dict, List, Union
 
 import pandas as pd
+from prediction_cache import PredictionCache, row_digest
+from rmq.rmqconf import ML_CONFIG
 from rmq.schemas import PredictionCreate
 from rpc_model import Model
+from worker_metrics import ROWS, stage_timer
 
 # Логгер для всей библиотеки
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
@@ -36,6 +40,16 @@ ARRAY_SPECS = {
     "id": 27,
 }
 ISFRAUD_FIELD = "isFraud"
+# Плоские колонки convert_json_to_dataframe -> колонки исходной таблицы IEEE-CIS
+# (блок id приложение собирает из id_01..id_27, воркер разворачивает его в id1..id27)
+RAW_COLUMNS = {
+    **{field: field for field in BASE_FIELDS},
+    **{
+        f"{array_name}{i+1}": f"id_{i+1:02d}" if array_name == "id" else f"{array_name}{i+1}"
+        for array_name, length in ARRAY_SPECS.items()
+        for i in range(length)
+    },
+}
 
 
 def convert_dataframe_to_predictions(df: pd.DataFrame) -> List[PredictionCreate]:
@@ -87,34 +101,120 @@ def convert_json_to_dataframe(data: Any) -> pd.DataFrame:
     return pd.DataFrame(unpacked)
 
 
+def convert_raw_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Преобразует исходную таблицу IEEE-CIS (C1.., V1.., id_01..) в плоский формат convert_json_to_dataframe.
+    Отсутствующие колонки заполняются пропусками, лишние отбрасываются.
+    """
+    flat = df.reindex(columns=list(RAW_COLUMNS.values()))
+    flat.columns = list(RAW_COLUMNS)
+    return flat
+
+
+def align_predictions(prediction_result: Any, index: pd.Index) -> pd.Series:
+    """
+    Предсказания isFraud, сопоставленные строкам DataFrame с индексом index, переданного модели.
+
+    Препроцессор отбрасывает строки с большой долей пропусков (_drop_rows_by_missing_ratio), и тогда
+    модель возвращает меньше предсказаний, проиндексированных оставшимися строками: они сопоставляются
+    по индексу, а отброшенные строки получают NaN. Если предсказания нельзя сопоставить - ValueError.
+    """
+    values = prediction_result[ISFRAUD_FIELD]
+    if len(values) == len(index):
+        return pd.Series(values.to_numpy(), index=index)
+    if not values.index.is_unique or not values.index.isin(index).all():
+        raise ValueError(f"Модель вернула {len(values)} предсказаний на {len(index)} строк, и их нельзя сопоставить строкам")
+    return values.reindex(index)
+
+
 class AntifraudModelHandler:
-    """Обёртка для антифрод модели (инициализация, инференс, сериализация)."""
+    """
+    Обёртка для антифрод модели (инициализация, инференс, сериализация).
+
+    Предсказания кэшируются по дайджесту сырой строки признаков и версии модели: повторно
+    присланные транзакции не проходят transform/predict. Это корректно, пока препроцессор
+    преобразует строку по статистикам, зафиксированным при fit, независимо от остальных строк пакета.
+    """
 
     def __init__(self) -> None:
+        self.cache = PredictionCache(maxsize=ML_CONFIG.prediction_cache_size, ttl=ML_CONFIG.prediction_cache_ttl)
+        self.load_model()
+
+    def load_model(self) -> None:
+        """Загрузить модель; кэш предсказаний очищается, если у новой модели другая версия."""
         self.model = Model()
+        self.model_version = self.model.version
+        self.cache.bind_version(self.model_version)
 
     def predict_with_metadata(self, input_json: Any) -> List[PredictionCreate]:
         """
         Принимает JSON, выполняет предикт, объединяет вход с результатом, возвращает PredictionCreate.
         """
         data = input_json["input_data"]
-        df = convert_json_to_dataframe(data)
+        rows = data if isinstance(data, list) else [data]
+        with stage_timer("to_dataframe"):
+            df = convert_json_to_dataframe(rows)
         logger.info("Antifraud model input DataFrame shape: %s", df.shape)
-        prediction_result = self.model.predict(df)
+
+        keys = [row_digest(self.model_version, row) for row in rows] if self.cache.enabled else []
+        predictions = [self.cache.get(key) for key in keys] if keys else [None] * len(rows)
+        missing = [i for i, value in enumerate(predictions) if value is None]
+        if missing:
+            batch = df.iloc[missing].reset_index(drop=True)
+            prediction_result = self.model.predict(batch)
+            scored = align_predictions(prediction_result, batch.index)
+            # Если препроцессор отбросил строки, в кэш не пишется ничего из этого пакета
+            cacheable = bool(keys) and len(prediction_result) == len(missing)
+            for i, value in zip(missing, scored.to_numpy()):
+                # Отброшенная препроцессором строка остаётся без предсказания (isFraud=None)
+                predictions[i] = None if pd.isna(value) else value
+                if cacheable:
+                    self.cache.set(keys[i], value)
+        ROWS.labels("model").inc(len(missing))
+        ROWS.labels("cache").inc(len(rows) - len(missing))
+        if self.cache.enabled:
+            stats = self.cache.stats()
+            logger.info(
+                "Prediction cache: %d/%d rows from cache, hit rate %.3f, %d entries, ~%d KiB",
+                len(rows) - len(missing),
+                len(rows),
+                stats["hit_rate"],
+                stats["entries"],
+                stats["memory_bytes"] // 1024,
+            )
+
         df_result = df.copy()
-        df_result[ISFRAUD_FIELD] = prediction_result[ISFRAUD_FIELD].to_numpy()
-        return convert_dataframe_to_predictions(df_result)
+        # object: None отброшенных строк не превращается в NaN
+        df_result[ISFRAUD_FIELD] = pd.Series(predictions, index=df_result.index, dtype=object)
+        with stage_timer("to_predictions"):
+            return convert_dataframe_to_predictions(df_result)
+
+    def predict_frame(self, df: pd.DataFrame) -> pd.api.extensions.ExtensionArray:
+        """
+        Предсказания isFraud для DataFrame в плоском формате convert_json_to_dataframe.
+
+        Для пакетной оценки: без кэша предсказаний и без построчной сборки PredictionCreate.
+        Строки, отброшенные препроцессором, получают NA.
+        """
+        return align_predictions(self.model.predict(df), df.index).astype("Int64").array
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
 
 
 # ========== Интерфейсы (singletons) ==========
 
 _antifraud_handler_singleton = None
+# Пакетные и RPC-сообщения обрабатываются в разных потоках: модель загружается один раз
+_antifraud_handler_lock = threading.Lock()
 
 
 def get_antifraud_handler() -> AntifraudModelHandler:
     global _antifraud_handler_singleton
     if _antifraud_handler_singleton is None:
-        _antifraud_handler_singleton = AntifraudModelHandler()
+        with _antifraud_handler_lock:
+            if _antifraud_handler_singleton is None:
+                _antifraud_handler_singleton = AntifraudModelHandler()
     return _antifraud_handler_singleton
 
 
@@ -0,0 +1,174 @@
+"""
+Офлайн-оценка транзакций для ночных пересчётов - без HTTP и RabbitMQ.
+
+Входной CSV или Parquet с исходными колонками IEEE-CIS читается потоково чанками по --chunk-rows строк
+(только колонки, нужные модели), чанки оцениваются AntifraudModelHandler в пуле из --workers процессов.
+Результаты (TransactionID, isFraud) пишутся в каталог OUTPUT файлами part-NNNNNN.parquet|csv, по файлу на чанк;
+у строк, которые препроцессор отбросил из-за большой доли пропусков, isFraud пустой (null).
+
+Каждый файл результата записывается атомарно (временный файл + rename), поэтому готовые файлы и есть
+контрольная точка: после падения запуск с --resume пропускает уже посчитанные чанки. Параметры запуска
+сохраняются в OUTPUT/_checkpoint.json, и продолжить можно только с тем же входом и тем же размером чанка.
+По завершении выводятся скорость оценки (строк/с) и пиковый RSS основного процесса и процессов пула.
+
+Запуск из каталога ml_worker:
+    python batch_score.py transactions.parquet scores/ --workers 4
+    python batch_score.py transactions.parquet scores/ --workers 4 --resume
+Результат читается как один набор данных: pd.read_parquet("scores/").
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+import pandas as pd
+from antifraud_model_handler import ISFRAUD_FIELD, RAW_COLUMNS, convert_raw_dataframe, get_antifraud_handler
+
+logger = logging.getLogger("batch_score")
+
+CHECKPOINT_FILE = "_checkpoint.json"
+PROGRESS_INTERVAL_SEC = 30.0
+
+
+def read_chunks(path: Path, input_format: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Чанки входного файла по chunk_rows строк только с колонками, которые использует модель."""
+    needed = set(RAW_COLUMNS.values())
+    if input_format == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        columns = [column for column in parquet.schema_arrow.names if column in needed]
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows, usecols=lambda column: column in needed)
+
+
+def write_atomic(df: pd.DataFrame, path: Path) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    if path.suffix == ".parquet":
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def score_chunk(index: int, frame: pd.DataFrame, part_path: str) -> Tuple[int, int]:
+    """Оценить чанк и записать файл результата. Выполняется в процессе пула; модель загружается один раз на процесс."""
+    predictions = get_antifraud_handler().predict_frame(convert_raw_dataframe(frame))
+    result = pd.DataFrame({"TransactionID": frame["TransactionID"].to_numpy(), ISFRAUD_FIELD: predictions})
+    write_atomic(result, Path(part_path))
+    return index, len(result)
+
+
+def load_checkpoint(output: Path, params: Dict[str, Any], resume: bool) -> Set[int]:
+    """Номера уже посчитанных чанков. Без --resume каталог с результатами не перезаписывается."""
+    checkpoint = output / CHECKPOINT_FILE
+    if checkpoint.exists():
+        if not resume:
+            raise SystemExit(f"{output} уже содержит результаты; для продолжения укажите --resume")
+        saved = json.loads(checkpoint.read_text())
+        if saved != params:
+            raise SystemExit(f"Параметры запуска отличаются от сохранённых в {checkpoint}: {saved}")
+    else:
+        output.mkdir(parents=True, exist_ok=True)
+        checkpoint.write_text(json.dumps(params, indent=2))
+    return {int(part.name.split(".")[0].split("-")[1]) for part in output.glob(f"part-*.{params['output_format']}")}
+
+
+def peak_rss_mib(who: int) -> float:
+    # ru_maxrss в Linux - в КиБ; для RUSAGE_CHILDREN - максимум по завершённым процессам пула
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def run(args: argparse.Namespace) -> int:
+    input_path: Path = args.input.resolve()
+    input_format = args.input_format or ("parquet" if input_path.suffix.lower() in (".parquet", ".pq") else "csv")
+    stat = input_path.stat()
+    params = {
+        "input": str(input_path),
+        "input_size": stat.st_size,
+        "input_mtime_ns": stat.st_mtime_ns,
+        "chunk_rows": args.chunk_rows,
+        "output_format": args.output_format,
+    }
+    done = load_checkpoint(args.output, params, args.resume)
+    if done:
+        logger.info("Продолжение: %d чанков уже посчитано и будет пропущено", len(done))
+
+    executor: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 0 else None
+    pending: Set["Future[Tuple[int, int]]"] = set()
+    scored = skipped = chunks = 0
+    started = last_report = time.perf_counter()
+
+    def collect(return_when: str) -> int:
+        finished, still_pending = wait(pending, return_when=return_when)
+        pending.intersection_update(still_pending)
+        return sum(future.result()[1] for future in finished)
+
+    try:
+        for index, frame in enumerate(read_chunks(input_path, input_format, args.chunk_rows)):
+            if index in done:
+                skipped += len(frame)
+                continue
+            part_path = str(args.output / f"part-{index:06d}.{args.output_format}")
+            if executor is None:
+                scored += score_chunk(index, frame, part_path)[1]
+            else:
+                pending.add(executor.submit(score_chunk, index, frame, part_path))
+                # Не больше двух чанков в очереди на процесс: память не зависит от размера входа
+                if len(pending) >= 2 * args.workers:
+                    scored += collect(FIRST_COMPLETED)
+            chunks += 1
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_INTERVAL_SEC:
+                logger.info("Посчитано %d строк, %.0f строк/с", scored, scored / (now - started))
+                last_report = now
+        if pending:
+            scored += collect(ALL_COMPLETED)
+    except Exception:
+        logger.exception("Оценка прервана; готовые чанки сохранены, перезапустите с --resume")
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return 1
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Готово: %d строк в %d чанках за %.1f с (%.0f строк/с), пропущено из контрольной точки: %d строк",
+        scored,
+        chunks,
+        elapsed,
+        scored / elapsed if elapsed else 0.0,
+        skipped,
+    )
+    logger.info(
+        "Пиковый RSS: основной процесс %.0f МиБ, процесс пула %.0f МиБ",
+        peak_rss_mib(resource.RUSAGE_SELF),
+        peak_rss_mib(resource.RUSAGE_CHILDREN),
+    )
+    return 0
+
+
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Офлайн-оценка транзакций из CSV/Parquet моделью антифрода")
+    parser.add_argument("input", type=Path, help="входной CSV или Parquet с колонками IEEE-CIS")
+    parser.add_argument("output", type=Path, help="каталог для файлов результата part-NNNNNN")
+    parser.add_argument("--input-format", choices=["csv", "parquet"], help="формат входа (по умолчанию по расширению)")
+    parser.add_argument("--output-format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--chunk-rows", type=int, default=50000, help="строк в чанке")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="процессов оценки (0 - в основном процессе)")
+    parser.add_argument("--resume", action="store_true", help="продолжить прерванный запуск в том же каталоге")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
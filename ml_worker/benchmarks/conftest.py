@@ -0,0 +1,31 @@
+"""Параметры запуска и общие фикстуры микробенчмарков ml_worker (pytest-benchmark)."""
+
+from typing import Any, Dict, List
+
+import pytest
+
+from .synthetic import make_messages
+
+# Размеры пакетов по умолчанию
+DEFAULT_SIZES = "1,100,10000,100000"
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption("--bench-sizes", default=DEFAULT_SIZES, help="размеры пакетов через запятую")
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    if "size" in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption("--bench-sizes").split(",")]
+        metafunc.parametrize("size", sizes)
+
+
+_messages_cache: Dict[int, List[Dict[str, Any]]] = {}
+
+
+@pytest.fixture
+def messages(size: int) -> List[Dict[str, Any]]:
+    """Пакет из size сообщений; генерируется один раз на размер за сессию."""
+    if size not in _messages_cache:
+        _messages_cache[size] = make_messages(size)
+    return _messages_cache[size]
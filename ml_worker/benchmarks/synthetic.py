@@ -0,0 +1,54 @@
+"""
+Синтетические данные формы IEEE-CIS в том виде, в каком их получает воркер: сообщения очереди
+(базовые поля и массивы C/D/M/V/id) с долей пропусков, близкой к исходному датасету.
+"""
+
+from typing import Any, Dict, List
+
+import numpy as np
+from antifraud_model_handler import ARRAY_SPECS
+
+# Число замеров для размера пакета (крупные пакеты меряются однократно)
+ROUNDS = {1: 200, 100: 20, 10000: 3}
+
+
+def rounds(size: int) -> int:
+    return ROUNDS.get(size, 1)
+
+
+def _with_missing(values: np.ndarray, rng: np.random.Generator, share: float) -> List[Any]:
+    values = values.astype(object)
+    values[rng.random(values.shape) < share] = None
+    return values.tolist()
+
+
+def make_messages(rows: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Сообщения с транзакциями формы IEEE-CIS; около половины D/V/id - пропуски, как в исходных данных."""
+    rng = np.random.default_rng(seed)
+    base = {
+        "TransactionID": (2987000 + np.arange(rows)).tolist(),
+        "TransactionDT": (86400 + np.sort(rng.integers(0, 180 * 86400, rows))).tolist(),
+        "TransactionAmt": np.round(rng.lognormal(4.0, 1.0, rows), 2).tolist(),
+        "ProductCD": rng.choice(["W", "H", "C", "S", "R"], rows, p=[0.74, 0.06, 0.12, 0.02, 0.06]).tolist(),
+        "card1": rng.integers(1000, 18400, rows).tolist(),
+        "card2": rng.integers(100, 600, rows).tolist(),
+        "card3": _with_missing(rng.choice([150.0, 185.0, 106.0], rows), rng, 0.01),
+        "card4": _with_missing(rng.choice(["visa", "mastercard", "american express", "discover"], rows), rng, 0.01),
+        "card5": _with_missing(rng.choice([226.0, 224.0, 166.0, 102.0], rows), rng, 0.01),
+        "card6": _with_missing(rng.choice(["debit", "credit"], rows), rng, 0.01),
+        "addr1": _with_missing(rng.integers(100, 540, rows).astype(float), rng, 0.11),
+        "addr2": _with_missing(np.full(rows, 87.0), rng, 0.11),
+        "dist1": _with_missing(rng.integers(0, 1000, rows).astype(float), rng, 0.6),
+        "dist2": _with_missing(rng.integers(0, 1000, rows).astype(float), rng, 0.9),
+        "P_emaildomain": _with_missing(rng.choice(["gmail.com", "yahoo.com", "hotmail.com", "anonymous.com"], rows), rng, 0.16),
+        "R_emaildomain": _with_missing(rng.choice(["gmail.com", "hotmail.com", "anonymous.com"], rows), rng, 0.77),
+    }
+    arrays = {
+        "C": _with_missing(rng.integers(0, 5, (rows, ARRAY_SPECS["C"])).astype(float), rng, 0.0),
+        "D": _with_missing(rng.integers(0, 640, (rows, ARRAY_SPECS["D"])).astype(float), rng, 0.5),
+        "M": _with_missing(rng.choice(["T", "F"], (rows, ARRAY_SPECS["M"])), rng, 0.5),
+        "V": _with_missing(rng.integers(0, 3, (rows, ARRAY_SPECS["V"])).astype(float), rng, 0.5),
+        "id": _with_missing(rng.integers(-100, 100, (rows, ARRAY_SPECS["id"])).astype(float), rng, 0.75),
+    }
+    names = [*base, *arrays]
+    return [dict(zip(names, values)) for values in zip(*base.values(), *arrays.values())]
@@ -0,0 +1,59 @@
+"""
+Микробенчмарки горячих путей воркера: преобразования сообщений и DataFrame, валидация PredictionCreate,
+fit/transform FraudDataPreprocessor на пакетах размера --bench-sizes.
+
+Запуск из каталога ml_worker (результаты сохраняются в benchmarks/results для сравнения между версиями):
+    python -m pytest benchmarks --benchmark-autosave --benchmark-storage=benchmarks/results
+    python -m pytest benchmarks --benchmark-storage=benchmarks/results --benchmark-compare --benchmark-compare-fail=median:20%
+"""
+
+from typing import Any, Dict, List
+
+import pandas as pd
+import pytest
+from antifraud_model_handler import ISFRAUD_FIELD, convert_dataframe_to_predictions, convert_json_to_dataframe
+from rmq.schemas import PredictionCreate
+from src.fraud_data_preprocessor import FraudDataPreprocessor
+
+from .synthetic import make_messages, rounds
+
+# Размер обучающей выборки препроцессора для бенчмарка transform
+FIT_ROWS = 10000
+
+
+@pytest.fixture(scope="module")
+def fitted_preprocessor() -> FraudDataPreprocessor:
+    df = with_labels(convert_json_to_dataframe(make_messages(FIT_ROWS, seed=1)))
+    return FraudDataPreprocessor().fit(df)
+
+
+def with_labels(df: pd.DataFrame) -> pd.DataFrame:
+    df[ISFRAUD_FIELD] = (df["TransactionID"] % 29 == 0).astype(int)
+    return df
+
+
+def test_convert_json_to_dataframe(benchmark: Any, size: int, messages: List[Dict[str, Any]]) -> None:
+    df = benchmark.pedantic(convert_json_to_dataframe, args=(messages,), rounds=rounds(size), iterations=1)
+    assert len(df) == size
+
+
+def test_convert_dataframe_to_predictions(benchmark: Any, size: int, messages: List[Dict[str, Any]]) -> None:
+    df = with_labels(convert_json_to_dataframe(messages))
+    predictions = benchmark.pedantic(convert_dataframe_to_predictions, args=(df,), rounds=rounds(size), iterations=1)
+    assert len(predictions) == size
+
+
+def test_prediction_create_validation(benchmark: Any, size: int, messages: List[Dict[str, Any]]) -> None:
+    validated = benchmark.pedantic(lambda: [PredictionCreate(**message) for message in messages], rounds=rounds(size), iterations=1)
+    assert len(validated) == size
+
+
+def test_preprocessor_fit(benchmark: Any, size: int, messages: List[Dict[str, Any]]) -> None:
+    df = with_labels(convert_json_to_dataframe(messages))
+    benchmark.pedantic(lambda: FraudDataPreprocessor().fit(df), rounds=rounds(size), iterations=1)
+
+
+def test_preprocessor_transform(benchmark: Any, size: int, messages: List[Dict[str, Any]], fitted_preprocessor: FraudDataPreprocessor) -> None:
+    df = convert_json_to_dataframe(messages)
+    result = benchmark.pedantic(fitted_preprocessor.transform, args=(df,), rounds=rounds(size), iterations=1)
+    assert len(result) <= size
@@ -4,8 +4,9 @@ import time
 
 import pika
 from pika.exceptions import AMQPConnectionError
-from rmq.rmqconf import RabbitMQConfig
+from rmq.rmqconf import METRICS_CONFIG, RabbitMQConfig
 from rmq.rmqworker import RabbitMQLlmWorker
+from worker_metrics import start_metrics_server
 
 # Настраиваем базовую конфигурацию логирования
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")  # Устанавливаем уровень логирования DEBUG  # Задаем формат сообщений лога
@@ -45,6 +46,7 @@ def main() -> int:
 
     worker = None
     try:
+        start_metrics_server(METRICS_CONFIG)
         config = RabbitMQConfig()
         worker = create_worker(mode, config)
         run_worker(worker)
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Поле ответа модели: в ключ кэша не входит, во входных данных может быть None или прежней разметкой
+EXCLUDED_FIELDS = frozenset(["isFraud"])
+
+
+def row_digest(model_version: str, row: Dict[str, Any]) -> bytes:
+    """
+    Быстрый дайджест сырой строки признаков вместе с версией модели (BLAKE2b, 16 байт).
+
+    Строка сериализуется в канонический JSON (сортировка ключей), поэтому порядок полей
+    во входном сообщении на ключ не влияет.
+    """
+    features = {key: value for key, value in row.items() if key not in EXCLUDED_FIELDS}
+    payload = json.dumps(features, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.blake2b(model_version.encode("utf-8"), digest_size=16)
+    digest.update(payload.encode("utf-8"))
+    return digest.digest()
+
+
+class PredictionCache:
+    """
+    LRU-кэш предсказаний с ограничением по времени жизни записи.
+
+    Привязан к версии модели: при смене версии (bind_version) кэш очищается, а версия входит
+    в ключ row_digest, поэтому предсказание старой модели не может быть отдано для новой.
+    maxsize=0 отключает кэш.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version: Optional[str] = None
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def bind_version(self, version: str) -> None:
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            entry = (time.monotonic(), value)
+            self._entries[key] = entry
+            self._memory_bytes += self._entry_size(key, entry)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Метрики кэша: попадания/промахи с запуска, доля попаданий, число записей и оценка занимаемой памяти."""
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "memory_bytes": self._memory_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._memory_bytes -= self._entry_size(key, entry)
+
+    @staticmethod
+    def _entry_size(key: Hashable, entry: Tuple[float, Any]) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(entry) + sys.getsizeof(entry[0]) + sys.getsizeof(entry[1])
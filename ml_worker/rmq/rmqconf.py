@@ -95,6 +95,10 @@ class MLConfig:
     fraud_pipeline_path: str = os.getenv("PIPELINE_PATH", "preprocessor/fraud_pipeline.joblib")
     logged_model_uri: str = os.getenv("LOGGED_MODEL_URI", "runs:/615587bb4786452e8fc4b9b8cdb69adf/model")
 
+    # Кэш предсказаний по дайджесту строки признаков (0 - выключен)
+    prediction_cache_size: int = int(os.getenv("PREDICTION_CACHE_SIZE", "100000"))
+    prediction_cache_ttl: float = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+
     def __post_init__(self) -> None:
         logger.info("MLConfig initialized with:")
         logger.info(f"  mlflow_url = {self.mlflow_url}")
@@ -103,6 +107,8 @@ class MLConfig:
         logger.info(f"  mlflow_s3_endpoint_url = {self.mlflow_s3_endpoint_url}")
         logger.info(f"  fraud_pipeline_path = {self.fraud_pipeline_path}")
         logger.info(f"  logged_model_uri = {self.logged_model_uri}")
+        logger.info(f"  prediction_cache_size = {self.prediction_cache_size}")
+        logger.info(f"  prediction_cache_ttl = {self.prediction_cache_ttl}")
 
 
 @dataclass
@@ -122,6 +128,20 @@ class AppServiceConfig:
         return f"http://{self.app_service_host}:{self.app_service_port}/api/predict/send_task_result"
 
 
+@dataclass
+class MetricsConfig:
+    """Параметры HTTP-сервера метрик воркера в формате Prometheus (порт 0 - сервер не запускается)."""
+
+    metrics_host: str = os.getenv("WORKER_METRICS_HOST", "0.0.0.0")
+    metrics_port: int = int(os.getenv("WORKER_METRICS_PORT", "9100"))
+
+    def __post_init__(self) -> None:
+        logger.info("MetricsConfig initialized with:")
+        logger.info(f"  metrics_host = {self.metrics_host}")
+        logger.info(f"  metrics_port = {self.metrics_port}")
+
+
 RABBITMQ_CONFIG = RabbitMQConfig()
 ML_CONFIG = MLConfig()
 APP_SERVICE_CONFIG = AppServiceConfig()
+METRICS_CONFIG = MetricsConfig()
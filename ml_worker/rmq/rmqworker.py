@@ -1,5 +1,6 @@
 import json
 import logging
+import threading
 import time
 from typing import Any
 
@@ -8,6 +9,7 @@ import requests
 from antifraud_model_handler import run_antifraud_task
 from rmq.rmqconf import APP_SERVICE_CONFIG, RabbitMQConfig
 from rmq.schemas import PredictionCreate
+from worker_metrics import BATCHES, observe_queue_wait, record_failure, stage_timer
 
 # logging конфиг — универсальный стиль
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
@@ -28,6 +30,10 @@ class RabbitMQLlmWorker:
         self.config = config
         self.connection = None
         self.channel = None
+        # RPC-запросы принимаются в отдельном потоке по своему соединению (pika не потокобезопасна)
+        self.rpc_connection = None
+        self.rpc_channel = None
+        self._rpc_thread: threading.Thread | None = None
 
     # ==== RabbitMQ setup and teardown ====
     def connect(self) -> None:
@@ -48,6 +54,39 @@ class RabbitMQLlmWorker:
                 logger.error(f"RabbitMQ connect error: {e!r}")
                 time.sleep(self.RETRY_DELAY_SEC)
 
+    def connect_rpc(self) -> None:
+        """
+        Открыть отдельное соединение для очереди RPC-запросов.
+
+        pika выполняет обработчики одного соединения по очереди, поэтому на общем с пакетными задачами
+        соединении RPC-запрос ждал бы окончания оценки текущего пакета. prefetch_count=1 относится только
+        к этому каналу: неподтверждённый RPC-запрос не закрепляется за занятым воркером и достаётся свободному.
+        """
+        params: pika.ConnectionParameters = self.config.get_connection_params()
+        self.rpc_connection = pika.BlockingConnection(params)
+        self.rpc_channel = self.rpc_connection.channel()
+        self.rpc_channel.basic_qos(prefetch_count=1)
+        self.rpc_channel.queue_declare(queue=self.config.rpc_queue_name)
+        logger.info("Connected to RabbitMQ (RPC)")
+
+    def consume_rpc(self) -> None:
+        """Цикл потока RPC-потребителя: соединение восстанавливается после обрыва, пока жив процесс."""
+        while True:
+            try:
+                self.connect_rpc()
+                self.rpc_channel.basic_consume(queue=self.config.rpc_queue_name, on_message_callback=self.process_rpc_message, auto_ack=False)
+                self.rpc_channel.start_consuming()
+            except Exception as exc:
+                logger.error(f"RPC consumer error: {exc!r}")
+            time.sleep(self.RETRY_DELAY_SEC)
+
+    def start_rpc_consumer(self) -> None:
+        """Запустить поток RPC-потребителя, если он ещё не запущен."""
+        if self._rpc_thread is not None and self._rpc_thread.is_alive():
+            return
+        self._rpc_thread = threading.Thread(target=self.consume_rpc, name="rpc-consumer", daemon=True)
+        self._rpc_thread.start()
+
     def close(self) -> None:
         """Корректно закрыть канал и соединение."""
         try:
@@ -60,14 +99,19 @@ class RabbitMQLlmWorker:
             logger.error(f"Error closing RabbitMQ connection: {exc!r}")
 
     # ==== Результаты ====
-    def send_task_result(self, task_id: str, result: list[PredictionCreate]) -> bool:
+    def send_task_result(self, task_id: str, result: list[PredictionCreate], chunk: int | None = None) -> bool:
         """
         Отправить результат обработки задачи на указанный endpoint.
         Преобразует PredictionCreate к dict для сериализации.
+        Для задач, отправленных в очередь по частям, передаётся номер чанка: задача завершается
+        на стороне приложения, когда получены результаты всех чанков.
         """
         try:
             json_payload = [pred.model_dump() for pred in result]
-            response = requests.post(self.RESULT_ENDPOINT, params={"task_id": task_id}, json=json_payload)
+            params: dict[str, Any] = {"task_id": task_id}
+            if chunk is not None:
+                params["chunk"] = chunk
+            response = requests.post(self.RESULT_ENDPOINT, params=params, json=json_payload)
             response.raise_for_status()
             logger.info(f"Result sent for task {task_id}")
             return True
@@ -79,34 +123,75 @@ class RabbitMQLlmWorker:
     def process_message(self, ch: Any, method: Any, properties: Any, body: Any) -> None:
         """
         Обработка входящего сообщения из RabbitMQ.
+        Время этапов, ожидание в очереди, исход пакета и этап ошибки записываются в метрики воркера.
         """
+        observe_queue_wait(method.routing_key, properties)
         retries = 0
         while retries < self.MAX_RETRIES:
             try:
                 logger.info(f"Received message: {body!r}")
-                msg = json.loads(body.decode("utf-8"))
+                with stage_timer("decode"):
+                    msg = json.loads(body.decode("utf-8"))
                 result = run_antifraud_task(msg)
-                if self.send_task_result(msg["task_id"], result):
-                    ch.basic_ack(delivery_tag=method.delivery_tag)
-                    logger.info("Task acknowledgment sent")
-                    return
-                else:
-                    raise RuntimeError("Task result send failed")
+                with stage_timer("deliver"):
+                    if not self.send_task_result(msg["task_id"], result, msg.get("chunk")):
+                        raise RuntimeError("Task result send failed")
+                ch.basic_ack(delivery_tag=method.delivery_tag)
+                BATCHES.labels(method.routing_key, "ok").inc()
+                logger.info("Task acknowledgment sent")
+                return
             except Exception as exc:
                 retries += 1
+                record_failure(exc)
                 logger.error(f"Processing error (try {retries}): {exc!r}")
                 if retries >= self.MAX_RETRIES:
                     logger.error("Max retries reached, message rejected")
                     ch.basic_reject(delivery_tag=method.delivery_tag, requeue=False)
+                    BATCHES.labels(method.routing_key, "rejected").inc()
                     return
                 time.sleep(self.RETRY_DELAY_SEC)
                 ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
 
+    def process_rpc_message(self, ch: Any, method: Any, properties: Any, body: Any) -> None:
+        """
+        Обработка RPC-запроса синхронной оценки: результат публикуется в очередь properties.reply_to
+        с тем же correlation_id, без записи в БД приложения.
+
+        Повторов нет: вызывающий ждёт ответа ограниченное время, поэтому при ошибке сразу отправляется
+        ответ {"error": ...}. Просроченные запросы (expiration) брокер отбрасывает сам.
+        """
+        observe_queue_wait(method.routing_key, properties)
+        if not properties.reply_to:
+            logger.error("RPC request without reply_to, rejected")
+            ch.basic_reject(delivery_tag=method.delivery_tag, requeue=False)
+            BATCHES.labels(method.routing_key, "rejected").inc()
+            return
+        try:
+            with stage_timer("decode"):
+                msg = json.loads(body.decode("utf-8"))
+            result = run_antifraud_task(msg)
+            reply = {"predictions": [{"TransactionID": pred.TransactionID, "isFraud": None if pred.isFraud is None else int(pred.isFraud)} for pred in result]}
+            BATCHES.labels(method.routing_key, "ok").inc()
+            logger.info(f"RPC request {properties.correlation_id}: scored {len(result)} transactions")
+        except Exception as exc:
+            record_failure(exc)
+            BATCHES.labels(method.routing_key, "error").inc()
+            logger.error(f"RPC processing error ({properties.correlation_id}): {exc!r}")
+            reply = {"error": str(exc)}
+        ch.basic_publish(
+            exchange="",
+            routing_key=properties.reply_to,
+            properties=pika.BasicProperties(correlation_id=properties.correlation_id, content_type="application/json"),
+            body=json.dumps(reply),
+        )
+        ch.basic_ack(delivery_tag=method.delivery_tag)
+
     def start_worker(self) -> None:
         """Запуск обработки очереди (блокирующий вызов)."""
         if self.channel is None:
             logger.error("RabbitMQ channel is not established. Did you call connect()?")
             raise RuntimeError("No channel. Call connect() before start_worker().")
+        self.start_rpc_consumer()
         try:
             self.channel.basic_consume(queue=self.config.queue_name, on_message_callback=self.process_message, auto_ack=False)
             logger.info("Worker started. Press Ctrl+C to stop.")
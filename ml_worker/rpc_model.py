@@ -11,6 +11,7 @@ from rmq.rmqconf import ML_CONFIG  # Импорт централизованно
 from src.fraud_data_preprocessor import (
     FraudDataPreprocessor,  # ВАЖНО: этот импорт должен быть до joblib.load!
 )
+from worker_metrics import stage_timer
 
 # Настройка логгера
 logger = logging.getLogger(__name__)
@@ -66,6 +67,7 @@ class Model:
     def __init__(self) -> None:
         file_path = Path.cwd() / ML_CONFIG.fraud_pipeline_path
         self.pipeline = joblib.load(file_path)
+        pipeline_stat = file_path.stat()
         token = create_token()
         if token is not None:
             os.environ["MLFLOW_TRACKING_TOKEN"] = token
@@ -73,21 +75,30 @@ class Model:
             logger.warning("MLFLOW_TRACKING_TOKEN was not set because create_token() returned None")
         mlflow.set_experiment(ML_CONFIG.mlflow_experiment)
         self.model = mlflow.pyfunc.load_model(ML_CONFIG.logged_model_uri)
+        # Версия модели и препроцессора: меняется при загрузке другой модели или другого файла пайплайна
+        model_uuid = getattr(self.model.metadata, "model_uuid", None) or ML_CONFIG.logged_model_uri
+        self.version = f"{model_uuid}:{pipeline_stat.st_size}:{pipeline_stat.st_mtime_ns}"
+        logger.info(f"Model version: {self.version}")
 
     def predict(self, input_data: pd.DataFrame) -> Any:
         """
         Выполняет предсказания с использованием обученной модели RandomForestClassifier.
         """
         logger.info(f"#### START PREDICT: {input_data}")
-        base_test = self.pipeline.transform(input_data)
+        with stage_timer("transform"):
+            base_test = self.pipeline.transform(input_data)
         logger.info(f"#### PROCESSING DATA: {base_test}")
 
-        input_df = base_test.astype(
-            {
-                "card1_count": "float64",  # и другие поля, если нужно
-            }
-        )
-        input_df["TransactionDT"] = input_df["TransactionDT"].astype("int32")
-        input_df["TransactionID"] = input_df["TransactionID"].astype("int32")
-        pred = self.model.predict(input_df)
+        with stage_timer("cast"):
+            input_df = base_test.astype(
+                {
+                    "card1_count": "float64",  # и другие поля, если нужно
+                }
+            )
+            input_df["TransactionDT"] = input_df["TransactionDT"].astype("int32")
+            input_df["TransactionID"] = input_df["TransactionID"].astype("int32")
+        with stage_timer("predict"):
+            pred = self.model.predict(input_df)
+        # Предсказания индексируются строками входа, оставшимися после transform (он может отбросить строки)
+        pred.index = input_df.index
         return pred
@@ -0,0 +1,42 @@
+"""Общие фикстуры тестов ml_worker: обработчик антифрод-модели с моделью-заглушкой вместо MLflow."""
+
+from typing import Any, List
+
+import antifraud_model_handler
+import pandas as pd
+import pytest
+from antifraud_model_handler import ISFRAUD_FIELD, AntifraudModelHandler
+
+
+class StubModel:
+    """
+    Заглушка rpc_model.Model: isFraud = TransactionAmt > threshold.
+
+    Версия и порог задаются атрибутами класса, а строки каждого вызова predict запоминаются в calls,
+    чтобы тесты проверяли, какие строки дошли до модели. Строки без TransactionAmt отбрасываются, как
+    строки с большой долей пропусков в препроцессоре: предсказания индексируются оставшимися строками.
+    """
+
+    version = "stub-1"
+    threshold = 1000.0
+    calls: List[List[int]] = []
+
+    def __init__(self) -> None:
+        self.version = type(self).version
+
+    def predict(self, df: pd.DataFrame) -> pd.DataFrame:
+        type(self).calls.append(df["TransactionID"].tolist())
+        kept = df[df["TransactionAmt"].notna()]
+        return pd.DataFrame({ISFRAUD_FIELD: (kept["TransactionAmt"] > type(self).threshold).astype(int)}, index=kept.index)
+
+
+@pytest.fixture
+def stub_model(monkeypatch: pytest.MonkeyPatch) -> Any:
+    monkeypatch.setattr(StubModel, "calls", [])
+    monkeypatch.setattr(antifraud_model_handler, "Model", StubModel)
+    return StubModel
+
+
+@pytest.fixture
+def handler(stub_model: Any) -> AntifraudModelHandler:
+    return AntifraudModelHandler()
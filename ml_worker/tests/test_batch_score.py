@@ -0,0 +1,122 @@
+from pathlib import Path
+from typing import Any, List
+
+import batch_score
+import pandas as pd
+import pytest
+from antifraud_model_handler import AntifraudModelHandler
+from batch_score import CHECKPOINT_FILE, load_checkpoint, parse_args, run, write_atomic
+
+
+@pytest.fixture
+def input_csv(tmp_path: Path) -> Path:
+    path = tmp_path / "transactions.csv"
+    amounts = [10.0, 5000.0, 20.0, 6000.0, 30.0, 7000.0, 40.0]
+    pd.DataFrame(
+        {
+            "TransactionID": [1000 + i for i in range(len(amounts))],
+            "TransactionDT": 86400,
+            "TransactionAmt": amounts,
+            "ProductCD": "W",
+        }
+    ).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def stub_handler(handler: AntifraudModelHandler, monkeypatch: pytest.MonkeyPatch) -> AntifraudModelHandler:
+    monkeypatch.setattr(batch_score, "get_antifraud_handler", lambda: handler)
+    return handler
+
+
+def score(input_path: Path, output: Path, *extra: str) -> int:
+    return run(parse_args([str(input_path), str(output), "--workers", "0", "--chunk-rows", "2", "--output-format", "csv", *extra]))
+
+
+def parts(output: Path) -> List[str]:
+    return sorted(path.name for path in output.iterdir() if path.name != CHECKPOINT_FILE)
+
+
+@pytest.mark.parametrize("suffix", ["parquet", "csv"])
+def test_write_atomic(tmp_path: Path, suffix: str) -> None:
+    path = tmp_path / f"part-000000.{suffix}"
+    df = pd.DataFrame({"TransactionID": [1, 2], "isFraud": [0, 1]})
+    write_atomic(df, path)
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+    restored = pd.read_parquet(path) if suffix == "parquet" else pd.read_csv(path)
+    pd.testing.assert_frame_equal(restored, df)
+
+
+def test_write_atomic_keeps_previous_file_on_failure(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "part-000000.csv"
+    path.write_text("TransactionID,isFraud\n1,0\n")
+
+    def fail(*args: Any, **kwargs: Any) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr("os.replace", fail)
+    with pytest.raises(OSError):
+        write_atomic(pd.DataFrame({"TransactionID": [2], "isFraud": [1]}), path)
+    assert path.read_text() == "TransactionID,isFraud\n1,0\n"
+
+
+def test_load_checkpoint(tmp_path: Path) -> None:
+    output = tmp_path / "scores"
+    params = {"input": "in.csv", "input_size": 10, "input_mtime_ns": 1, "chunk_rows": 2, "output_format": "csv"}
+    assert load_checkpoint(output, params, resume=False) == set()
+    (output / "part-000000.csv").write_text("")
+    (output / "part-000002.csv").write_text("")
+    # Незаконченная запись (временный файл) не считается готовым чанком
+    (output / "part-000003.csv.tmp").write_text("")
+
+    with pytest.raises(SystemExit):
+        load_checkpoint(output, params, resume=False)
+    with pytest.raises(SystemExit):
+        load_checkpoint(output, {**params, "chunk_rows": 3}, resume=True)
+    assert load_checkpoint(output, params, resume=True) == {0, 2}
+
+
+def test_run_scores_all_chunks(input_csv: Path, tmp_path: Path) -> None:
+    output = tmp_path / "scores"
+    assert score(input_csv, output) == 0
+    assert parts(output) == ["part-000000.csv", "part-000001.csv", "part-000002.csv", "part-000003.csv"]
+    result = pd.concat(pd.read_csv(output / name) for name in parts(output))
+    assert result["TransactionID"].tolist() == [1000, 1001, 1002, 1003, 1004, 1005, 1006]
+    assert result["isFraud"].tolist() == [0, 1, 0, 1, 0, 1, 0]
+
+
+def test_resume_skips_finished_chunks(input_csv: Path, tmp_path: Path, stub_model: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    output = tmp_path / "scores"
+    predict = stub_model.predict
+
+    def failing_predict(self: Any, df: pd.DataFrame) -> Any:
+        if 1004 in df["TransactionID"].tolist():
+            raise RuntimeError("model crashed")
+        return predict(self, df)
+
+    monkeypatch.setattr(stub_model, "predict", failing_predict)
+    assert score(input_csv, output) == 1
+    assert parts(output) == ["part-000000.csv", "part-000001.csv"]
+
+    monkeypatch.setattr(stub_model, "predict", predict)
+    # Без --resume готовые результаты не перезаписываются
+    with pytest.raises(SystemExit):
+        score(input_csv, output)
+
+    stub_model.calls.clear()
+    assert score(input_csv, output, "--resume") == 0
+    assert stub_model.calls == [[1004, 1005], [1006]]
+    assert parts(output) == ["part-000000.csv", "part-000001.csv", "part-000002.csv", "part-000003.csv"]
+
+
+@pytest.mark.parametrize("output_format", ["parquet", "csv"])
+def test_dropped_row_is_left_unscored(input_csv: Path, tmp_path: Path, output_format: str) -> None:
+    df = pd.read_csv(input_csv)
+    df.loc[df["TransactionID"] == 1003, "TransactionAmt"] = None
+    df.to_csv(input_csv, index=False)
+
+    output = tmp_path / "scores"
+    assert run(parse_args([str(input_csv), str(output), "--workers", "0", "--chunk-rows", "2", "--output-format", output_format])) == 0
+    result = pd.read_parquet(output) if output_format == "parquet" else pd.concat(pd.read_csv(output / name) for name in parts(output))
+    assert result["TransactionID"].tolist() == [1000, 1001, 1002, 1003, 1004, 1005, 1006]
+    assert result["isFraud"].astype("Int64").tolist() == [0, 1, 0, pd.NA, 0, 1, 0]
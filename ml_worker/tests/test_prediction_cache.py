@@ -0,0 +1,106 @@
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import pytest
+from antifraud_model_handler import ISFRAUD_FIELD, AntifraudModelHandler
+from benchmarks.synthetic import make_messages
+from prediction_cache import PredictionCache, row_digest
+
+
+def make_rows(*amounts: Optional[float]) -> List[Dict[str, Any]]:
+    rows = make_messages(len(amounts))
+    for row, amount in zip(rows, amounts):
+        row["TransactionAmt"] = amount
+    return rows
+
+
+def score(handler: AntifraudModelHandler, rows: List[Dict[str, Any]]) -> List[Any]:
+    return [(prediction.TransactionID, prediction.isFraud) for prediction in handler.predict_with_metadata({"input_data": rows})]
+
+
+def test_row_digest_ignores_field_order_and_label() -> None:
+    row = make_rows(10.0)[0]
+    reordered = dict(reversed(list(row.items())))
+    assert row_digest("v1", row) == row_digest("v1", {**reordered, "isFraud": 1})
+    assert row_digest("v1", row) != row_digest("v2", row)
+    assert row_digest("v1", row) != row_digest("v1", {**row, "TransactionAmt": 11.0})
+
+
+def test_cache_evicts_least_recently_used_and_expired() -> None:
+    cache = PredictionCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 0)
+    assert cache.get("a") == 1
+    cache.set("c", 1)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 1)
+    assert cache.stats()["evictions"] == 1
+
+    expired = PredictionCache(maxsize=2, ttl=-1)
+    expired.set("a", 1)
+    assert expired.get("a") is None
+    assert expired.stats()["entries"] == 0
+
+
+def test_full_miss_scores_all_rows(handler: AntifraudModelHandler, stub_model: Any) -> None:
+    rows = make_rows(10.0, 5000.0, 20.0)
+    assert score(handler, rows) == [(2987000, False), (2987001, True), (2987002, False)]
+    assert stub_model.calls == [[2987000, 2987001, 2987002]]
+    assert handler.cache_stats()["entries"] == 3
+
+
+def test_full_hit_skips_model(handler: AntifraudModelHandler, stub_model: Any) -> None:
+    rows = make_rows(10.0, 5000.0)
+    first = score(handler, rows)
+    assert score(handler, rows) == first
+    assert len(stub_model.calls) == 1
+    assert handler.cache_stats()["hits"] == 2
+
+
+def test_mixed_hits_are_merged_in_input_order(handler: AntifraudModelHandler, stub_model: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    rows = make_rows(10.0, 5000.0, 20.0, 6000.0)
+    score(handler, [rows[0], rows[3]])
+
+    # Новый порог меняет ответ модели: по нему видно, какие строки пришли из кэша
+    monkeypatch.setattr(stub_model, "threshold", 0.0)
+    assert score(handler, rows) == [(2987000, False), (2987001, True), (2987002, True), (2987003, True)]
+    assert stub_model.calls[-1] == [2987001, 2987002]
+
+    monkeypatch.setattr(stub_model, "threshold", 100000.0)
+    assert score(handler, list(reversed(rows))) == [(2987003, True), (2987002, True), (2987001, True), (2987000, False)]
+    assert len(stub_model.calls) == 2
+
+
+def test_model_version_change_invalidates_cache(handler: AntifraudModelHandler, stub_model: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    rows = make_rows(10.0, 5000.0)
+    score(handler, rows)
+
+    handler.load_model()
+    assert handler.cache_stats()["entries"] == 2
+
+    monkeypatch.setattr(stub_model, "version", "stub-2")
+    monkeypatch.setattr(stub_model, "threshold", 0.0)
+    handler.load_model()
+    assert handler.cache_stats()["entries"] == 0
+    assert score(handler, rows) == [(2987000, True), (2987001, True)]
+    assert stub_model.calls[-1] == [2987000, 2987001]
+
+
+def test_dropped_row_is_unscored_and_batch_not_cached(handler: AntifraudModelHandler, stub_model: Any) -> None:
+    rows = make_rows(10.0, None, 5000.0)
+    # Строка без суммы отброшена препроцессором: остальные предсказания не сдвигаются на её место
+    assert score(handler, rows) == [(2987000, False), (2987001, None), (2987002, True)]
+    assert handler.cache_stats()["entries"] == 0
+
+    assert score(handler, [rows[2], rows[0]]) == [(2987002, True), (2987000, False)]
+    assert stub_model.calls[-1] == [2987002, 2987000]
+
+
+def test_unalignable_predictions_raise(handler: AntifraudModelHandler, stub_model: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    def short_predict(self: Any, df: Any) -> Any:
+        return pd.DataFrame({ISFRAUD_FIELD: [1]}, index=[len(df)])
+
+    monkeypatch.setattr(stub_model, "predict", short_predict)
+    with pytest.raises(ValueError):
+        score(handler, make_rows(10.0, 5000.0))
+    assert handler.cache_stats()["entries"] == 0
@@ -0,0 +1,47 @@
+from typing import Any, Dict
+
+import antifraud_model_handler
+import pytest
+from antifraud_model_handler import AntifraudModelHandler
+from benchmarks.synthetic import make_messages
+from prometheus_client import REGISTRY
+from worker_metrics import record_failure, stage_timer
+
+
+def failures() -> Dict[str, float]:
+    return {
+        sample.labels["stage"]: sample.value
+        for metric in REGISTRY.collect()
+        if metric.name == "worker_failures"
+        for sample in metric.samples
+        if sample.name == "worker_failures_total"
+    }
+
+
+def delta(before: Dict[str, float]) -> Dict[str, float]:
+    return {stage: value - before.get(stage, 0.0) for stage, value in failures().items() if value != before.get(stage, 0.0)}
+
+
+def test_failure_counted_once_by_innermost_stage() -> None:
+    before = failures()
+    with pytest.raises(ValueError) as raised:
+        with stage_timer("deliver"):
+            with stage_timer("predict"):
+                raise ValueError("bad input")
+    # Обработчик сообщения не считает ошибку повторно
+    record_failure(raised.value)
+    assert delta(before) == {"predict": 1.0}
+
+    record_failure(KeyError("task_id"))
+    assert delta(before) == {"predict": 1.0, "other": 1.0}
+
+
+def test_handler_failure_is_counted_by_its_stage(handler: AntifraudModelHandler, monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(rows: Any) -> Any:
+        raise KeyError("TransactionID")
+
+    monkeypatch.setattr(antifraud_model_handler, "convert_json_to_dataframe", fail)
+    before = failures()
+    with pytest.raises(KeyError):
+        handler.predict_with_metadata({"input_data": make_messages(2)})
+    assert delta(before) == {"to_dataframe": 1.0}
@@ -0,0 +1,88 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from prometheus_client import Counter, Histogram, start_http_server
+from rmq.rmqconf import MetricsConfig
+
+logger = logging.getLogger(__name__)
+
+# Заголовок с временем публикации сообщения в мс от эпохи (ставит приложение, см. app/src/services/rm/rm.py)
+PUBLISHED_AT_HEADER = "x-published-at-ms"
+
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUEUE_WAIT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# Этапы обработки сообщения:
+#   decode - разбор JSON тела; to_dataframe - convert_json_to_dataframe; transform - pipeline.transform;
+#   cast - приведение типов перед моделью; predict - model.predict; to_predictions - сборка PredictionCreate;
+#   deliver - отправка результата в приложение по HTTP
+# Ошибки вне этапов (например, сообщение без task_id) записываются в FAILURES с этапом OTHER_STAGE
+OTHER_STAGE = "other"
+# Атрибут исключения с этапом, на котором оно уже записано в FAILURES
+_FAILED_STAGE_ATTR = "worker_failed_stage"
+
+STAGE_SECONDS = Histogram("worker_stage_seconds", "Время этапа обработки сообщения", ["stage"], buckets=STAGE_BUCKETS)
+QUEUE_WAIT_SECONDS = Histogram(
+    "worker_queue_wait_seconds",
+    "Время от публикации сообщения до начала его обработки воркером",
+    ["queue"],
+    buckets=QUEUE_WAIT_BUCKETS,
+)
+BATCHES = Counter("worker_batches_total", "Обработанные пакеты (сообщения) по исходу", ["queue", "outcome"])
+ROWS = Counter("worker_rows_total", "Оценённые строки: source=model - моделью, cache - из кэша предсказаний", ["source"])
+FAILURES = Counter("worker_failures_total", "Ошибки обработки сообщения по этапу, на котором они произошли", ["stage"])
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """
+    Контекстный менеджер, записывающий длительность блока в STAGE_SECONDS для этапа stage.
+
+    Исключение из блока записывается в FAILURES с этим этапом и пробрасывается дальше.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as exc:
+        record_failure(exc, stage)
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started)
+
+
+def record_failure(exc: BaseException, stage: str = OTHER_STAGE) -> None:
+    """
+    Записать ошибку в FAILURES. Каждое исключение считается один раз - этапом, на котором оно возникло
+    (самым вложенным stage_timer); обработчики сообщений вызывают её для ошибок вне этапов.
+    """
+    if getattr(exc, _FAILED_STAGE_ATTR, None) is not None:
+        return
+    FAILURES.labels(stage).inc()
+    setattr(exc, _FAILED_STAGE_ATTR, stage)
+
+
+def observe_queue_wait(queue: str, properties: Any) -> Optional[float]:
+    """
+    Записать ожидание сообщения в очереди по заголовку PUBLISHED_AT_HEADER.
+
+    Сообщения без заголовка (от старых версий приложения) пропускаются. Часы приложения
+    и воркера не синхронизированы точнее NTP, поэтому отрицательное значение записывается как 0.
+    """
+    headers = getattr(properties, "headers", None) or {}
+    published_at = headers.get(PUBLISHED_AT_HEADER)
+    if published_at is None:
+        return None
+    wait = max(0.0, time.time() - int(published_at) / 1000)
+    QUEUE_WAIT_SECONDS.labels(queue).observe(wait)
+    return wait
+
+
+def start_metrics_server(config: MetricsConfig) -> None:
+    """Запустить HTTP-сервер /metrics в фоновом потоке; порт 0 - метрики только в памяти процесса."""
+    if not config.metrics_port:
+        logger.info("Metrics server disabled")
+        return
+    start_http_server(config.metrics_port, addr=config.metrics_host)
+    logger.info("Metrics server listening on %s:%d", config.metrics_host, config.metrics_port)